@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Website Cloner Benchmark
+
+Serves synthetic fixture sites from a local HTTP server and clones each one
+with website_cloner.py, measuring end-to-end time, per-stage time, peak
+memory and output size. No network access is needed.
+
+Each clone runs in its own process so peak RSS is per fixture; per-stage
+times and peak RSS come from the clone's data/profile.json (browser memory
+is not included). Results are written as JSON and can be compared with an
+earlier run.
+
+Clones use the headless 'server' launch profile by default, so no X server
+is required.
+
+Usage: python benchmark_cloner.py [--fixtures small,dom_heavy] [--runs 3] [--profile server]
+                                  [--output results.json] [--compare previous.json]
+                                  [--clone-arg=--animation-mode=virtual ...]
+"""
+
+import argparse
+import functools
+import json
+import platform
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchmark_style_scan import build_dom_heavy_page
+
+
+CLONER = Path(__file__).with_name("website_cloner.py")
+
+
+def solid_png(width: int, height: int, rgb: tuple) -> bytes:
+    """Minimal single-color RGB PNG"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    row = b'\x00' + bytes(rgb) * width
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(row * height))
+            + chunk(b'IEND', b''))
+
+
+def page(title: str, body: str, head: str = "") -> str:
+    return (f"<!doctype html><html><head><meta charset='utf-8'><title>{title}</title>{head}</head>"
+            f"<body>{body}</body></html>")
+
+
+def build_small(root: Path):
+    (root / "style.css").write_text(
+        "body { font-family: Georgia, serif; margin: 40px; color: #222; }"
+        "h1 { font-size: 48px; } .hero { padding: 40px; background: #f4f4f8; border-radius: 12px; }"
+    )
+    (root / "logo.png").write_bytes(solid_png(64, 64, (30, 120, 200)))
+    (root / "index.html").write_text(page(
+        "Small fixture",
+        "<div class='hero'><img src='logo.png'><h1>Small fixture</h1><p>One stylesheet, one image.</p></div>",
+        "<link rel='stylesheet' href='style.css'>"
+    ))
+
+
+def build_dom_heavy(root: Path):
+    (root / "index.html").write_text(build_dom_heavy_page(20000))
+
+
+def build_asset_heavy(root: Path, fonts: int = 200, images: int = 300):
+    (root / "fonts").mkdir()
+    (root / "images").mkdir()
+    faces, spans = [], []
+    for i in range(fonts):
+        # Not a valid font; the browser still requests and the cloner still saves it
+        (root / "fonts" / f"face{i}.woff2").write_bytes(b'wOF2' + bytes([i % 256]) * 2048)
+        faces.append(f"@font-face {{ font-family: 'Face{i}'; src: url('fonts/face{i}.woff2') format('woff2'); }}")
+        spans.append(f"<span style=\"font-family: 'Face{i}'\">Font {i}</span> ")
+    tiles = []
+    for i in range(images):
+        (root / "images" / f"img{i}.png").write_bytes(solid_png(48, 48, ((i * 7) % 256, (i * 13) % 256, (i * 29) % 256)))
+        tiles.append(f"<img src='images/img{i}.png' width='48' height='48'>")
+    (root / "index.html").write_text(page(
+        "Asset-heavy fixture",
+        f"<div>{''.join(spans)}</div><div>{''.join(tiles)}</div>",
+        f"<style>{''.join(faces)}</style>"
+    ))
+
+
+def build_lazy_scroll(root: Path, sections: int = 120, batches: int = 10):
+    (root / "images").mkdir()
+    blocks = []
+    for i in range(sections):
+        (root / "images" / f"lazy{i}.png").write_bytes(solid_png(320, 180, ((i * 11) % 256, 90, 160)))
+        blocks.append(f"<section style='height: 600px'><h2>Section {i}</h2>"
+                      f"<img loading='lazy' src='images/lazy{i}.png' width='320' height='180'></section>")
+    # Infinite-scroll sentinel that appends a bounded number of batches
+    script = f"""
+        let batch = 0;
+        const feed = document.getElementById('feed');
+        const observer = new IntersectionObserver(entries => {{
+            if (!entries[0].isIntersecting || batch >= {batches}) return;
+            batch++;
+            setTimeout(() => {{
+                for (let i = 0; i < 10; i++) {{
+                    const item = document.createElement('div');
+                    item.style.height = '400px';
+                    item.textContent = 'Batch ' + batch + ' item ' + i;
+                    feed.appendChild(item);
+                }}
+            }}, 150);
+        }});
+        observer.observe(document.getElementById('sentinel'));
+    """
+    (root / "index.html").write_text(page(
+        "Lazy-load fixture",
+        f"{''.join(blocks)}<div id='feed'></div><div id='sentinel' style='height: 10px'></div><script>{script}</script>"
+    ))
+
+
+def build_animation_heavy(root: Path, elements: int = 300):
+    css = ["body { margin: 0; display: flex; flex-wrap: wrap; }",
+           ".box { width: 40px; height: 40px; margin: 4px; background: #4a90e2; border-radius: 6px; }",
+           "@keyframes spin { to { transform: rotate(360deg); } }",
+           "@keyframes fade { 50% { opacity: .2; } }",
+           "@keyframes slide { from { transform: translateX(-20px); } to { transform: translateX(20px); } }"]
+    boxes = []
+    for i in range(elements):
+        name = ('spin', 'fade', 'slide')[i % 3]
+        boxes.append(f"<div class='box' style='animation: {name} {1 + i % 8}s {i % 5 * 0.2:.1f}s infinite alternate'></div>")
+    script = """
+        document.querySelectorAll('.box').forEach((el, i) => {
+            if (i % 10 === 0) el.animate([{borderRadius: '0'}, {borderRadius: '50%'}], {duration: 1500, iterations: Infinity});
+        });
+    """
+    (root / "index.html").write_text(page(
+        "Animation-heavy fixture", f"{''.join(boxes)}<script>{script}</script>", f"<style>{''.join(css)}</style>"
+    ))
+
+
+def build_theme_toggle(root: Path):
+    css = """
+        :root { --bg: #ffffff; --fg: #1a1a1a; --accent: #0066ff; }
+        html.dark { --bg: #0f1115; --fg: #e6e6e6; --accent: #66a3ff; }
+        body { background: var(--bg); color: var(--fg); font-family: system-ui, sans-serif; margin: 40px; }
+        .card { border: 1px solid var(--accent); padding: 24px; margin: 12px 0; border-radius: 8px; }
+        button { background: var(--accent); color: var(--bg); border: 0; padding: 8px 16px; }
+    """
+    cards = ''.join(f"<div class='card'><h3>Card {i}</h3><p>Themed content</p></div>" for i in range(30))
+    script = """
+        document.getElementById('toggle').addEventListener('click', () => {
+            document.documentElement.classList.toggle('dark');
+            document.documentElement.classList.toggle('light');
+        });
+    """
+    (root / "index.html").write_text(page(
+        "Theme toggle fixture",
+        f"<button id='toggle' aria-label='Toggle theme'>Toggle</button>{cards}<script>{script}</script>",
+        f"<style>{css}</style>"
+    ).replace("<html>", "<html class='light'>"))
+
+
+FIXTURES = {
+    'small': build_small,
+    'dom_heavy': build_dom_heavy,
+    'asset_heavy': build_asset_heavy,
+    'lazy_scroll': build_lazy_scroll,
+    'animation_heavy': build_animation_heavy,
+    'theme_toggle': build_theme_toggle,
+}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(root: Path) -> ThreadingHTTPServer:
+    """Serve ``root`` on a free localhost port from a background thread"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def clone_fixture(url: str, output_dir: Path, clone_args: list) -> dict:
+    """Clone one fixture in a fresh process and collect its measurements"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(CLONER), url, str(output_dir)] + clone_args,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    run = {
+        'wall_seconds': round(time.perf_counter() - started, 2),
+        'exit_code': result.returncode,
+        'output_bytes': directory_size(output_dir) if output_dir.exists() else 0,
+    }
+    if result.returncode != 0:
+        run['error'] = '\n'.join(result.stderr.strip().splitlines()[-5:])
+    try:
+        with open(output_dir / "data" / "profile.json") as f:
+            profile = json.load(f)
+        run['stages'] = {s['stage']: s['wall_seconds'] for s in profile['stages']}
+        run['peak_rss_bytes'] = profile['peak_rss_bytes']
+    except (OSError, ValueError, KeyError):
+        run['stages'] = {}
+        run['peak_rss_bytes'] = None
+    return run
+
+
+def summarize(runs: list) -> dict:
+    ok = [r for r in runs if r['exit_code'] == 0] or runs
+    stages = sorted({stage for r in ok for stage in r['stages']})
+    return {
+        'runs': runs,
+        'failed_runs': sum(1 for r in runs if r['exit_code'] != 0),
+        'median_wall_seconds': round(statistics.median(r['wall_seconds'] for r in ok), 2),
+        'median_stage_seconds': {
+            stage: round(statistics.median(r['stages'][stage] for r in ok if stage in r['stages']), 3)
+            for stage in stages
+        },
+        'peak_rss_bytes': max((r['peak_rss_bytes'] or 0 for r in ok), default=None),
+        'output_bytes': max(r['output_bytes'] for r in ok),
+    }
+
+
+def compare(current: dict, previous: dict) -> dict:
+    """Relative change per fixture for the headline metrics (positive = grew)"""
+    deltas = {}
+    for name, result in current['fixtures'].items():
+        before = previous.get('fixtures', {}).get(name)
+        if not before:
+            continue
+        deltas[name] = {}
+        for metric in ('median_wall_seconds', 'peak_rss_bytes', 'output_bytes'):
+            if before.get(metric) and result.get(metric) is not None:
+                deltas[name][metric] = round((result[metric] - before[metric]) / before[metric] * 100, 1)
+    return deltas
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark website_cloner.py against local fixture sites")
+    parser.add_argument('--fixtures', default=','.join(FIXTURES),
+                        help=f"Comma-separated fixtures to run (default: all of {', '.join(FIXTURES)})")
+    parser.add_argument('--runs', type=int, default=1, help="Clones per fixture; medians are reported (default: 1)")
+    parser.add_argument('--output', default=None,
+                        help="Results file (default: benchmark_results/cloner-<timestamp>.json)")
+    parser.add_argument('--compare', metavar='FILE', help="Earlier results file to compare against")
+    parser.add_argument('--profile', default='server',
+                        help="Launch profile passed to website_cloner.py (default: server)")
+    parser.add_argument('--clone-arg', action='append', default=[], metavar='ARG',
+                        help="Extra argument passed to website_cloner.py (repeatable)")
+    parser.add_argument('--keep-output', action='store_true', help="Keep the cloned output directories")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    names = [name.strip() for name in args.fixtures.split(',') if name.strip()]
+    unknown = [name for name in names if name not in FIXTURES]
+    if unknown:
+        raise SystemExit(f"Unknown fixture(s): {', '.join(unknown)}")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="cloner-bench-"))
+    clone_args = ['--profile', args.profile] + args.clone_arg
+    results = {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'clone_args': clone_args,
+        'runs_per_fixture': args.runs,
+        'fixtures': {},
+    }
+
+    for name in names:
+        site = work_dir / "sites" / name
+        site.mkdir(parents=True)
+        FIXTURES[name](site)
+        server = serve(site)
+        url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+        print(f"[*] {name}: {url}")
+        try:
+            runs = []
+            for i in range(args.runs):
+                run = clone_fixture(url, work_dir / "clones" / f"{name}-{i}", clone_args)
+                print(f"  [RUN] {run['wall_seconds']}s, exit {run['exit_code']}, {run['output_bytes']} bytes")
+                runs.append(run)
+        finally:
+            server.shutdown()
+        results['fixtures'][name] = summarize(runs)
+
+    if args.compare:
+        with open(args.compare) as f:
+            results['comparison'] = {'baseline': args.compare, 'percent_change': compare(results, json.load(f))}
+
+    output = Path(args.output or f"benchmark_results/cloner-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({name: {k: v for k, v in r.items() if k != 'runs'} for name, r in results['fixtures'].items()}, indent=2))
+    if 'comparison' in results:
+        print(json.dumps(results['comparison'], indent=2))
+    print(f"[*] Results written to {output}")
+
+    if not args.keep_output:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Style Scan Benchmark
+
+Compares the single-pass style collector used by website_cloner.py against
+the per-consumer sweeps it replaced, on a synthetic DOM-heavy page.
+
+The legacy path walked document.querySelectorAll('*') five times for one page
+state (three sweeps in extract_page_data, one in capture_animations, one in
+extract_theme_design_system); the collector walks it once.
+
+Usage: python benchmark_style_scan.py [node_count] [runs]
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+from website_cloner import STYLE_SCAN_JS
+
+
+# The per-element work of the five sweeps the collector replaced
+LEGACY_SWEEPS_JS = """
+() => {
+    const started = performance.now();
+    const textTags = ['H1','H2','H3','H4','H5','H6','P','SPAN','A','LI','BUTTON'];
+    const rgbToHex = (rgb) => {
+        if (!rgb || rgb === 'transparent' || rgb === 'rgba(0, 0, 0, 0)') return null;
+        const match = rgb.match(/rgba?\\((\\d+),\\s*(\\d+),\\s*(\\d+)/);
+        if (!match) return rgb;
+        return '#' + [match[1], match[2], match[3]].map(x => parseInt(x).toString(16).padStart(2, '0')).join('');
+    };
+
+    // extract_page_data: colors, fonts, typography
+    const colors = new Set(), fonts = new Set(), typography = [];
+    document.querySelectorAll('*').forEach(el => {
+        const style = getComputedStyle(el);
+        colors.add(style.color); colors.add(style.backgroundColor);
+        colors.add(style.borderColor); colors.add(style.outlineColor);
+        fonts.add(style.fontFamily);
+        if (textTags.includes(el.tagName)) {
+            typography.push({tag: el.tagName, fontFamily: style.fontFamily, fontSize: style.fontSize,
+                             fontWeight: style.fontWeight, lineHeight: style.lineHeight,
+                             letterSpacing: style.letterSpacing, textTransform: style.textTransform,
+                             color: style.color, text: el.innerText?.substring(0, 50)});
+        }
+    });
+
+    // extract_page_data: animated elements
+    const animated = [];
+    document.querySelectorAll('*').forEach(el => {
+        const style = getComputedStyle(el);
+        if (style.animation && style.animation !== 'none') animated.push(style.animation);
+        if (style.transition && style.transition !== 'none' && style.transition !== 'all 0s ease 0s') animated.push(style.transition);
+    });
+
+    // extract_page_data: background images
+    const backgrounds = [];
+    document.querySelectorAll('*').forEach(el => {
+        const style = getComputedStyle(el);
+        if (style.backgroundImage && style.backgroundImage !== 'none') {
+            backgrounds.push([style.backgroundImage, style.backgroundSize, style.backgroundPosition, style.backgroundRepeat]);
+        }
+    });
+
+    // capture_animations: timings
+    let maxDuration = 0;
+    document.querySelectorAll('*').forEach(el => {
+        const style = getComputedStyle(el);
+        if (style.animationName && style.animationName !== 'none') {
+            maxDuration = Math.max(maxDuration, (parseFloat(style.animationDuration) || 0) + (parseFloat(style.animationDelay) || 0));
+        }
+        if (style.transitionDuration && style.transitionDuration !== '0s') parseFloat(style.transitionDuration);
+    });
+
+    // extract_theme_design_system: hex colors, gradients, shadows
+    const seen = new Set(), gradients = [], shadows = [];
+    document.querySelectorAll('*').forEach(el => {
+        const style = getComputedStyle(el);
+        [style.backgroundColor, style.color, style.borderColor].forEach(c => { const h = rgbToHex(c); if (h) seen.add(h); });
+        if (style.backgroundImage.includes('gradient')) gradients.push(style.backgroundImage);
+        if (style.boxShadow !== 'none') shadows.push(style.boxShadow);
+    });
+
+    return {
+        elementCount: document.querySelectorAll('*').length,
+        scanMs: performance.now() - started
+    };
+}
+"""
+
+
+def build_dom_heavy_page(node_count: int = 15000) -> str:
+    """Synthetic page with roughly ``node_count`` styled elements"""
+    css = """
+        body { font-family: system-ui, sans-serif; margin: 0; }
+        .card { padding: 8px; margin: 4px; border: 1px solid #ddd; border-radius: 6px;
+                box-shadow: 0 1px 2px rgba(0,0,0,.1); transition: transform .2s ease; }
+        .card:nth-child(3n) { background: linear-gradient(90deg, #f06, #4a90e2); }
+        .card:nth-child(5n) { animation: pulse 2s infinite; }
+        .grid { display: grid; grid-template-columns: repeat(4, 1fr); gap: 8px; }
+        @keyframes pulse { 0% { opacity: 1; } 50% { opacity: .6; } 100% { opacity: 1; } }
+    """
+    # Each card is 4 elements (div, h3, p, span)
+    cards = []
+    for i in range(max(1, node_count // 4)):
+        hue = (i * 37) % 360
+        cards.append(
+            f'<div class="card c{i % 50}" style="color: hsl({hue}, 60%, 30%)">'
+            f'<h3>Card {i}</h3><p>Body text for card {i}</p><span>tag-{i % 20}</span></div>'
+        )
+    sections = []
+    for start in range(0, len(cards), 200):
+        sections.append(f'<section class="grid">{"".join(cards[start:start + 200])}</section>')
+    return f"<!doctype html><html><head><style>{css}</style></head><body>{''.join(sections)}</body></html>"
+
+
+async def time_script(page, script: str, runs: int) -> dict:
+    wall = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await page.evaluate(script)
+        wall.append((time.perf_counter() - started) * 1000)
+    return {
+        'element_count': result['elementCount'],
+        'median_ms': round(statistics.median(wall), 1),
+        'min_ms': round(min(wall), 1),
+    }
+
+
+async def main():
+    node_count = int(sys.argv[1]) if len(sys.argv) > 1 else 15000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page(viewport={'width': 1920, 'height': 1080})
+        await page.set_content(build_dom_heavy_page(node_count))
+
+        legacy = await time_script(page, LEGACY_SWEEPS_JS, runs)
+        collector = await time_script(page, STYLE_SCAN_JS, runs)
+        await browser.close()
+
+    results = {
+        'node_count': collector['element_count'],
+        'runs': runs,
+        'legacy_sweeps': legacy,
+        'single_pass': collector,
+        'speedup': round(legacy['median_ms'] / collector['median_ms'], 2) if collector['median_ms'] else None,
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -17,24 +17,2193 @@ Features:
 - Component tree extraction
 - Tailwind config generation
 - Responsive screenshots
+- Batch cloning of URL lists over a shared browser pool
 """
 
+import argparse
 import asyncio
 import base64
+import bisect
 import json
 import os
 import re
+import shutil
+import struct
+import sys
+import threading
+import time
+import zlib
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 
-from playwright.async_api import async_playwright, Page, BrowserContext
+from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import aiohttp
+except ImportError:  # MediaDownloader falls back to Playwright's request API
+    aiohttp = None
+
+
+DEFAULT_URL = "https://www.aura.build/share/lumina-video"
+
+BROWSER_ARGS = [
+    '--autoplay-policy=no-user-gesture-required',
+    '--disable-features=PreloadMediaEngagementData,MediaEngagementBypassAutoplayPolicies',
+    '--disable-web-security',
+    '--disable-features=IsolateOrigins,site-per-process'
+]
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+DEFAULT_BREAKPOINTS = [
+    {'name': 'full', 'width': 1920, 'height': 1080},
+    {'name': 'desktop', 'width': 1440, 'height': 900},
+    {'name': 'tablet', 'width': 768, 'height': 1024},
+    {'name': 'mobile', 'width': 390, 'height': 844},
+]
+
+SCREENSHOT_MODES = ('serial', 'parallel', 'compare')
+
+# auto: alternate theme in a sibling context when emulation or a class switch
+# works, toggle flow otherwise; toggle: always click/toggle on the main page
+THEME_MODES = ('auto', 'toggle')
+
+
+def parse_breakpoints(spec: str) -> list:
+    """Parse ``name:WIDTHxHEIGHT,...`` into breakpoint dicts"""
+    breakpoints = []
+    for item in spec.split(','):
+        name, _, size = item.strip().partition(':')
+        match = re.fullmatch(r'(\d+)x(\d+)', size.strip())
+        if not name or not match:
+            raise ValueError(f"Invalid breakpoint '{item}', expected name:WIDTHxHEIGHT")
+        breakpoints.append({'name': name, 'width': int(match.group(1)), 'height': int(match.group(2))})
+    return breakpoints
+
+
+# How the browser is launched and what every clone context records. 'desktop'
+# is headed (better video capture) and records the whole session; 'server'
+# suits headless workers with no X server and skips the session video.
+LAUNCH_PROFILES = {
+    'desktop': {
+        'headless': False,
+        'args': BROWSER_ARGS,
+        'user_agent': DEFAULT_USER_AGENT,
+        'viewport': {'width': 1920, 'height': 1080},
+        'session_video': True,
+    },
+    'server': {
+        'headless': True,
+        'args': BROWSER_ARGS + [
+            '--disable-dev-shm-usage',
+            '--disable-gpu',
+            '--disable-extensions',
+            '--disable-background-networking',
+            '--mute-audio',
+            '--no-first-run',
+        ],
+        'user_agent': DEFAULT_USER_AGENT,
+        'viewport': {'width': 1920, 'height': 1080},
+        'session_video': False,
+    },
+}
+
+
+def launch_profile(name: str = 'desktop', extra_args: list = None, **overrides) -> dict:
+    """Copy of a named launch profile with overrides applied; None values are ignored"""
+    if name not in LAUNCH_PROFILES:
+        raise ValueError(f"Unknown launch profile '{name}', expected one of {', '.join(LAUNCH_PROFILES)}")
+    profile = dict(LAUNCH_PROFILES[name])
+    profile.update({key: value for key, value in overrides.items() if value is not None})
+    profile['args'] = list(profile['args']) + list(extra_args or [])
+    return profile
+
+
+def parse_viewport(spec: str) -> dict:
+    """Parse ``WIDTHxHEIGHT`` into a viewport dict"""
+    match = re.fullmatch(r'(\d+)x(\d+)', spec.strip())
+    if not match:
+        raise ValueError(f"Invalid viewport '{spec}', expected WIDTHxHEIGHT")
+    return {'width': int(match.group(1)), 'height': int(match.group(2))}
+
+
+async def launch_browser(playwright, profile: dict = None) -> Browser:
+    """Launch Chromium with a launch profile's flags (default: desktop)"""
+    profile = profile or LAUNCH_PROFILES['desktop']
+    return await playwright.chromium.launch(headless=profile['headless'], args=profile['args'])
+
+
+class NDJSONWriter:
+    """Appends one JSON document per line, so large report sections never sit in memory"""
+
+    def __init__(self, path: Path, append: bool = False):
+        self.path = Path(path)
+        self.count = 0
+        if append and self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                self.count = sum(1 for line in f if line.strip())
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, default=str))
+        self._file.write('\n')
+        self.count += 1
+
+    def reference(self, root: Path) -> dict:
+        """Pointer stored in extraction_report.json in place of the section itself"""
+        return {'path': os.path.relpath(self.path, root), 'format': 'ndjson', 'count': self.count}
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def iter_ndjson(path: Path):
+    """Lazily yield the records of an NDJSON report section"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# Top-level CSS tokens the rule splitter stops at: blocks, statement ends,
+# string quotes, comment starts and escapes
+_CSS_SPLIT_RE = re.compile(r'[{};"\'/\\]')
+_CSS_PROTECT_RE = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+_CSS_COLLAPSE_RE = re.compile(rf'({_CSS_PROTECT_RE})|/\*[\s\S]*?(?:\*/|$)|\s+')
+_CSS_PUNCTUATION_RE = re.compile(rf'({_CSS_PROTECT_RE})|\s*;\s*(}})\s*|\s*([{{}};,])\s*|(:)\s+')
+
+
+def _skip_css_token(text: str, char: str, position: int, end: int) -> int:
+    """Position after the string, comment or escape that ``char`` (just consumed) opens"""
+    if char in '"\'':
+        while position < end and text[position] != char:
+            position += 2 if text[position] == '\\' else 1
+        return position + 1
+    if char == '/':
+        if text.startswith('*', position):
+            close = text.find('*/', position + 1, end)
+            return end if close < 0 else close + 2
+        return position
+    if char == '\\':
+        return position + 1
+    return position
+
+
+def iter_css_rules(text: str, start: int = 0, end: int = None):
+    """Yield ``(start, end)`` offsets of each top-level rule in a stylesheet
+
+    A rule runs from its first non-whitespace character (leading comments
+    included) through the brace closing its block, or the ``;`` ending a
+    statement at-rule such as ``@import``. Strings, comments and escapes are
+    skipped, so braces inside them do not count. Trailing text with no rule
+    after it is yielded as a final span. ``start``/``end`` limit the scan to
+    a block body, e.g. the inside of an ``@media`` rule.
+    """
+    length = len(text) if end is None else end
+    position = start
+    while position < length:
+        while position < length and text[position].isspace():
+            position += 1
+        if position >= length:
+            return
+        rule_start, depth = position, 0
+        while True:
+            match = _CSS_SPLIT_RE.search(text, position, length)
+            if match is None:
+                yield rule_start, length
+                return
+            char, position = match.group(), match.end()
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth <= 0:
+                    break
+            elif char == ';':
+                if depth == 0:
+                    break
+            else:
+                position = _skip_css_token(text, char, position, length)
+        yield rule_start, min(position, length)
+
+
+def css_block_start(text: str, start: int, end: int):
+    """Offset just past the ``{`` opening a rule's block, or None for a statement"""
+    position = start
+    while True:
+        match = _CSS_SPLIT_RE.search(text, position, end)
+        if match is None or match.group() in ';}':
+            return None
+        char, position = match.group(), match.end()
+        if char == '{':
+            return position
+        position = _skip_css_token(text, char, position, end)
+
+
+def minify_css(text: str) -> str:
+    """Strip comments and redundant whitespace, leaving strings untouched
+
+    Deliberately conservative: whitespace around ``+``, ``>`` and ``~`` and
+    before ``:`` can be significant (``calc()``, descendant selectors), so
+    it is only collapsed to a single space.
+    """
+    def collapse(match):
+        if match.group(1):
+            return match.group(1)
+        return ' ' if match.group().isspace() else ''
+
+    def tighten(match):
+        return match.group(1) or match.group(2) or match.group(3) or match.group(4)
+
+    text = _CSS_COLLAPSE_RE.sub(collapse, text)
+    return _CSS_PUNCTUATION_RE.sub(tighten, text).strip()
+
+
+def css_rule_key(rule: str) -> bytes:
+    """Hash of a rule with comments and formatting normalized away
+
+    Comment-only spans normalize to nothing, so they are keyed by their raw
+    text instead and distinct license banners are all kept.
+    """
+    normalized = minify_css(rule) or rule
+    return hashlib.blake2b(normalized.encode('utf-8', errors='ignore'), digest_size=16).digest()
+
+
+class CSSCombiner:
+    """Streams stylesheets into one file, dropping repeated sheets and rules
+
+    The first pass hashes every sheet and every top-level rule; the second
+    streams the text out, keeping only the last copy of a repeated rule.
+    An identical rule later in the cascade wins over the earlier copy, so
+    dropping the earlier ones leaves the computed result unchanged.
+    Sheet text is requested from ``load`` on each pass rather than held.
+    """
+
+    def __init__(self, minify: bool = False):
+        self.minify = minify
+
+    def combine(self, sheets: list, path: Path, load) -> dict:
+        """Write ``sheets`` (``(label, sheet)`` pairs) to ``path``; ``load(sheet)`` returns text or None"""
+        sheet_keys = []  # per sheet: rule keys, or None when the whole sheet is skipped
+        by_hash = {}
+        last = {}
+        stats = {'sheets': len(sheets), 'duplicate_sheets': 0, 'rules': 0, 'duplicate_rules': 0,
+                 'minified': self.minify, 'bytes_in': 0, 'bytes_out': 0, 'bytes_saved': 0}
+
+        for index, (label, sheet) in enumerate(sheets):
+            text = load(sheet)
+            if text is None:
+                sheet_keys.append(None)
+                continue
+            raw = text.encode('utf-8', errors='ignore')
+            stats['bytes_in'] += len(raw)
+            digest = hashlib.blake2b(raw, digest_size=16).digest()
+            keys = by_hash.get(digest)
+            if keys is None:
+                keys = by_hash[digest] = [css_rule_key(text[start:end]) for start, end in iter_css_rules(text)]
+            else:
+                stats['duplicate_sheets'] += 1
+            sheet_keys.append(keys)
+            stats['rules'] += len(keys)
+            for position, key in enumerate(keys):
+                last[key] = (index, position)
+
+        with open(path, 'wb') as out:
+            def write(chunk: str):
+                data = chunk.encode('utf-8', errors='ignore')
+                out.write(data)
+                stats['bytes_out'] += len(data)
+
+            if not self.minify:
+                write("/* Combined CSS extracted from website */\n\n")
+            for index, (label, sheet) in enumerate(sheets):
+                if not self.minify:
+                    write(f"\n/* === {label} === */\n")
+                keys = sheet_keys[index]
+                if keys is None:
+                    continue
+                text = load(sheet)
+                for position, (start, end) in enumerate(iter_css_rules(text)):
+                    rule = text[start:end]
+                    if last.get(keys[position]) != (index, position):
+                        stats['duplicate_rules'] += 1
+                        continue
+                    if self.minify:
+                        rule = minify_css(rule)
+                        if rule:
+                            write(rule)
+                    else:
+                        write(rule + "\n")
+                if self.minify:
+                    write("\n")
+
+        stats['bytes_saved'] = max(0, stats['bytes_in'] - stats['bytes_out'])
+        return stats
+
+
+# At-rules whose blocks hold other rules; coverage pruning recurses into them.
+# Other block at-rules (@font-face, @keyframes, @property, ...) are always kept
+CSS_GROUPING_AT_RULES = ('media', 'supports', 'layer', 'container', 'document', '-moz-document', 'scope',
+                         'starting-style')
+_CSS_LEADING_RE = re.compile(r'(?:\s+|/\*[\s\S]*?\*/)*@([-\w]+)')
+
+
+def prune_css(text: str, used_starts: list, start: int = 0, end: int = None, counts: dict = None) -> list:
+    """Keep the rules of a stylesheet that rule-usage coverage saw applied
+
+    ``used_starts`` is the sorted list of start offsets CDP reported as used.
+    A style rule is kept when a used offset falls inside it; grouping
+    at-rules keep whichever of their rules survive and are dropped when none
+    do; statements and other at-rules are kept as they are. Returns the kept
+    rule texts; ``counts`` (if given) accumulates ``rules``/``used_rules``.
+    """
+    kept = []
+    for rule_start, rule_end in iter_css_rules(text, start, end):
+        block = css_block_start(text, rule_start, rule_end)
+        at_rule = _CSS_LEADING_RE.match(text, rule_start, rule_end)
+        if block is None or (at_rule and at_rule.group(1).lower() not in CSS_GROUPING_AT_RULES):
+            kept.append(text[rule_start:rule_end])
+        elif at_rule:
+            body_end = rule_end - 1 if text[rule_end - 1] == '}' else rule_end
+            inner = prune_css(text, used_starts, block, body_end, counts)
+            if inner:
+                kept.append(text[rule_start:block] + "\n" + "\n".join(inner) + "\n}")
+        else:
+            index = bisect.bisect_left(used_starts, rule_start)
+            used = index < len(used_starts) and used_starts[index] < rule_end
+            if counts is not None:
+                counts['rules'] += 1
+                counts['used_rules'] += used
+            if used:
+                kept.append(text[rule_start:rule_end])
+    return kept
+
+
+def coverage_used_ranges(functions: list) -> list:
+    """Disjoint ``[start, end)`` offsets that executed, from V8 block coverage
+
+    Block ranges nest (a function's range contains its untaken branches with
+    count 0), so the innermost range decides each offset. Points are swept
+    in order with a stack of counts; ends sort before starts at the same
+    offset, and enclosing ranges open before and close after nested ones.
+    """
+    points = []
+    for function in functions:
+        for block in function['ranges']:
+            length = block['endOffset'] - block['startOffset']
+            points.append((block['startOffset'], 1, -length, block['count']))
+            points.append((block['endOffset'], 0, length, block['count']))
+    points.sort()
+
+    ranges, counts, last = [], [], 0
+    for offset, is_start, _, count in points:
+        if counts and counts[-1] > 0 and last < offset:
+            if ranges and ranges[-1][1] == last:
+                ranges[-1][1] = offset
+            else:
+                ranges.append([last, offset])
+        last = offset
+        if is_start:
+            counts.append(count)
+        else:
+            counts.pop()
+    return ranges
+
+
+def merge_ranges(ranges: list) -> list:
+    """Union of possibly overlapping ``[start, end)`` ranges, sorted"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+# Clone pipeline stages in run order. Stages in PAGE_STAGES work on the live
+# page; navigate (and scroll, unless skipped) re-run whenever one of them does.
+# coverage only runs when CSS coverage is requested
+PIPELINE_STAGES = ('navigate', 'scroll', 'assets', 'animations', 'themes', 'screenshots', 'coverage',
+                   'extraction', 'report')
+PAGE_STAGES = ('scroll', 'assets', 'animations', 'themes', 'screenshots', 'coverage', 'extraction')
+
+
+def parse_stages(spec: str) -> list:
+    """Parse a comma-separated stage list such as ``themes,screenshots``"""
+    stages = [item.strip() for item in spec.split(',') if item.strip()]
+    for stage in stages:
+        if stage not in PIPELINE_STAGES:
+            raise ValueError(f"Unknown stage '{stage}', expected one of {', '.join(PIPELINE_STAGES)}")
+    return stages
+
+
+class StageCheckpoints:
+    """One JSON file per completed pipeline stage under ``<output>/.checkpoints``
+
+    A checkpoint holds the cloner attributes the stage produced, so a later
+    run can restore them instead of redoing the stage. Every checkpoint is
+    stamped with the id of the run that wrote it; only checkpoints of the
+    current run (see ``begin``) are loaded, so two runs never get mixed.
+    """
+
+    def __init__(self, output_dir: Path, url: str):
+        self.root = Path(output_dir) / ".checkpoints"
+        self.url = url
+        self.run_id = None
+
+    def path_for(self, stage: str) -> Path:
+        return self.root / f"{stage}.json"
+
+    def begin(self, continue_run: bool) -> str:
+        """Adopt the last run's id to continue it, or wipe the checkpoints and start a new run
+
+        A run for a different URL is never continued.
+        """
+        run_file = self.root / "run.json"
+        if continue_run:
+            try:
+                with open(run_file, encoding='utf-8') as f:
+                    run = json.load(f)
+                if run.get('url') == self.url and run.get('run_id'):
+                    self.run_id = run['run_id']
+                    return self.run_id
+            except (OSError, ValueError):
+                pass
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        with open(run_file, 'w', encoding='utf-8') as f:
+            json.dump({'run_id': self.run_id, 'url': self.url, 'started_at': datetime.now().isoformat()}, f)
+        return self.run_id
+
+    def discard(self, stage: str):
+        """Drop a stage's checkpoint, e.g. once an earlier stage re-ran and made it stale"""
+        try:
+            self.path_for(stage).unlink()
+        except FileNotFoundError:
+            pass
+
+    def load(self, stage: str):
+        """State saved by ``stage``, or None when it has no usable checkpoint"""
+        try:
+            with open(self.path_for(stage), encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get('url') != self.url or checkpoint.get('run_id') != self.run_id:
+            return None
+        return checkpoint.get('state', {})
+
+    def save(self, stage: str, state: dict, seconds: float):
+        # Written to a temp file first so a crash never leaves half a checkpoint
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(stage)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'stage': stage,
+                'url': self.url,
+                'run_id': self.run_id,
+                'completed_at': datetime.now().isoformat(),
+                'seconds': round(seconds, 2),
+                'state': state
+            }, f, default=str)
+        os.replace(tmp, path)
+
+
+def current_rss_bytes():
+    """Resident set size of this process right now, or None without /proc"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RSSSampler:
+    """Samples RSS on a background thread to find the peak within one block
+
+    ``ru_maxrss`` only ever grows over the process lifetime, so it cannot
+    tell one stage's peak from an earlier one's.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_bytes() or 0)
+
+    def stop(self):
+        """Stop sampling; returns the peak RSS seen, or None where RSS cannot be read"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak = max(self.peak, current_rss_bytes() or 0)
+        return self.peak
+
+
+def peak_rss_bytes():
+    """Lifetime peak resident set size of this process, or None where it is unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageProfiler:
+    """Wall time, CPU time, peak RSS and counter deltas per clone stage
+
+    ``counters`` maps a name to a callable returning a running total (bytes
+    written, responses seen); each stage records how much it grew. A stage's
+    ``peak_rss_bytes`` is sampled while it runs; the summary also carries the
+    process high-water mark. ``evaluate(label)`` times one in-page script
+    call (see ``WebsiteCloner.evaluate``). All measurements are kept as
+    Chrome trace events for chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, counters: dict = None):
+        self.counters = counters or {}
+        self.stages = []
+        self.evaluates = {}
+        self.events = []
+        self.current_stage = None
+        self._origin = time.perf_counter()
+
+    def _trace_event(self, name: str, category: str, started: float, elapsed: float, tid: int, args: dict):
+        self.events.append({
+            'name': name, 'cat': category, 'ph': 'X', 'pid': 1, 'tid': tid,
+            'ts': round((started - self._origin) * 1e6), 'dur': round(elapsed * 1e6), 'args': args
+        })
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the enclosed block as one stage"""
+        self.current_stage = name
+        counters = {key: read() for key, read in self.counters.items()}
+        sampler = RSSSampler()
+        sampler.start()
+        started, cpu_started = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            record = {
+                'stage': name,
+                'wall_seconds': round(elapsed, 3),
+                'cpu_seconds': round(time.process_time() - cpu_started, 3),
+                'peak_rss_bytes': sampler.stop(),
+            }
+            for key, read in self.counters.items():
+                record[key] = read() - counters[key]
+            self.stages.append(record)
+            self._trace_event(name, 'stage', started, elapsed, 1, record)
+            self.current_stage = None
+
+    @contextmanager
+    def evaluate(self, caller: str):
+        """Time one in-page script call made by ``caller``"""
+        stage = self.current_stage
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = self.evaluates.setdefault((stage, caller), {
+                'stage': stage, 'caller': caller, 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            stats['calls'] += 1
+            stats['total_ms'] += elapsed * 1000
+            stats['max_ms'] = max(stats['max_ms'], elapsed * 1000)
+            self._trace_event(caller, 'evaluate', started, elapsed, 2, {'stage': stage})
+
+    def summary(self) -> dict:
+        evaluates = sorted(self.evaluates.values(), key=lambda e: e['total_ms'], reverse=True)
+        return {
+            'stages': self.stages,
+            'evaluates': [dict(e, total_ms=round(e['total_ms'], 1), max_ms=round(e['max_ms'], 1)) for e in evaluates],
+            'wall_seconds': round(sum(s['wall_seconds'] for s in self.stages), 3),
+            # Process high-water mark (ru_maxrss), including browser start-up
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+
+    def write_trace(self, path: Path):
+        """Chrome trace-event JSON (load in chrome://tracing or ui.perfetto.dev)"""
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+
+
+# Per-step ceilings (ms) for readiness-driven waits; a step returns as soon as
+# its conditions hold, so these only bound slow pages
+WAIT_TIMEOUTS = {
+    'load': 8000,          # after navigation
+    'scroll_pass': 3000,   # between lazy-load scroll passes
+    'after_scroll': 5000,  # after the final scroll pass
+    'viewport': 2000,      # after a viewport resize or on a fresh screenshot page
+    'scroll_to': 1000,     # after scrolling to an element or back to the top
+    'theme': 3000,         # after a theme toggle
+}
+
+NETWORK_QUIET_MS = 500
+DOM_QUIET_MS = 300
+
+# Long-lived requests that never "finish" and must not hold up network quiet
+NETWORK_IGNORED_TYPES = {'media', 'websocket', 'eventsource'}
+
+DOM_QUIET_JS = """
+async ({quietMs, timeoutMs}) => {
+    const settled = await new Promise(resolve => {
+        let quietTimer = null;
+        let hardTimer = null;
+        const observer = new MutationObserver(() => {
+            clearTimeout(quietTimer);
+            quietTimer = setTimeout(() => finish(true), quietMs);
+        });
+        const finish = (value) => {
+            observer.disconnect();
+            clearTimeout(quietTimer);
+            clearTimeout(hardTimer);
+            resolve(value);
+        };
+        observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+        quietTimer = setTimeout(() => finish(true), quietMs);
+        hardTimer = setTimeout(() => finish(false), timeoutMs);
+    });
+    // Let layout and paint catch up (rAF is throttled in hidden tabs, so cap it)
+    await Promise.race([
+        new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r))),
+        new Promise(r => setTimeout(r, 100))
+    ]);
+    return settled;
+}
+"""
+
+FONTS_READY_JS = """
+async (timeoutMs) => Promise.race([
+    document.fonts.ready.then(() => true),
+    new Promise(r => setTimeout(() => r(false), timeoutMs))
+])
+"""
+
+TRANSITIONS_DONE_JS = """
+async (timeoutMs) => {
+    // Give the toggle a frame to start its transitions
+    await Promise.race([
+        new Promise(r => requestAnimationFrame(() => r())),
+        new Promise(r => setTimeout(r, 50))
+    ]);
+    if (typeof CSSTransition === 'undefined') return true;
+    const running = document.getAnimations()
+        .filter(a => a instanceof CSSTransition && a.playState === 'running');
+    if (!running.length) return true;
+    return Promise.race([
+        Promise.allSettled(running.map(a => a.finished)).then(() => true),
+        new Promise(r => setTimeout(() => r(false), timeoutMs))
+    ]);
+}
+"""
+
+
+SCROLL_PASS_JS = """
+async ({stepDelayMs, maxSteps}) => {
+    const delay = ms => new Promise(r => setTimeout(r, ms));
+    const root = document.documentElement;
+    const startNodes = document.getElementsByTagName('*').length;
+    const startHeight = root.scrollHeight;
+
+    // Sentinel at the end of the document: the pass is done once it is visible
+    const sentinel = document.createElement('div');
+    sentinel.setAttribute('data-cloner-sentinel', '');
+    sentinel.style.cssText = 'width:1px;height:1px;';
+    document.body.appendChild(sentinel);
+    let reachedBottom = false;
+    const observer = new IntersectionObserver(entries => {
+        reachedBottom = entries.some(e => e.isIntersecting);
+    });
+    observer.observe(sentinel);
+
+    let steps = 0;
+    let y = 0;
+    while (steps < maxSteps) {
+        window.scrollTo(0, y);
+        steps++;
+        await delay(stepDelayMs);
+        // Lazy content appended after the sentinel pushes it back down
+        if (sentinel.nextElementSibling) document.body.appendChild(sentinel);
+        if (reachedBottom && !sentinel.nextElementSibling) break;
+        y += window.innerHeight;
+        // Pages that scroll an inner container never show the sentinel
+        if (y > root.scrollHeight + window.innerHeight) break;
+    }
+
+    observer.disconnect();
+    sentinel.remove();
+    window.scrollTo(0, 0);
+    return {
+        steps: steps,
+        reachedBottom: reachedBottom,
+        nodesAdded: document.getElementsByTagName('*').length - startNodes,
+        heightGrowth: root.scrollHeight - startHeight
+    };
+}
+"""
+
+
+# One fast scroll to the bottom and back, for sibling pages that only need
+# lazy content present (not the adaptive deep_scroll)
+QUICK_SCROLL_JS = """
+async () => {
+    const delay = ms => new Promise(r => setTimeout(r, ms));
+    for (let y = 0; y < document.body.scrollHeight; y += window.innerHeight) {
+        window.scrollTo(0, y);
+        await delay(50);
+    }
+    window.scrollTo(0, 0);
+}
+"""
+
+# Rendered colors of the root elements; unchanged colors mean no theme switch
+THEME_FINGERPRINT_JS = """
+() => [document.documentElement, document.body].map(el => {
+    const style = getComputedStyle(el);
+    return [style.backgroundColor, style.color, style.colorScheme].join('|');
+}).join(';')
+"""
+
+
+class PageReadiness:
+    """Tracks in-flight requests for one page and waits on readiness signals
+
+    Attach it right after the page is created so every request is counted.
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.inflight = set()
+        self.request_count = 0
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+
+    def _on_request(self, request):
+        self.request_count += 1
+        if request.resource_type not in NETWORK_IGNORED_TYPES:
+            self.inflight.add(request)
+
+    def _on_request_done(self, request):
+        self.inflight.discard(request)
+
+    async def network_quiet(self, timeout_ms: int, quiet_ms: int = NETWORK_QUIET_MS) -> bool:
+        """Wait until no tracked request has been in flight for ``quiet_ms``"""
+        loop = asyncio.get_running_loop()
+        started = last_busy = loop.time()
+        while (loop.time() - started) * 1000 < timeout_ms:
+            now = loop.time()
+            if self.inflight:
+                last_busy = now
+            elif (now - last_busy) * 1000 >= quiet_ms:
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+    async def fonts_ready(self, timeout_ms: int) -> bool:
+        return await self.page.evaluate(FONTS_READY_JS, timeout_ms)
+
+    async def dom_stable(self, timeout_ms: int, quiet_ms: int = DOM_QUIET_MS) -> bool:
+        return await self.page.evaluate(DOM_QUIET_JS, {'quietMs': quiet_ms, 'timeoutMs': timeout_ms})
+
+    async def transitions_done(self, timeout_ms: int) -> bool:
+        return await self.page.evaluate(TRANSITIONS_DONE_JS, timeout_ms)
+
+
+# Single-pass style collector: visits every element once, reads its computed
+# style once, and returns everything the palette, typography, animation,
+# background and design-system consumers need.
+STYLE_SCAN_JS = """
+() => {
+    const started = performance.now();
+
+    const rgbToHex = (rgb) => {
+        if (!rgb || rgb === 'transparent' || rgb === 'rgba(0, 0, 0, 0)') return null;
+        const match = rgb.match(/rgba?\\((\\d+),\\s*(\\d+),\\s*(\\d+)/);
+        if (!match) return rgb;
+        return '#' + [match[1], match[2], match[3]]
+            .map(x => parseInt(x).toString(16).padStart(2, '0'))
+            .join('');
+    };
+
+    const textTags = new Set(['H1','H2','H3','H4','H5','H6','P','SPAN','A','LI','BUTTON']);
+
+    const colors = new Set();
+    const fonts = new Set();
+    const typography = [];
+    const animatedElements = [];
+    const backgroundImages = [];
+    const design = {
+        colors: { backgrounds: [], texts: [], borders: [], all: [] },
+        gradients: new Set(),
+        shadows: new Set()
+    };
+    const seenHex = new Set();
+    const timedAnimations = [];
+    let maxDuration = 0;
+
+    const addHex = (value, bucket) => {
+        const hex = rgbToHex(value);
+        if (hex && !seenHex.has(hex)) {
+            seenHex.add(hex);
+            design.colors[bucket].push(hex);
+            design.colors.all.push(hex);
+        }
+    };
+
+    const elements = document.querySelectorAll('*');
+    for (const el of elements) {
+        const style = getComputedStyle(el);
+
+        const color = style.color;
+        const backgroundColor = style.backgroundColor;
+        const borderColor = style.borderColor;
+        const backgroundImage = style.backgroundImage;
+        const boxShadow = style.boxShadow;
+        const animationName = style.animationName;
+        const transition = style.transition;
+
+        // Palette and fonts
+        colors.add(color);
+        colors.add(backgroundColor);
+        colors.add(borderColor);
+        colors.add(style.outlineColor);
+        fonts.add(style.fontFamily);
+
+        // Typography details for the first 100 text elements
+        if (typography.length < 100 && textTags.has(el.tagName)) {
+            typography.push({
+                tag: el.tagName,
+                className: el.className,
+                fontFamily: style.fontFamily,
+                fontSize: style.fontSize,
+                fontWeight: style.fontWeight,
+                lineHeight: style.lineHeight,
+                letterSpacing: style.letterSpacing,
+                textTransform: style.textTransform,
+                color: color,
+                text: el.innerText?.substring(0, 50)
+            });
+        }
+
+        // Design system (hex colors, gradients, shadows)
+        addHex(backgroundColor, 'backgrounds');
+        addHex(color, 'texts');
+        addHex(borderColor, 'borders');
+        if (backgroundImage.includes('gradient')) design.gradients.add(backgroundImage);
+        if (boxShadow !== 'none') design.shadows.add(boxShadow);
+
+        // Animated elements
+        if (style.animation && style.animation !== 'none') {
+            animatedElements.push({
+                tag: el.tagName,
+                className: el.className,
+                id: el.id,
+                animation: style.animation,
+                animationName: animationName,
+                animationDuration: style.animationDuration,
+                animationTimingFunction: style.animationTimingFunction,
+                animationDelay: style.animationDelay,
+                animationIterationCount: style.animationIterationCount,
+                animationDirection: style.animationDirection,
+                animationFillMode: style.animationFillMode
+            });
+        }
+        if (transition && transition !== 'none' && transition !== 'all 0s ease 0s') {
+            animatedElements.push({
+                tag: el.tagName,
+                className: el.className,
+                id: el.id,
+                transition: transition,
+                transitionProperty: style.transitionProperty,
+                transitionDuration: style.transitionDuration,
+                transitionTimingFunction: style.transitionTimingFunction
+            });
+        }
+
+        // Animation timings for the capture duration estimate
+        const label = el.tagName + ((el.getAttribute('class') || '').split(' ')[0] ? '.' + el.getAttribute('class').split(' ')[0] : '');
+        if (animationName && animationName !== 'none') {
+            const duration = parseFloat(style.animationDuration) || 0;
+            const delay = parseFloat(style.animationDelay) || 0;
+            const iterations = style.animationIterationCount === 'infinite' ? 1 : parseFloat(style.animationIterationCount) || 1;
+            const totalDuration = (duration + delay) * iterations;
+            if (duration > 0) {
+                timedAnimations.push({
+                    element: label,
+                    name: animationName,
+                    duration: duration,
+                    delay: delay,
+                    iterations: style.animationIterationCount,
+                    totalDuration: totalDuration
+                });
+                maxDuration = Math.max(maxDuration, totalDuration);
+            }
+        }
+        const transitionDuration = style.transitionDuration;
+        if (transitionDuration && transitionDuration !== '0s') {
+            const duration = parseFloat(transitionDuration) || 0;
+            if (duration > 0.5) { // Only track significant transitions
+                timedAnimations.push({
+                    element: label,
+                    type: 'transition',
+                    duration: duration,
+                    property: style.transitionProperty
+                });
+            }
+        }
+
+        // Background images
+        if (backgroundImage && backgroundImage !== 'none') {
+            backgroundImages.push({
+                tag: el.tagName,
+                className: el.className,
+                backgroundImage: backgroundImage,
+                backgroundSize: style.backgroundSize,
+                backgroundPosition: style.backgroundPosition,
+                backgroundRepeat: style.backgroundRepeat
+            });
+        }
+    }
+
+    // CSS variables from :root
+    const cssVariables = {};
+    const rootStyles = getComputedStyle(document.documentElement);
+    for (let i = 0; i < rootStyles.length; i++) {
+        const prop = rootStyles[i];
+        if (prop.startsWith('--')) {
+            cssVariables[prop] = rootStyles.getPropertyValue(prop).trim();
+        }
+    }
+
+    return {
+        elementCount: elements.length,
+        scanMs: performance.now() - started,
+        cssVariables: cssVariables,
+        colors: [...colors].filter(c => c && c !== 'rgba(0, 0, 0, 0)' && c !== 'transparent'),
+        fonts: [...fonts].filter(f => f),
+        typography: typography,
+        animations: animatedElements,
+        backgroundImages: backgroundImages,
+        designSystem: {
+            colors: design.colors,
+            gradients: [...design.gradients].slice(0, 10),
+            shadows: [...design.shadows].slice(0, 10)
+        },
+        animationTimings: {
+            animations: timedAnimations,
+            maxDuration: maxDuration,
+            suggestedCaptureDuration: Math.min(Math.max(maxDuration, 5), 30) // Between 5-30 seconds
+        }
+    };
+}
+"""
+
+
+# DOMSnapshot extraction backend: the computed properties the style collector
+# and component tree read, fetched for every rendered node in one CDP call
+SNAPSHOT_STYLES = [
+    'color', 'background-color', 'border-color', 'outline-color',
+    'font-family', 'font-size', 'font-weight', 'line-height', 'letter-spacing', 'text-transform',
+    'background-image', 'background-size', 'background-position', 'background-repeat', 'box-shadow',
+    'animation', 'animation-name', 'animation-duration', 'animation-timing-function', 'animation-delay',
+    'animation-iteration-count', 'animation-direction', 'animation-fill-mode',
+    'transition', 'transition-property', 'transition-duration', 'transition-timing-function',
+    'display', 'position', 'flex-direction', 'justify-content', 'align-items', 'gap',
+]
+
+EXTRACTION_BACKENDS = ('js', 'domsnapshot')
+
+# Custom properties cannot be whitelisted, so :root variables are read directly
+ROOT_VARIABLES_JS = """
+() => {
+    const cssVariables = {};
+    const rootStyles = getComputedStyle(document.documentElement);
+    for (let i = 0; i < rootStyles.length; i++) {
+        const prop = rootStyles[i];
+        if (prop.startsWith('--')) cssVariables[prop] = rootStyles.getPropertyValue(prop).trim();
+    }
+    return cssVariables;
+}
+"""
+
+SNAPSHOT_TEXT_TAGS = {'H1', 'H2', 'H3', 'H4', 'H5', 'H6', 'P', 'SPAN', 'A', 'LI', 'BUTTON'}
+COMPONENT_TAGS = {'header', 'nav', 'main', 'section', 'article', 'aside', 'footer', 'div', 'button', 'a', 'video', 'img'}
+
+
+def css_float(value: str) -> float:
+    """JavaScript ``parseFloat`` of a CSS value: the leading number, or 0"""
+    match = re.match(r'\s*([-+]?(?:\d+\.?\d*|\.\d+))', value or '')
+    return float(match.group(1)) if match else 0.0
+
+
+def rgb_to_hex(value: str):
+    """``#rrggbb`` for an rgb()/rgba() color, None for transparent"""
+    if not value or value in ('transparent', 'rgba(0, 0, 0, 0)'):
+        return None
+    match = re.match(r'rgba?\((\d+),\s*(\d+),\s*(\d+)', value)
+    if not match:
+        return value
+    return '#' + ''.join(f"{int(x):02x}" for x in match.groups())
+
+
+class DOMSnapshotView:
+    """Decoded main-document view of a ``DOMSnapshot.captureSnapshot`` result
+
+    The snapshot is columnar and string-table indexed; this resolves only
+    what is asked for. Computed styles and bounds exist for rendered nodes
+    only, so elements without a layout object (display: none, <head>) are
+    absent from ``styled``.
+    """
+
+    def __init__(self, snapshot: dict, properties: list = SNAPSHOT_STYLES):
+        self.strings = snapshot['strings']
+        document = snapshot['documents'][0]
+        nodes = document['nodes']
+        self.parent = nodes['parentIndex']
+        self.node_type = nodes['nodeType']
+        self._names = nodes['nodeName']
+        self._values = nodes.get('nodeValue', [])
+        self._attributes = nodes.get('attributes', [])
+        self.properties = {name: i for i, name in enumerate(properties)}
+
+        self.children = [[] for _ in self.parent]
+        for index, parent in enumerate(self.parent):
+            if parent >= 0:
+                self.children[parent].append(index)
+
+        # First layout entry per element node, in document order
+        layout = document['layout']
+        self.styled = {}
+        self.bounds = {}
+        for position, node in enumerate(layout['nodeIndex']):
+            if self.node_type[node] == 1 and node not in self.styled and not self.name(node).startswith('::'):
+                self.styled[node] = layout['styles'][position]
+                self.bounds[node] = layout['bounds'][position] if layout.get('bounds') else None
+
+    def string(self, index: int) -> str:
+        return self.strings[index] if index is not None and index >= 0 else ''
+
+    def name(self, node: int) -> str:
+        return self.string(self._names[node])
+
+    def value(self, node: int) -> str:
+        return self.string(self._values[node]) if node < len(self._values) else ''
+
+    def attribute(self, node: int, name: str):
+        attrs = self._attributes[node] if node < len(self._attributes) else []
+        for i in range(0, len(attrs), 2):
+            if self.strings[attrs[i]] == name:
+                return self.strings[attrs[i + 1]]
+        return None
+
+    def style(self, node: int) -> dict:
+        """Whitelisted computed properties of a rendered element ({} if not rendered)"""
+        values = self.styled.get(node)
+        if values is None:
+            return {}
+        return {name: self.string(values[i]) for name, i in self.properties.items()}
+
+    def element_children(self, node: int) -> list:
+        return [c for c in self.children[node] if self.node_type[c] == 1 and not self.name(c).startswith('::')]
+
+    def text(self, node: int, limit: int = 50) -> str:
+        """Approximate innerText: descendant text nodes, whitespace collapsed"""
+        parts, stack, length = [], [node], 0
+        while stack and length < limit * 2:
+            current = stack.pop()
+            if self.node_type[current] == 3:
+                parts.append(self.value(current))
+                length += len(parts[-1])
+            elif self.name(current) not in ('SCRIPT', 'STYLE'):
+                stack.extend(reversed(self.children[current]))
+        return ' '.join(' '.join(parts).split())[:limit]
+
+    def find(self, tag: str):
+        return next((i for i, n in enumerate(self._names) if self.node_type[i] == 1 and self.string(n) == tag), None)
+
+
+def scan_from_snapshot(view: DOMSnapshotView, css_variables: dict) -> dict:
+    """The ``STYLE_SCAN_JS`` result, rebuilt from a DOM snapshot"""
+    colors, fonts = {}, {}
+    typography, animated, background_images, timed = [], [], [], []
+    design_colors = {'backgrounds': [], 'texts': [], 'borders': [], 'all': []}
+    gradients, shadows, seen_hex = {}, {}, set()
+    max_duration = 0.0
+
+    def add_hex(value, bucket):
+        hex_value = rgb_to_hex(value)
+        if hex_value and hex_value not in seen_hex:
+            seen_hex.add(hex_value)
+            design_colors[bucket].append(hex_value)
+            design_colors['all'].append(hex_value)
+
+    for node in view.styled:
+        style = view.style(node)
+        tag = view.name(node)
+        class_name = view.attribute(node, 'class') or ''
+        color, background_color = style['color'], style['background-color']
+        border_color, background_image = style['border-color'], style['background-image']
+
+        for value in (color, background_color, border_color, style['outline-color']):
+            colors.setdefault(value, None)
+        fonts.setdefault(style['font-family'], None)
+
+        if len(typography) < 100 and tag in SNAPSHOT_TEXT_TAGS:
+            typography.append({
+                'tag': tag, 'className': class_name,
+                'fontFamily': style['font-family'], 'fontSize': style['font-size'],
+                'fontWeight': style['font-weight'], 'lineHeight': style['line-height'],
+                'letterSpacing': style['letter-spacing'], 'textTransform': style['text-transform'],
+                'color': color, 'text': view.text(node)
+            })
+
+        add_hex(background_color, 'backgrounds')
+        add_hex(color, 'texts')
+        add_hex(border_color, 'borders')
+        if 'gradient' in background_image:
+            gradients.setdefault(background_image, None)
+        if style['box-shadow'] not in ('none', ''):
+            shadows.setdefault(style['box-shadow'], None)
+
+        element_id = view.attribute(node, 'id') or ''
+        if style['animation'] and style['animation'] != 'none':
+            animated.append({
+                'tag': tag, 'className': class_name, 'id': element_id,
+                'animation': style['animation'], 'animationName': style['animation-name'],
+                'animationDuration': style['animation-duration'],
+                'animationTimingFunction': style['animation-timing-function'],
+                'animationDelay': style['animation-delay'],
+                'animationIterationCount': style['animation-iteration-count'],
+                'animationDirection': style['animation-direction'],
+                'animationFillMode': style['animation-fill-mode']
+            })
+        transition = style['transition']
+        if transition and transition not in ('none', 'all 0s ease 0s'):
+            animated.append({
+                'tag': tag, 'className': class_name, 'id': element_id,
+                'transition': transition, 'transitionProperty': style['transition-property'],
+                'transitionDuration': style['transition-duration'],
+                'transitionTimingFunction': style['transition-timing-function']
+            })
+
+        first_class = class_name.split(' ')[0]
+        label = tag + ('.' + first_class if first_class else '')
+        if style['animation-name'] and style['animation-name'] != 'none':
+            duration = css_float(style['animation-duration'])
+            delay = css_float(style['animation-delay'])
+            iteration_count = style['animation-iteration-count']
+            iterations = 1 if iteration_count == 'infinite' else (css_float(iteration_count) or 1)
+            total = (duration + delay) * iterations
+            if duration > 0:
+                timed.append({'element': label, 'name': style['animation-name'], 'duration': duration,
+                              'delay': delay, 'iterations': iteration_count, 'totalDuration': total})
+                max_duration = max(max_duration, total)
+        if style['transition-duration'] and style['transition-duration'] != '0s':
+            duration = css_float(style['transition-duration'])
+            if duration > 0.5:
+                timed.append({'element': label, 'type': 'transition', 'duration': duration,
+                              'property': style['transition-property']})
+
+        if background_image and background_image != 'none':
+            background_images.append({
+                'tag': tag, 'className': class_name, 'backgroundImage': background_image,
+                'backgroundSize': style['background-size'],
+                'backgroundPosition': style['background-position'],
+                'backgroundRepeat': style['background-repeat']
+            })
+
+    return {
+        'elementCount': len(view.styled),
+        'cssVariables': css_variables,
+        'colors': [c for c in colors if c and c not in ('rgba(0, 0, 0, 0)', 'transparent')],
+        'fonts': [f for f in fonts if f],
+        'typography': typography,
+        'animations': animated,
+        'backgroundImages': background_images,
+        'designSystem': {
+            'colors': design_colors,
+            'gradients': list(gradients)[:10],
+            'shadows': list(shadows)[:10]
+        },
+        'animationTimings': {
+            'animations': timed,
+            'maxDuration': max_duration,
+            'suggestedCaptureDuration': min(max(max_duration, 5), 30)
+        }
+    }
+
+
+def component_tree_from_snapshot(view: DOMSnapshotView):
+    """The ``extract_component_structure`` tree, rebuilt from a DOM snapshot"""
+    def component(node: int, depth: int = 0):
+        if depth > 5:
+            return None
+        style = view.style(node)
+        bounds = view.bounds.get(node) or [0, 0, 0, 0]
+        class_name = view.attribute(node, 'class') or ''
+        first = view.children[node][0] if view.children[node] else None
+        result = {
+            'tag': view.name(node).lower(),
+            'id': view.attribute(node, 'id') or None,
+            'classes': [c for c in class_name.split(' ') if c],
+            'role': view.attribute(node, 'role'),
+            'text': view.value(first).strip()[:50] if first is not None and view.node_type[first] == 3 else None,
+            'dimensions': {'width': round(bounds[2]), 'height': round(bounds[3])},
+            'layout': {
+                'display': style.get('display', 'none'),
+                'position': style.get('position'),
+                'flexDirection': style.get('flex-direction'),
+                'justifyContent': style.get('justify-content'),
+                'alignItems': style.get('align-items'),
+                'gap': style.get('gap'),
+            },
+            'children': []
+        }
+        for child in view.element_children(node):
+            if view.name(child).lower() in COMPONENT_TAGS or view.attribute(child, 'class'):
+                child_component = component(child, depth + 1)
+                if child_component:
+                    result['children'].append(child_component)
+        return result
+
+    body = view.find('BODY')
+    return component(body) if body is not None else None
+
+
+# Width (px) of the grayscale thumbnails compared in frame-differencing capture
+FRAME_DIFF_WIDTH = 160
+
+# Per-pixel luma change (0-255) that counts as a changed pixel
+FRAME_DIFF_PIXEL_DELTA = 16
+
+ANIMATION_MODES = ('interval', 'diff', 'virtual')
+
+# Upper bound on keyframe states rendered in virtual-time capture
+VIRTUAL_MAX_FRAMES = 60
+
+
+def png_to_luma(data: bytes) -> bytes:
+    """Decode an 8-bit non-interlaced PNG into one luma byte per pixel
+
+    Only meant for the small screenshots Chromium produces for frame
+    differencing, so a pure-Python decoder is fast enough.
+    """
+    if data[:8] != b'\x89PNG\r\n\x1a\n':
+        raise ValueError("Not a PNG")
+    pos = 8
+    idat = []
+    width = height = depth = color = interlace = None
+    while pos < len(data):
+        length = int.from_bytes(data[pos:pos + 4], 'big')
+        chunk_type = data[pos + 4:pos + 8]
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if chunk_type == b'IHDR':
+            width, height, depth, color, _, _, interlace = struct.unpack('>IIBBBBB', chunk)
+        elif chunk_type == b'IDAT':
+            idat.append(chunk)
+        elif chunk_type == b'IEND':
+            break
+    if depth != 8 or interlace or color not in (0, 2, 4, 6):
+        raise ValueError(f"Unsupported PNG (depth={depth}, color={color}, interlace={interlace})")
+
+    channels = {0: 1, 2: 3, 4: 2, 6: 4}[color]
+    stride = width * channels
+    raw = zlib.decompress(b''.join(idat))
+    previous = bytearray(stride)
+    luma = bytearray(width * height)
+    offset = 0
+    for y in range(height):
+        filter_type = raw[offset]
+        line = bytearray(raw[offset + 1:offset + 1 + stride])
+        offset += 1 + stride
+        if filter_type == 1:
+            for x in range(channels, stride):
+                line[x] = (line[x] + line[x - channels]) & 0xFF
+        elif filter_type == 2:
+            for x in range(stride):
+                line[x] = (line[x] + previous[x]) & 0xFF
+        elif filter_type == 3:
+            for x in range(stride):
+                left = line[x - channels] if x >= channels else 0
+                line[x] = (line[x] + ((left + previous[x]) >> 1)) & 0xFF
+        elif filter_type == 4:
+            for x in range(stride):
+                a = line[x - channels] if x >= channels else 0
+                b = previous[x]
+                c = previous[x - channels] if x >= channels else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                line[x] = (line[x] + predictor) & 0xFF
+        previous = line
+
+        row = y * width
+        if channels >= 3:
+            for x in range(width):
+                i = x * channels
+                luma[row + x] = (line[i] * 299 + line[i + 1] * 587 + line[i + 2] * 114) // 1000
+        else:
+            luma[row:row + width] = line[0:stride:channels]
+    return bytes(luma)
+
+
+def luma_diff(a: bytes, b: bytes) -> float:
+    """Fraction of pixels whose luma differs by more than FRAME_DIFF_PIXEL_DELTA"""
+    if a is None or b is None or len(a) != len(b):
+        return 1.0
+    changed = sum(1 for x, y in zip(a, b) if abs(x - y) > FRAME_DIFF_PIXEL_DELTA)
+    return changed / len(a) if a else 0.0
+
+
+class ScreencastEncoder:
+    """Streams CDP screencast frames to disk instead of buffering them
+
+    ``submit()`` never blocks the CDP event handler: at most ``max_queued``
+    frames wait in memory and anything beyond that is dropped and counted.
+    A worker decodes frames off the event loop, writes the first
+    ``max_png_frames`` as PNGs and, when ffmpeg is on PATH, pipes every frame
+    into a WebM encoder.
+    """
+
+    def __init__(self, out_dir: Path, max_png_frames: int = 50, max_queued: int = 32, fps: int = 30):
+        self.out_dir = Path(out_dir)
+        self.max_png_frames = max_png_frames
+        self.fps = fps
+        self.queue = asyncio.Queue(maxsize=max_queued)
+        self.ffmpeg = None
+        self.video_path = None
+        self._worker = None
+        self.frames_received = 0
+        self.frames_written = 0
+        self.frames_encoded = 0
+        self.frames_dropped = 0
+
+    async def start(self):
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg:
+            self.video_path = self.out_dir / "hero.webm"
+            self.ffmpeg = await asyncio.create_subprocess_exec(
+                ffmpeg, '-loglevel', 'error', '-y',
+                '-f', 'image2pipe', '-framerate', str(self.fps), '-i', '-',
+                '-c:v', 'libvpx-vp9', '-b:v', '2M', '-pix_fmt', 'yuv420p',
+                str(self.video_path),
+                stdin=asyncio.subprocess.PIPE
+            )
+        self._worker = asyncio.ensure_future(self._drain())
+
+    def submit(self, data: str):
+        """Queue one base64 frame; drops it if the pipeline is behind"""
+        self.frames_received += 1
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.frames_dropped += 1
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            data = await self.queue.get()
+            if data is None:
+                break
+            wants_png = self.frames_written < self.max_png_frames
+            if not wants_png and self.ffmpeg is None:
+                continue
+            frame = await loop.run_in_executor(None, base64.b64decode, data)
+            if wants_png:
+                frame_path = self.out_dir / f"hero_frame_{self.frames_written:04d}.png"
+                await loop.run_in_executor(None, frame_path.write_bytes, frame)
+                self.frames_written += 1
+            if self.ffmpeg is not None:
+                try:
+                    self.ffmpeg.stdin.write(frame)
+                    await self.ffmpeg.stdin.drain()
+                    self.frames_encoded += 1
+                except (BrokenPipeError, ConnectionResetError):
+                    self.ffmpeg = None
+
+    async def close(self) -> dict:
+        """Finish pending frames and the encoder; returns capture statistics"""
+        await self.queue.put(None)
+        await self._worker
+        video = None
+        if self.ffmpeg is not None:
+            self.ffmpeg.stdin.close()
+            if await self.ffmpeg.wait() == 0 and self.frames_encoded:
+                video = str(self.video_path)
+        return {
+            'frames_received': self.frames_received,
+            'frames_written': self.frames_written,
+            'frames_encoded': self.frames_encoded,
+            'frames_dropped': self.frames_dropped,
+            'video': video,
+        }
+
+
+def replace_file(path: Path, body: bytes):
+    """Write ``body`` to ``path`` through a temp file and rename
+
+    Renaming over ``path`` replaces the directory entry rather than writing
+    into the file it points at, so a hardlink or symlink left by an earlier
+    ``--asset-store`` run is swapped out instead of overwriting the store.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class AssetStore:
+    """Content-addressed asset store shared across runs and output directories
+
+    Bodies live once under ``<root>/<sha256[:2]>/<sha256>`` and are linked into
+    each clone's ``assets/`` tree: a hardlink where possible, a symlink across
+    filesystems, and a plain copy as the last resort.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, body: bytes, digest: str) -> bool:
+        """Store ``body`` under its digest; returns False if it was already stored"""
+        target = self.path_for(digest)
+        if target.exists():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent clones never see a partial body
+        replace_file(target, body)
+        return True
+
+    def put_file(self, source: Path, digest: str) -> bool:
+        """Move a file already on disk into the store; returns False if the digest was stored
+
+        ``source`` is consumed either way. Used for bodies streamed to disk
+        (media) that were never held in memory.
+        """
+        target = self.path_for(digest)
+        if target.exists():
+            source.unlink(missing_ok=True)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(source, target)
+        except OSError:
+            # Store on another filesystem: copy beside the target, then rename
+            tmp = target.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                shutil.copyfile(source, tmp)
+                os.replace(tmp, target)
+            finally:
+                tmp.unlink(missing_ok=True)
+                source.unlink(missing_ok=True)
+        return True
+
+    def link(self, digest: str, dest: Path) -> str:
+        """Materialize a stored body at ``dest``; returns the link method used"""
+        source = self.path_for(digest)
+        if dest.exists() or dest.is_symlink():
+            if dest.exists() and os.path.samefile(source, dest):
+                return 'existing'
+            dest.unlink()
+        try:
+            os.link(source, dest)
+            return 'hardlink'
+        except OSError:
+            pass
+        try:
+            os.symlink(source.resolve(), dest)
+            return 'symlink'
+        except OSError:
+            shutil.copyfile(source, dest)
+            return 'copy'
+
+
+class AssetWriter:
+    """Writes captured asset bodies on a thread pool, off the event loop
+
+    ``write()`` applies backpressure: once ``max_pending_bytes`` are queued it
+    waits for earlier writes to land before accepting more. ``flush()`` is the
+    barrier to await before anything reads the asset tree or writes manifests.
+
+    Every body is hashed (sha256) on the pool and the digest recorded on its
+    manifest entry. With an ``AssetStore`` the body is written to the store
+    only if new and then linked into place.
+    """
+
+    def __init__(self, workers: int = 4, max_pending_bytes: int = 64 * 1024 * 1024,
+                 store: AssetStore = None):
+        self.max_pending_bytes = max_pending_bytes
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asset-writer')
+        self._pending = set()
+        self._pending_bytes = 0
+        self._capacity = asyncio.Condition()
+        self.files_written = 0
+        self.bytes_written = 0
+        self.bytes_deduplicated = 0
+        self.files_unchanged = 0
+        self.errors = []
+        self._stats_lock = threading.Lock()
+
+    async def write(self, path: Path, body: bytes, entry: dict = None, previous_digest: str = None):
+        """Queue ``body`` for writing to ``path``, waiting while the queue is full
+
+        If the body hashes to ``previous_digest`` and ``path`` already exists,
+        the file is left untouched.
+        """
+        size = len(body)
+        async with self._capacity:
+            # A single oversized body is still accepted once the queue drains
+            await self._capacity.wait_for(
+                lambda: self._pending_bytes == 0 or self._pending_bytes + size <= self.max_pending_bytes
+            )
+            self._pending_bytes += size
+
+        task = asyncio.ensure_future(self._run(path, body, entry, previous_digest))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _run(self, path: Path, body: bytes, entry: dict = None, previous_digest: str = None):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._store_file, path, body, entry, previous_digest)
+        except Exception as e:
+            self.errors.append({'path': str(path), 'error': str(e)})
+            if entry is not None:
+                entry['write_error'] = str(e)
+        finally:
+            async with self._capacity:
+                self._pending_bytes -= len(body)
+                self._capacity.notify_all()
+
+    def _store_file(self, path: Path, body: bytes, entry: dict = None, previous_digest: str = None):
+        digest = hashlib.sha256(body).hexdigest()
+        written = len(body)
+        if digest == previous_digest and path.exists():
+            with self._stats_lock:
+                self.files_unchanged += 1
+            if entry is not None:
+                entry['sha256'] = digest
+                entry['unchanged'] = True
+                if self.store is not None:
+                    # The file in place is the link made by the earlier store run
+                    entry['store_path'] = str(self.store.path_for(digest))
+                    entry['store_link'] = 'existing'
+            return
+        if self.store is None:
+            # Never write in place: the path may still link into a store
+            replace_file(path, body)
+        else:
+            if not self.store.put(body, digest):
+                written = 0
+            method = self.store.link(digest, path)
+            if entry is not None:
+                entry['store_path'] = str(self.store.path_for(digest))
+                entry['store_link'] = method
+        with self._stats_lock:
+            self.files_written += 1
+            self.bytes_written += written
+            self.bytes_deduplicated += len(body) - written
+        if entry is not None:
+            entry['sha256'] = digest
+
+    async def flush(self):
+        """Wait until every queued write has landed on disk"""
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+# Asset classification: one URL parse and table lookups per response. A
+# specific MIME type wins, then the file extension; generic binary responses
+# are settled by magic bytes once their body has been read.
+EXTENSION_CATEGORIES = {
+    **dict.fromkeys(('.woff2', '.woff', '.ttf', '.otf', '.eot', '.ttc'), 'font'),
+    '.css': 'css',
+    **dict.fromkeys(('.js', '.mjs', '.cjs'), 'js'),
+    **dict.fromkeys(('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico', '.bmp'), 'image'),
+    **dict.fromkeys(('.mp4', '.webm', '.mov', '.avi', '.m4v', '.mp3', '.m4a', '.ogg', '.wav'), 'media'),
+    '.m3u8': 'hls',
+    '.mpd': 'dash',
+    # Stream segments are only saved as part of their reassembled manifest
+    **dict.fromkeys(('.ts', '.m4s', '.cmfv', '.cmfa', '.aac'), 'segment'),
+    '.riv': 'rive',
+}
+
+MIME_CATEGORIES = {
+    'text/css': 'css',
+    **dict.fromkeys(('application/javascript', 'text/javascript', 'application/x-javascript',
+                     'application/ecmascript', 'text/ecmascript'), 'js'),
+    **dict.fromkeys(('application/font-woff', 'application/font-woff2', 'application/x-font-woff',
+                     'application/x-font-ttf', 'application/x-font-otf', 'application/vnd.ms-fontobject'), 'font'),
+    **dict.fromkeys(('application/vnd.apple.mpegurl', 'application/x-mpegurl', 'audio/mpegurl',
+                     'audio/x-mpegurl'), 'hls'),
+    'application/dash+xml': 'dash',
+    **dict.fromkeys(('video/mp2t', 'video/iso.segment'), 'segment'),
+}
+
+MIME_PREFIX_CATEGORIES = (('font/', 'font'), ('image/', 'image'), ('video/', 'media'), ('audio/', 'media'))
+
+# Content types that say nothing about the payload
+GENERIC_MIME_TYPES = {'', 'application/octet-stream', 'binary/octet-stream', 'application/binary'}
+
+MAGIC_SIGNATURES = (
+    (0, b'wOF2', 'font'), (0, b'wOFF', 'font'), (0, b'OTTO', 'font'), (0, b'\x00\x01\x00\x00', 'font'),
+    (0, b'ttcf', 'font'),
+    (0, b'\x89PNG', 'image'), (0, b'\xff\xd8\xff', 'image'), (0, b'GIF8', 'image'), (8, b'WEBP', 'image'),
+    (4, b'ftyp', 'media'), (0, b'\x1aE\xdf\xa3', 'media'), (0, b'ID3', 'media'), (0, b'OggS', 'media'),
+    (0, b'RIVE', 'rive'),
+)
+
+
+def classify_asset(url: str, content_type: str) -> tuple:
+    """``(category, classified_by)`` from the MIME type and URL path
+
+    ``category`` is one of font, css, js, image, media, hls, dash, segment,
+    rive or None; ``classified_by`` is 'mime', 'extension', or None when the
+    body has to be sniffed (see ``sniff_asset``) or the response is no asset.
+    """
+    mime = content_type.split(';', 1)[0].strip().lower()
+    category = MIME_CATEGORIES.get(mime)
+    if category is None and mime not in GENERIC_MIME_TYPES:
+        category = next((c for prefix, c in MIME_PREFIX_CATEGORIES if mime.startswith(prefix)), None)
+    if category is not None:
+        return category, 'mime'
+    category = EXTENSION_CATEGORIES.get(os.path.splitext(urlparse(url).path)[1].lower())
+    if category is not None:
+        return category, 'extension'
+    return None, None
+
+
+# Categories handed to capture_media
+MEDIA_CATEGORIES = ('media', 'hls', 'dash', 'segment')
+
+
+def needs_sniffing(content_type: str) -> bool:
+    """Whether an unclassified response is worth reading to check its magic bytes"""
+    return content_type.split(';', 1)[0].strip().lower() in GENERIC_MIME_TYPES
+
+
+def sniff_asset(body: bytes):
+    """Category from the leading magic bytes of a body, or None"""
+    for offset, signature, category in MAGIC_SIGNATURES:
+        if body[offset:offset + len(signature)] == signature:
+            return category
+    return None
+
+
+MEDIA_CHUNK_SIZE = 1024 * 1024
+MEDIA_MAX_BYTES = 512 * 1024 * 1024
+
+
+def parse_hls_playlist(text: str, base_url: str) -> dict:
+    """Variants of a master playlist, or the init map and segments of a media playlist"""
+    playlist = {'variants': [], 'init': None, 'segments': [], 'encrypted': False}
+    bandwidth = None
+    for line in (line.strip() for line in text.splitlines()):
+        if line.startswith('#EXT-X-STREAM-INF'):
+            match = re.search(r'BANDWIDTH=(\d+)', line)
+            bandwidth = int(match.group(1)) if match else 0
+        elif line.startswith('#EXT-X-MAP'):
+            match = re.search(r'URI="([^"]+)"', line)
+            if match:
+                playlist['init'] = urljoin(base_url, match.group(1))
+        elif line.startswith('#EXT-X-KEY') and 'METHOD=NONE' not in line:
+            playlist['encrypted'] = True
+        elif line and not line.startswith('#'):
+            if bandwidth is not None:
+                playlist['variants'].append((bandwidth, urljoin(base_url, line)))
+                bandwidth = None
+            else:
+                playlist['segments'].append(urljoin(base_url, line))
+    return playlist
+
+
+def parse_iso_duration(value: str) -> float:
+    """Seconds in an ISO 8601 duration such as ``PT1M30.5S``"""
+    match = re.fullmatch(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:([\d.]+)S)?)?', (value or '').strip())
+    if not match:
+        return 0.0
+    days, hours, minutes, seconds = (float(g) if g else 0.0 for g in match.groups())
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+
+def _fill_dash_template(template: str, representation_id: str, bandwidth: int, number: int = None, time_: int = None) -> str:
+    def substitute(match):
+        name, fmt = match.group(1), match.group(2)
+        if name == '':
+            return '$'
+        value = {'RepresentationID': representation_id, 'Bandwidth': bandwidth,
+                 'Number': number, 'Time': time_}.get(name)
+        if value is None:
+            return match.group(0)
+        return (fmt % value) if fmt else str(value)
+    return re.sub(r'\$(RepresentationID|Bandwidth|Number|Time|)(%0\d+d)?\$', substitute, template)
+
+
+def parse_dash_manifest(text: str, base_url: str) -> list:
+    """Highest-bandwidth representation of each audio/video adaptation set of a static MPD
+
+    Each track is ``{'kind', 'representation', 'bandwidth', 'init', 'segments'}``;
+    SegmentList, SegmentTemplate (with or without SegmentTimeline) and single
+    BaseURL files are supported.
+    """
+    import xml.etree.ElementTree as ET
+
+    def local(el) -> str:
+        return el.tag.rsplit('}', 1)[-1]
+
+    def child(*els_and_name):
+        # First match on the given elements in order (Elements without children are falsy)
+        *els, name = els_and_name
+        for el in els:
+            found = next((c for c in el if local(c) == name), None)
+            if found is not None:
+                return found
+        return None
+
+    def children(el, name):
+        return [c for c in el if local(c) == name]
+
+    def resolve_base(el, base):
+        base_el = child(el, 'BaseURL')
+        return urljoin(base, base_el.text.strip()) if base_el is not None and base_el.text else base
+
+    mpd = ET.fromstring(text)
+    if mpd.get('type') == 'dynamic':
+        return []
+    tracks = []
+    base = resolve_base(mpd, base_url)
+    for period in children(mpd, 'Period'):
+        period_base = resolve_base(period, base)
+        period_seconds = parse_iso_duration(period.get('duration') or mpd.get('mediaPresentationDuration'))
+        for adaptation in children(period, 'AdaptationSet'):
+            representations = children(adaptation, 'Representation')
+            if not representations:
+                continue
+            best = max(representations, key=lambda r: int(r.get('bandwidth') or 0))
+            mime = best.get('mimeType') or adaptation.get('mimeType') or ''
+            kind = adaptation.get('contentType') or mime.split('/')[0]
+            if kind not in ('video', 'audio'):
+                continue
+            rep_id = best.get('id', '')
+            bandwidth = int(best.get('bandwidth') or 0)
+            rep_base = resolve_base(best, resolve_base(adaptation, period_base))
+            track = {'kind': kind, 'representation': rep_id, 'bandwidth': bandwidth, 'init': None, 'segments': []}
+
+            segment_list = child(best, adaptation, 'SegmentList')
+            template = child(best, adaptation, 'SegmentTemplate')
+            if segment_list is not None:
+                init = child(segment_list, 'Initialization')
+                if init is not None and init.get('sourceURL'):
+                    track['init'] = urljoin(rep_base, init.get('sourceURL'))
+                track['segments'] = [urljoin(rep_base, s.get('media')) for s in children(segment_list, 'SegmentURL')
+                                     if s.get('media')]
+            elif template is not None:
+                if template.get('initialization'):
+                    track['init'] = urljoin(rep_base, _fill_dash_template(template.get('initialization'), rep_id, bandwidth))
+                media = template.get('media', '')
+                number = int(template.get('startNumber') or 1)
+                timescale = int(template.get('timescale') or 1)
+                timeline = child(template, 'SegmentTimeline')
+                if timeline is not None:
+                    t = 0
+                    for s in children(timeline, 'S'):
+                        t = int(s.get('t', t))
+                        duration = int(s.get('d'))
+                        repeat = int(s.get('r') or 0)
+                        if repeat < 0:
+                            # Repeat until the end of the period
+                            repeat = max(0, int((period_seconds * timescale - t) // duration) - 1)
+                        for _ in range(repeat + 1):
+                            track['segments'].append(urljoin(rep_base, _fill_dash_template(media, rep_id, bandwidth, number, t)))
+                            number += 1
+                            t += duration
+                elif template.get('duration') and period_seconds:
+                    count = -(-int(period_seconds * timescale) // int(template.get('duration')))
+                    track['segments'] = [urljoin(rep_base, _fill_dash_template(media, rep_id, bandwidth, n))
+                                         for n in range(number, number + count)]
+            elif rep_base != period_base:
+                # SegmentBase or a plain file: the representation is one resource
+                track['segments'] = [rep_base]
+            if track['segments']:
+                tracks.append(track)
+    return tracks
+
+
+class MediaTooLarge(ValueError):
+    """A media download went over the downloader's size cap"""
+
+
+class MediaDownloader:
+    """Streams media to disk in chunks instead of holding whole bodies in memory
+
+    Progressive files are fetched once in full, whatever ranges the page
+    requested; HLS and DASH manifests are reassembled by concatenating their
+    segments (init segment first) into one file per track. Requests carry the
+    page's cookies and user agent. Without aiohttp, the browser context's
+    request API is used; it reads each body whole but still writes in chunks.
+
+    Like ``AssetWriter``, finished files go through the ``AssetStore`` when
+    one is given (moved in under the digest hashed while streaming, then
+    linked into place). A progressive file from the previous run is
+    revalidated with its ETag/Last-Modified and kept on a 304.
+    """
+
+    def __init__(self, max_bytes: int = MEDIA_MAX_BYTES, concurrency: int = 3, chunk_size: int = MEDIA_CHUNK_SIZE,
+                 store: AssetStore = None):
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.store = store
+        self.bytes_written = 0
+        self.bytes_deduplicated = 0
+        self._limit = asyncio.Semaphore(concurrency)
+        self._context = None
+        self._user_agent = DEFAULT_USER_AGENT
+        self._session = None
+
+    def attach(self, context: BrowserContext, user_agent: str = None):
+        self._context = context
+        self._user_agent = user_agent or self._user_agent
+
+    async def _headers(self, url: str, referer: str) -> dict:
+        headers = {'User-Agent': self._user_agent, 'Referer': referer}
+        if self._context is not None:
+            cookies = await self._context.cookies(url)
+            if cookies:
+                headers['Cookie'] = '; '.join(f"{c['name']}={c['value']}" for c in cookies)
+        return headers
+
+    async def _chunks(self, url: str, referer: str, previous: dict = None, meta: dict = None):
+        """Yield the body of ``url`` in chunks
+
+        With ``previous`` (an incremental cache entry) the request is
+        conditional and a 304 yields nothing. ``meta`` receives the status
+        and the response's validators.
+        """
+        headers = await self._headers(url, referer)
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        meta = {} if meta is None else meta
+        if aiohttp is not None:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_read=60))
+            async with self._session.get(url, headers=headers) as response:
+                meta.update(status=response.status, etag=response.headers.get('ETag'),
+                            last_modified=response.headers.get('Last-Modified'))
+                if response.status == 304:
+                    return
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    yield chunk
+        else:
+            response = await self._context.request.get(url, headers=headers, timeout=120000)
+            meta.update(status=response.status, etag=response.headers.get('etag'),
+                        last_modified=response.headers.get('last-modified'))
+            if response.status == 304:
+                return
+            if not response.ok:
+                raise RuntimeError(f"HTTP {response.status} for {url}")
+            body = await response.body()
+            for start in range(0, len(body), self.chunk_size):
+                yield body[start:start + self.chunk_size]
+
+    async def _append(self, f, url: str, referer: str, digest, written: int,
+                      previous: dict = None, meta: dict = None) -> int:
+        loop = asyncio.get_running_loop()
+        async for chunk in self._chunks(url, referer, previous, meta):
+            written += len(chunk)
+            if written > self.max_bytes:
+                raise MediaTooLarge(f"{url} exceeds {self.max_bytes} bytes")
+            digest.update(chunk)
+            await loop.run_in_executor(None, f.write, chunk)
+        return written
+
+    async def _concatenate(self, urls: list, path: Path, referer: str, previous: dict = None) -> dict:
+        """Write the bodies of ``urls`` one after another to ``path``
+
+        ``previous`` makes the (single) request conditional; on a 304 nothing
+        is written and ``{'not_modified': True}`` is returned.
+        """
+        digest = hashlib.sha256()
+        written = 0
+        meta = {}
+        # Streamed to a temp file and renamed into place: a partial download
+        # never shows up, and a path linked into an asset store is replaced
+        # rather than written through
+        tmp = path.with_name(f".{path.name}.part")
+        async with self._limit:
+            try:
+                with open(tmp, 'wb') as f:
+                    for url in urls:
+                        written = await self._append(f, url, referer, digest, written, previous, meta)
+                if meta.get('status') == 304:
+                    tmp.unlink(missing_ok=True)
+                    return dict(meta, not_modified=True)
+                placed = await asyncio.get_running_loop().run_in_executor(
+                    None, self._place, tmp, path, digest.hexdigest(), written)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+        result = {'size': written, 'sha256': digest.hexdigest(), **placed}
+        if len(urls) == 1:
+            result.update({k: meta[k] for k in ('etag', 'last_modified') if meta.get(k)})
+        return result
+
+    def _place(self, tmp: Path, path: Path, digest: str, size: int) -> dict:
+        """Move a finished download to ``path``, through the store when there is one"""
+        if self.store is None:
+            os.replace(tmp, path)
+            self.bytes_written += size
+            return {}
+        if self.store.put_file(tmp, digest):
+            self.bytes_written += size
+        else:
+            self.bytes_deduplicated += size
+        method = self.store.link(digest, path)
+        return {'store_path': str(self.store.path_for(digest)), 'store_link': method}
+
+    async def download(self, url: str, path: Path, referer: str, previous: dict = None) -> dict:
+        """Stream a progressive media file to ``path``
+
+        ``previous`` is the file's incremental cache entry when ``path`` is
+        still on disk from the last run; a 304 keeps that file untouched.
+        """
+        result = await self._concatenate([url], path, referer, previous)
+        if not result.get('not_modified'):
+            return result
+        unchanged = {
+            'size': path.stat().st_size,
+            'sha256': previous.get('sha256'),
+            'unchanged': True,
+            'etag': result.get('etag') or previous.get('etag'),
+            'last_modified': result.get('last_modified') or previous.get('last_modified'),
+        }
+        if self.store is not None and previous.get('sha256'):
+            unchanged.update(store_path=str(self.store.path_for(previous['sha256'])), store_link='existing')
+        return {k: v for k, v in unchanged.items() if v is not None}
+
+    async def _fetch_text(self, url: str, referer: str) -> str:
+        parts = []
+        async for chunk in self._chunks(url, referer):
+            parts.append(chunk)
+        return b''.join(parts).decode('utf-8', errors='replace')
+
+    async def reassemble_hls(self, url: str, text: str, path: Path, referer: str) -> list:
+        """Concatenate the highest-bandwidth variant of an HLS playlist into ``path``"""
+        playlist = parse_hls_playlist(text, url)
+        if playlist['variants']:
+            bandwidth, variant_url = max(playlist['variants'])
+            playlist = parse_hls_playlist(await self._fetch_text(variant_url, referer), variant_url)
+        if playlist['encrypted']:
+            raise RuntimeError("encrypted HLS segments are not reassembled")
+        if not playlist['segments']:
+            return []
+        urls = ([playlist['init']] if playlist['init'] else []) + playlist['segments']
+        # fMP4 segments (with an init map) make an MP4, the rest a transport stream
+        path = path.with_suffix('.mp4' if playlist['init'] else '.ts')
+        result = await self._concatenate(urls, path, referer)
+        return [dict(result, kind='video', local_path=str(path), segments=len(playlist['segments']))]
+
+    async def reassemble_dash(self, url: str, text: str, path: Path, referer: str) -> list:
+        """Concatenate each audio/video track of a DASH manifest into its own file"""
+        tracks = []
+        for track in parse_dash_manifest(text, url):
+            track_path = path.with_name(f"{path.stem}_{track['kind']}_{track['representation'] or 'track'}"
+                                        f"{'.mp4' if track['kind'] == 'video' else '.m4a'}")
+            urls = ([track['init']] if track['init'] else []) + track['segments']
+            result = await self._concatenate(urls, track_path, referer)
+            tracks.append(dict(result, kind=track['kind'], local_path=str(track_path),
+                               segments=len(track['segments']), bandwidth=track['bandwidth']))
+        return tracks
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# Request routing: which requests are let through, aborted or answered with a
+# stub before they download. Categories are Playwright resource types.
+ROUTE_ACTIONS = ('allow', 'abort', 'stub')
+
+# Placeholder bodies for stubbed requests, by resource type
+STUB_RESPONSES = {
+    'image': ('image/gif', base64.b64decode('R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')),
+    'script': ('application/javascript', b''),
+    'stylesheet': ('text/css', b''),
+    'font': ('font/woff2', b''),
+    'media': ('video/mp4', b''),
+}
+
+ANALYTICS_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'facebook.net',
+    'hotjar.com', 'segment.io', 'segment.com', 'mixpanel.com', 'clarity.ms', 'fullstory.com',
+]
+
+# full: the previous behaviour, nothing filtered. tokens: enough for design
+# tokens and screenshots - no media, placeholder images, no trackers.
+ROUTING_PRESETS = {
+    'full': {},
+    'no-media': {
+        'categories': {'media': 'abort'},
+    },
+    'tokens': {
+        'categories': {'media': 'abort', 'image': 'stub', 'websocket': 'abort', 'eventsource': 'abort'},
+        'deny_domains': ANALYTICS_DOMAINS,
+        'max_body_bytes': 2 * 1024 * 1024,
+        'deny_content_types': ['video/', 'audio/'],
+    },
+}
+
+
+# Resource type a request for an asset category would normally have
+ASSET_RESOURCE_TYPES = {
+    'font': 'font', 'css': 'stylesheet', 'js': 'script', 'image': 'image',
+    'media': 'media', 'hls': 'media', 'dash': 'media', 'segment': 'media',
+}
+
+
+def parse_size(spec: str) -> int:
+    """Parse a byte count such as ``500000``, ``512k`` or ``5M``"""
+    match = re.fullmatch(r'(\d+)\s*([kmg]?)b?', spec.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid size '{spec}', expected e.g. 500000, 512k or 5M")
+    return int(match.group(1)) * {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}[match.group(2)]
+
+
+def parse_categories(spec: str) -> list:
+    """Parse a comma-separated list of resource types such as ``media,font``"""
+    return [item.strip().lower() for item in spec.split(',') if item.strip()]
+
+
+class RoutingPolicy:
+    """Decides per request whether it is allowed, aborted or stubbed
+
+    ``categories`` maps resource types to an action; requests to
+    ``deny_domains`` are aborted and, when ``allow_domains`` is given, so are
+    requests to any other host than those and the target site. Size and
+    content type are only known from the response, so ``max_body_bytes`` and
+    ``deny_content_types`` are enforced when responses are captured.
+    """
+
+    def __init__(self, categories: dict = None, allow_domains: list = None, deny_domains: list = None,
+                 max_body_bytes: int = None, deny_content_types: list = None):
+        self.categories = dict(categories or {})
+        for category, action in self.categories.items():
+            if action not in ROUTE_ACTIONS:
+                raise ValueError(f"Invalid action '{action}' for '{category}', expected one of {ROUTE_ACTIONS}")
+        self.allow_domains = [d.lower().lstrip('.') for d in allow_domains or []]
+        self.deny_domains = [d.lower().lstrip('.') for d in deny_domains or []]
+        self.max_body_bytes = max_body_bytes
+        self.deny_content_types = [t.lower() for t in deny_content_types or []]
+
+    @classmethod
+    def from_preset(cls, name: str = 'full', categories: dict = None, allow_domains: list = None,
+                    deny_domains: list = None, max_body_bytes: int = None, deny_content_types: list = None):
+        """A preset from ROUTING_PRESETS with extra rules layered on top"""
+        if name not in ROUTING_PRESETS:
+            raise ValueError(f"Unknown routing preset '{name}', expected one of {', '.join(ROUTING_PRESETS)}")
+        preset = ROUTING_PRESETS[name]
+        return cls(
+            categories=dict(preset.get('categories', {}), **(categories or {})),
+            allow_domains=list(preset.get('allow_domains', [])) + list(allow_domains or []),
+            deny_domains=list(preset.get('deny_domains', [])) + list(deny_domains or []),
+            max_body_bytes=max_body_bytes if max_body_bytes is not None else preset.get('max_body_bytes'),
+            deny_content_types=list(preset.get('deny_content_types', [])) + list(deny_content_types or []),
+        )
+
+    @property
+    def intercepts(self) -> bool:
+        """Whether page.route is needed at all (routing every request disables the cache)"""
+        return bool(self.allow_domains or self.deny_domains or
+                    any(action != 'allow' for action in self.categories.values()))
+
+    @staticmethod
+    def _matches(host: str, domains: list) -> bool:
+        return any(host == d or host.endswith('.' + d) for d in domains)
+
+    def decide(self, url: str, resource_type: str, site_host: str) -> tuple:
+        """``(action, reason)`` for a request"""
+        host = (urlparse(url).hostname or '').lower()
+        if host and self._matches(host, self.deny_domains):
+            return 'abort', 'domain_denied'
+        if host and self.allow_domains:
+            site = site_host.lower()
+            site = site[4:] if site.startswith('www.') else site
+            if not self._matches(host, self.allow_domains + [site]):
+                return 'abort', 'domain_not_allowed'
+        # Media and fonts fetched by script count as what they are, not as xhr/fetch
+        if resource_type in ('fetch', 'xhr', 'other'):
+            resource_type = ASSET_RESOURCE_TYPES.get(classify_asset(url, '')[0], resource_type)
+        action = self.categories.get(resource_type, 'allow')
+        if action == 'stub' and resource_type not in STUB_RESPONSES:
+            action = 'abort'
+        return action, f'category:{resource_type}' if action != 'allow' else None
+
+    def rejects_response(self, content_type: str, content_length: int) -> str:
+        """Reason to leave a response body unread, or None"""
+        if self.max_body_bytes is not None and content_length > self.max_body_bytes:
+            return 'too_large'
+        content_type = content_type.lower()
+        if any(content_type.startswith(t) for t in self.deny_content_types):
+            return 'content_type_denied'
+        return None
 
 
 class WebsiteCloner:
-    def __init__(self, url: str, output_dir: str = "cloned_site"):
+    def __init__(self, url: str, output_dir: str = "cloned_site", asset_store: str = None,
+                 incremental: bool = False, breakpoints: list = None, screenshot_mode: str = 'serial',
+                 wait_timeouts: dict = None, animation_mode: str = 'interval',
+                 animation_duration: int = 25, animation_sample_interval: float = 0.25,
+                 hero_video: bool = False,
+                 animation_diff_threshold: float = 0.005, resume: bool = False,
+                 only_stages: list = None, skip_stages: list = None, trace: bool = False,
+                 launch_profile: dict = None, routing_policy: RoutingPolicy = None,
+                 media_max_bytes: int = MEDIA_MAX_BYTES, theme_mode: str = 'auto',
+                 extraction_backend: str = 'js', minify_css: bool = False, css_coverage: bool = False,
+                 js_coverage: bool = False):
         self.url = url
+        self.launch_profile = launch_profile or LAUNCH_PROFILES['desktop']
         self.output_dir = Path(output_dir)
         self.data_dir = self.output_dir / "data"
         self.assets_dir = self.output_dir / "assets"
@@ -46,7 +2215,7 @@ class WebsiteCloner:
         self.rive_dir = self.assets_dir / "rive"
 
         # Collected data
-        self.network_requests = []
+        self.network_log = None  # NDJSONWriter, opened per run
         self.fonts = {}
         self.stylesheets = []
         self.scripts = []
@@ -59,6 +2228,20 @@ class WebsiteCloner:
         self.typography = {}
         self.html = ""
         self.computed_styles = {}
+        self._style_scans = {}  # page -> last collector result
+        self._dom_snapshots = {}  # page -> decoded DOMSnapshotView (domsnapshot backend)
+
+        # Asset bodies are written off the event loop; response handlers are
+        # tracked so flush_assets() can wait for all of them
+        self.asset_store = AssetStore(asset_store) if asset_store else None
+        self.asset_writer = AssetWriter(store=self.asset_store)
+        self._capture_tasks = set()
+
+        # Incremental mode: assets from the previous run in this output dir,
+        # keyed by URL, revalidated with ETag/Last-Modified instead of refetched
+        self.incremental = incremental
+        self.incremental_cache = {}
+        self.incremental_stats = {'cached': 0, 'not_modified': 0, 'modified': 0, 'errors': 0}
 
         # Theme data
         self.themes = {
@@ -66,6 +2249,80 @@ class WebsiteCloner:
             'dark': {'design_system': None, 'screenshots': []}
         }
         self.detected_theme_toggle = None
+        if theme_mode not in THEME_MODES:
+            raise ValueError(f"theme_mode must be one of {THEME_MODES}")
+        self.theme_mode = theme_mode
+        if extraction_backend not in EXTRACTION_BACKENDS:
+            raise ValueError(f"extraction_backend must be one of {EXTRACTION_BACKENDS}")
+        self.extraction_backend = extraction_backend
+        self.minify_css = minify_css
+        self.css_coverage = css_coverage
+        self.js_coverage = js_coverage
+        self._js_coverage_session = None
+        self._color_schemes = {}  # page -> emulated prefers-color-scheme
+
+        # Screenshot breakpoints and how they are rendered
+        self.breakpoints = breakpoints or DEFAULT_BREAKPOINTS
+        if screenshot_mode not in SCREENSHOT_MODES:
+            raise ValueError(f"screenshot_mode must be one of {SCREENSHOT_MODES}")
+        self.screenshot_mode = screenshot_mode
+        self.screenshot_timings = []
+
+        # Readiness-driven waits (see settle()); per-step timeouts in ms
+        self.wait_timeouts = dict(WAIT_TIMEOUTS, **(wait_timeouts or {}))
+        self._readiness = {}
+        self.wait_log = []
+        self.scroll_stats = None
+
+        # Animation capture strategy (see capture_animations)
+        if animation_mode not in ANIMATION_MODES:
+            raise ValueError(f"animation_mode must be one of {ANIMATION_MODES}")
+        self.animation_mode = animation_mode
+        self.animation_duration = animation_duration
+        self.hero_video = hero_video
+        self.animation_sample_interval = animation_sample_interval
+        self.animation_diff_threshold = animation_diff_threshold
+
+        # Pipeline stages (see plan_stages); results of earlier runs are
+        # restored from per-stage checkpoints
+        for stage in (only_stages or []) + (skip_stages or []):
+            if stage not in PIPELINE_STAGES:
+                raise ValueError(f"Unknown stage '{stage}', expected one of {PIPELINE_STAGES}")
+        self.resume = resume
+        self.only_stages = set(only_stages or [])
+        self.skip_stages = set(skip_stages or [])
+        self.checkpoints = StageCheckpoints(self.output_dir, url)
+        self.stage_log = []
+        self._restored_urls = set()
+        self.stylesheets_content = None
+        self.css_combine_stats = None
+        self.css_coverage_summary = None
+        self.js_coverage_summary = None
+        self.animation_capture = None
+        self.theme_summary = None
+        self.page_data = None
+        self.component_tree = None
+        self.design_system = None
+
+        # Requests filtered before they download (see route_request)
+        self.routing_policy = routing_policy or RoutingPolicy()
+        self.routing_stats = {'aborted': 0, 'stubbed': 0, 'too_large': 0, 'content_type_denied': 0}
+        self._stubbed_urls = set()
+
+        # Video/audio files and HLS/DASH streams are streamed to disk (see capture_media)
+        max_media = media_max_bytes
+        if self.routing_policy.max_body_bytes is not None:
+            max_media = min(max_media, self.routing_policy.max_body_bytes)
+        self.media_downloader = MediaDownloader(max_bytes=max_media, store=self.asset_store)
+        self._media_urls = set()
+
+        # Per-stage profile for the report; optionally a Chrome trace file
+        self.response_count = 0
+        self.trace = trace
+        self.profiler = StageProfiler({
+            'bytes_written': lambda: self.asset_writer.bytes_written + self.media_downloader.bytes_written,
+            'responses': lambda: self.response_count,
+        })
 
     def setup_directories(self):
         """Create output directory structure"""
@@ -89,124 +2346,388 @@ class WebsiteCloner:
             url = response.url
             content_type = response.headers.get('content-type', '')
             status = response.status
+            category, classified_by = classify_asset(url, content_type)
 
             request_info = {
                 'url': url,
                 'status': status,
                 'content_type': content_type,
                 'headers': dict(response.headers),
+                'category': category,
+                'classified_by': classified_by,
             }
 
-            if status == 200:
+            length = response.headers.get('content-length', '')
+            rejected = self.routing_policy.rejects_response(content_type, int(length) if length.isdigit() else 0)
+
+            # Already on disk and in the asset lists from a restored checkpoint
+            if url in self._restored_urls:
+                request_info['restored'] = True
+
+            # Placeholder served by route_request, not the real asset
+            elif url in self._stubbed_urls:
+                request_info['route_action'] = 'stub'
+
+            elif status == 200 and rejected:
+                request_info['skipped'] = rejected
+                self.routing_stats[rejected] += 1
+
+            # Media is streamed or reassembled, including 206 range responses
+            elif status in (200, 206) and category in MEDIA_CATEGORIES:
+                await self.capture_media(response, request_info, category)
+
+            # Only assets (or unlabelled binaries that may be one) are read
+            elif status == 200 and (category is not None or needs_sniffing(content_type)):
                 try:
                     body = await response.body()
+                    if category is None:
+                        category = sniff_asset(body)
+                        request_info['category'] = category
+                        request_info['classified_by'] = 'magic' if category else None
+
+                    # Responses without a content-length are checked once read
+                    max_body = self.routing_policy.max_body_bytes
+                    if max_body is not None and len(body) > max_body:
+                        request_info['skipped'] = 'too_large'
+                        self.routing_stats['too_large'] += 1
 
                     # Font files
-                    if any(ext in url.lower() for ext in ['.woff2', '.woff', '.ttf', '.otf', '.eot']) or \
-                       'font' in content_type.lower():
+                    elif category == 'font':
                         filename = self.get_safe_filename(url, 'fonts')
                         filepath = self.fonts_dir / filename
-                        filepath.write_bytes(body)
                         self.fonts[url] = {
+                            'url': url,
                             'local_path': str(filepath),
                             'filename': filename,
                             'size': len(body),
                             'content_type': content_type
                         }
-                        request_info['saved_to'] = str(filepath)
+                        await self.save_asset(filepath, body, self.fonts[url], request_info)
                         print(f"  [FONT] {filename}")
 
                     # CSS files
-                    elif url.endswith('.css') or 'text/css' in content_type:
+                    elif category == 'css':
                         filename = self.get_safe_filename(url, 'css')
                         filepath = self.css_dir / filename
-                        filepath.write_bytes(body)
-                        self.stylesheets.append({
+                        # The body is not kept in memory; read_stylesheet() loads it from disk
+                        entry = {
                             'url': url,
                             'local_path': str(filepath),
-                            'content': body.decode('utf-8', errors='ignore')
-                        })
-                        request_info['saved_to'] = str(filepath)
+                            'size': len(body)
+                        }
+                        self.stylesheets.append(entry)
+                        await self.save_asset(filepath, body, entry, request_info)
                         print(f"  [CSS] {filename}")
 
                     # JavaScript files
-                    elif url.endswith('.js') or 'javascript' in content_type:
+                    elif category == 'js':
                         filename = self.get_safe_filename(url, 'js')
                         filepath = self.js_dir / filename
-                        filepath.write_bytes(body)
-                        self.scripts.append({
+                        entry = {
                             'url': url,
                             'local_path': str(filepath),
-                        })
-                        request_info['saved_to'] = str(filepath)
+                        }
+                        self.scripts.append(entry)
+                        await self.save_asset(filepath, body, entry, request_info)
 
                     # Images
-                    elif any(ext in url.lower() for ext in ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.ico']) or \
-                         'image' in content_type:
+                    elif category == 'image':
                         filename = self.get_safe_filename(url, 'images')
                         filepath = self.images_dir / filename
-                        filepath.write_bytes(body)
-                        self.images.append({
+                        entry = {
                             'url': url,
                             'local_path': str(filepath),
                             'size': len(body),
                             'content_type': content_type
-                        })
-                        request_info['saved_to'] = str(filepath)
+                        }
+                        self.images.append(entry)
+                        await self.save_asset(filepath, body, entry, request_info)
                         print(f"  [IMG] {filename}")
 
-                    # Videos
-                    elif any(ext in url.lower() for ext in ['.mp4', '.webm', '.mov', '.avi', '.m3u8', '.mpd']) or \
-                         any(vtype in content_type for vtype in ['video', 'audio']):
+                    # Rive animation files (by extension or RIVE magic bytes)
+                    elif category == 'rive':
+                        filename = self.get_safe_filename(url, 'rive')
+                        if not filename.endswith('.riv'):
+                            filename = filename + '.riv'
+                        filepath = self.rive_dir / filename
+                        entry = {
+                            'url': url,
+                            'local_path': str(filepath),
+                            'filename': filename,
+                            'size': len(body),
+                            'content_type': content_type
+                        }
+                        self.rive_animations.append(entry)
+                        await self.save_asset(filepath, body, entry, request_info)
+                        print(f"  [RIVE] {filename} ({len(body)} bytes)")
+
+                    # Sniffed media arrived whole already; save it like the rest
+                    elif category in MEDIA_CATEGORIES:
                         filename = self.get_safe_filename(url, 'videos')
                         filepath = self.videos_dir / filename
-                        filepath.write_bytes(body)
-                        self.videos.append({
+                        entry = {
                             'url': url,
                             'local_path': str(filepath),
                             'size': len(body),
                             'content_type': content_type
-                        })
+                        }
+                        self.videos.append(entry)
                         self.video_sources.append({
                             'url': url,
                             'saved_as': filename,
                             'content_type': content_type
                         })
-                        request_info['saved_to'] = str(filepath)
+                        await self.save_asset(filepath, body, entry, request_info)
                         print(f"  [VIDEO] {filename}")
 
-                    # Rive animation files
-                    elif '.riv' in url.lower() or 'application/octet-stream' in content_type and len(body) > 1000:
-                        # Check if it looks like a Rive file (starts with RIVE magic bytes or has .riv extension)
-                        is_rive = '.riv' in url.lower()
-                        if not is_rive and len(body) >= 4:
-                            # Rive files often start with "RIVE" magic bytes
-                            is_rive = body[:4] == b'RIVE'
-
-                        if is_rive:
-                            filename = self.get_safe_filename(url, 'rive')
-                            if not filename.endswith('.riv'):
-                                filename = filename + '.riv'
-                            filepath = self.rive_dir / filename
-                            filepath.write_bytes(body)
-                            self.rive_animations.append({
-                                'url': url,
-                                'local_path': str(filepath),
-                                'filename': filename,
-                                'size': len(body),
-                                'content_type': content_type
-                            })
-                            request_info['saved_to'] = str(filepath)
-                            print(f"  [RIVE] {filename} ({len(body)} bytes)")
-
                 except Exception as e:
                     request_info['body_error'] = str(e)
 
-            self.network_requests.append(request_info)
+            if self.network_log is not None:
+                self.network_log.write(request_info)
 
         except Exception as e:
             pass
 
+    async def capture_media(self, response, request_info: dict, kind: str):
+        """Save a media response without holding it in memory
+
+        Progressive files are downloaded again in full and streamed to disk,
+        whatever range the page asked for; HLS/DASH manifests are saved and
+        their segments reassembled into one file per track. Segment
+        responses themselves are not saved. With ``--incremental``, files
+        from the last run are revalidated (and tracks kept while their
+        manifest is unchanged) instead of downloaded again.
+        """
+        url = response.url
+        content_type = request_info['content_type']
+        if kind == 'segment':
+            request_info['skipped'] = 'media_segment'
+            return
+        if url in self._media_urls:
+            request_info['skipped'] = 'media_duplicate'
+            return
+        self._media_urls.add(url)
+
+        filename = self.get_safe_filename(url, 'videos')
+        filepath = self.videos_dir / filename
+        entry = {
+            'url': url,
+            'local_path': str(filepath),
+            'content_type': content_type,
+            'download': 'stream' if kind == 'media' else kind
+        }
+        self.videos.append(entry)
+        self.video_sources.append({
+            'url': url,
+            'saved_as': filename,
+            'content_type': content_type
+        })
+        try:
+            previous = self.incremental_cache.get(url)
+            if kind == 'media':
+                request_info['saved_to'] = str(filepath)
+                previous = previous if previous and filepath.exists() else None
+                entry.update(await self.media_downloader.download(url, filepath, referer=self.url,
+                                                                  previous=previous))
+                if previous:
+                    self.incremental_stats['not_modified' if entry.get('unchanged') else 'modified'] += 1
+                print(f"  [VIDEO] {filename} ({entry['size']} bytes{', unchanged' if entry.get('unchanged') else ''})")
+            else:
+                manifest = await response.body()
+                entry['size'] = len(manifest)
+                await self.save_asset(filepath, manifest, entry, request_info)
+                # An unchanged (VOD) manifest lists the same segments: keep last run's tracks
+                previous_tracks = (previous or {}).get('tracks') or []
+                if (previous_tracks and previous.get('sha256') == hashlib.sha256(manifest).hexdigest()
+                        and all(Path(track['local_path']).exists() for track in previous_tracks)):
+                    entry['tracks'] = [dict(track, unchanged=True) for track in previous_tracks]
+                    print(f"  [VIDEO] {filename}: manifest unchanged, kept {len(previous_tracks)} track(s)")
+                    return
+                reassemble = (self.media_downloader.reassemble_hls if kind == 'hls'
+                              else self.media_downloader.reassemble_dash)
+                entry['tracks'] = await reassemble(url, manifest.decode('utf-8', errors='replace'),
+                                                   filepath, referer=self.url)
+                for track in entry['tracks']:
+                    print(f"  [VIDEO] {Path(track['local_path']).name} "
+                          f"({track['segments']} {kind.upper()} segments, {track['size']} bytes)")
+        except MediaTooLarge as e:
+            entry['error'] = str(e)
+            request_info['skipped'] = 'too_large'
+            self.routing_stats['too_large'] += 1
+        except Exception as e:
+            entry['error'] = f"{type(e).__name__}: {e}"
+            request_info['media_error'] = entry['error']
+            print(f"  [!] Media download failed for {filename}: {entry['error']}")
+
+    async def save_asset(self, filepath: Path, body: bytes, entry: dict, request_info: dict):
+        """Hand an asset body to the writer; ``entry`` receives its digest once stored"""
+        request_info['saved_to'] = str(filepath)
+
+        # HTTP validators let the next --incremental run revalidate this asset
+        headers = request_info.get('headers', {})
+        if headers.get('etag'):
+            entry['etag'] = headers['etag']
+        if headers.get('last-modified'):
+            entry['last_modified'] = headers['last-modified']
+
+        previous = self.incremental_cache.get(request_info['url'], {})
+        await self.asset_writer.write(filepath, body, entry, previous_digest=previous.get('sha256'))
+
+    def load_incremental_cache(self):
+        """Index assets from the previous run's manifests for revalidation"""
+        manifest_path = self.data_dir / "asset_manifest.json"
+        if not manifest_path.exists():
+            print("  [INCREMENTAL] No previous asset_manifest.json - doing a full clone")
+            return
+
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        entries = list(manifest.get('fonts', []))
+        for key in ('images', 'videos', 'stylesheets', 'scripts'):
+            entries.extend(manifest.get(key, []))
+        rive_path = self.data_dir / "rive_animations.json"
+        if rive_path.exists():
+            entries.extend(json.loads(rive_path.read_text(encoding='utf-8')))
+
+        # Older manifests carry no validators (and font entries no URL); fall
+        # back to the response headers logged in the previous report
+        logged_headers = {}
+        saved_urls = {}
+        log_path = self.data_dir / "network_log.ndjson"
+        report_path = self.output_dir / "extraction_report.json"
+        try:
+            if log_path.exists():
+                requests = iter_ndjson(log_path)
+            elif report_path.exists():
+                # Reports written before the network log moved to NDJSON
+                requests = json.loads(report_path.read_text(encoding='utf-8')).get('network_log', [])
+            else:
+                requests = []
+            for request in requests:
+                logged_headers[request.get('url')] = request.get('headers', {})
+                if request.get('saved_to'):
+                    saved_urls[Path(request['saved_to']).name] = request.get('url')
+        except (ValueError, AttributeError):
+            pass
+
+        for entry in entries:
+            local_path = entry.get('local_path')
+            if not local_path or not Path(local_path).exists():
+                continue
+            url = entry.get('url') or saved_urls.get(Path(local_path).name)
+            if not url:
+                continue
+            headers = logged_headers.get(url, {})
+            etag = entry.get('etag') or headers.get('etag')
+            last_modified = entry.get('last_modified') or headers.get('last-modified')
+            if not (etag or last_modified):
+                continue
+            self.incremental_cache[url] = {
+                'local_path': local_path,
+                'sha256': entry.get('sha256'),
+                'etag': etag,
+                'last_modified': last_modified,
+                'content_type': entry.get('content_type') or headers.get('content-type'),
+                'headers': headers,
+                # Reassembled HLS/DASH tracks, reused while their manifest is unchanged
+                'tracks': entry.get('tracks'),
+            }
+
+        self.incremental_stats['cached'] = len(self.incremental_cache)
+        print(f"  [INCREMENTAL] {len(self.incremental_cache)} cached asset(s) eligible for revalidation")
+
+    async def serve_from_cache(self, route):
+        """Route handler: revalidate a cached asset and serve it from disk if unchanged"""
+        url = route.request.url
+        cached = self.incremental_cache[url]
+        headers = dict(route.request.headers)
+        if cached['etag']:
+            headers['if-none-match'] = cached['etag']
+        if cached['last_modified']:
+            headers['if-modified-since'] = cached['last_modified']
+
+        try:
+            response = await route.fetch(headers=headers)
+        except Exception:
+            self.incremental_stats['errors'] += 1
+            await route.fallback()
+            return
+
+        if response.status != 304:
+            self.incremental_stats['modified'] += 1
+            await route.fulfill(response=response)
+            return
+
+        self.incremental_stats['not_modified'] += 1
+        # Replay the previous response headers, refreshed by the 304
+        skip = {'content-length', 'content-encoding', 'transfer-encoding'}
+        fulfill_headers = {k: v for k, v in cached['headers'].items() if k.lower() not in skip}
+        fulfill_headers.update({k: v for k, v in response.headers.items() if k.lower() not in skip})
+        if cached['content_type']:
+            fulfill_headers['content-type'] = cached['content_type']
+        await route.fulfill(status=200, headers=fulfill_headers, path=cached['local_path'])
+
+    def sibling_route(self, label: str):
+        """Route handler for a sibling page (breakpoint render, theme or coverage context)
+
+        The same policy applies, but the page's rejected requests are tagged
+        with ``label`` in the network log and kept out of ``routing_stats``,
+        which describe the main page only.
+        """
+        async def handler(route):
+            await self.route_request(route, sibling=label)
+        return handler
+
+    async def route_request(self, route, sibling: str = None):
+        """Route handler: abort or stub requests the routing policy rejects, before they download"""
+        request = route.request
+        # The page itself is always loaded
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            await route.fallback()
+            return
+
+        action, reason = self.routing_policy.decide(
+            request.url, request.resource_type, urlparse(self.url).hostname or ''
+        )
+        if action == 'allow':
+            # On to the incremental cache handler, if any, or the network
+            await route.fallback()
+            return
+
+        if self.network_log is not None:
+            record = {
+                'url': request.url,
+                'resource_type': request.resource_type,
+                'route_action': action,
+                'route_reason': reason
+            }
+            if sibling:
+                record['page'] = sibling
+            self.network_log.write(record)
+        if action == 'abort':
+            if not sibling:
+                self.routing_stats['aborted'] += 1
+            await route.abort('blockedbyclient')
+        else:
+            if not sibling:
+                self.routing_stats['stubbed'] += 1
+            self._stubbed_urls.add(request.url)
+            content_type, body = STUB_RESPONSES[request.resource_type]
+            await route.fulfill(status=200, content_type=content_type, body=body)
+
+    def _on_response(self, response):
+        """Page response hook: run capture_network as a tracked task"""
+        self.response_count += 1
+        task = asyncio.ensure_future(self.capture_network(response))
+        self._capture_tasks.add(task)
+        task.add_done_callback(self._capture_tasks.discard)
+
+    async def flush_assets(self):
+        """Barrier: wait for in-flight response handlers and queued asset writes"""
+        while self._capture_tasks:
+            await asyncio.gather(*list(self._capture_tasks), return_exceptions=True)
+        await self.asset_writer.flush()
+
     def get_safe_filename(self, url: str, category: str) -> str:
         """Generate a safe filename from URL"""
         parsed = urlparse(url)
@@ -230,26 +2751,76 @@ class WebsiteCloner:
         name, ext = os.path.splitext(original_name)
         return f"{name}_{url_hash}{ext}"
 
-    async def deep_scroll(self, page: Page):
-        """Scroll through page multiple times to ensure all lazy content loads"""
+    async def settle(self, page: Page, step: str, network: bool = True, fonts: bool = False,
+                     dom: bool = True, transitions: bool = False) -> dict:
+        """Wait until the page is ready for ``step`` or its timeout elapses
+
+        Conditions are checked in order (transitions, network, fonts, DOM) and
+        share the step's time budget from ``self.wait_timeouts``.
+        """
+        readiness = self._readiness.get(page)
+        if readiness is None:
+            readiness = self._readiness[page] = PageReadiness(page)
+
+        loop = asyncio.get_running_loop()
+        timeout_ms = self.wait_timeouts.get(step, WAIT_TIMEOUTS.get(step, 2000))
+        started = loop.time()
+        remaining = lambda: max(0, int(timeout_ms - (loop.time() - started) * 1000))
+
+        result = {'step': step}
+        try:
+            if transitions:
+                result['transitions'] = await readiness.transitions_done(remaining())
+            if network:
+                result['network'] = await readiness.network_quiet(remaining())
+            if fonts:
+                result['fonts'] = await readiness.fonts_ready(remaining())
+            if dom:
+                result['dom'] = await readiness.dom_stable(remaining())
+        except Exception as e:
+            # A navigation or closed page mid-wait is not worth failing the clone
+            result['error'] = str(e)
+        result['ms'] = round((loop.time() - started) * 1000)
+        self.wait_log.append(result)
+        return result
+
+    async def deep_scroll(self, page: Page, max_passes: int = 5) -> dict:
+        """Scroll through the page until a pass triggers no new lazy content
+
+        Each pass steps one viewport at a time and ends when a sentinel at the
+        bottom of the document intersects the viewport. Passes repeat while
+        the previous one triggered new requests, added DOM nodes or grew the
+        page, up to ``max_passes``.
+        """
         print("[*] Triggering lazy-loaded content...")
-        for i in range(3):
-            await page.evaluate("""
-                async () => {
-                    const delay = ms => new Promise(r => setTimeout(r, ms));
-                    for (let i = 0; i < document.body.scrollHeight; i += 300) {
-                        window.scrollTo(0, i);
-                        await delay(150);
-                    }
-                    window.scrollTo(0, 0);
-                }
-            """)
-            await page.wait_for_timeout(1000)
+        readiness = self._readiness.get(page)
+        started = time.perf_counter()
+        passes = []
+
+        for _ in range(max_passes):
+            requests_before = readiness.request_count if readiness else 0
+            result = await self.evaluate('deep_scroll', page, SCROLL_PASS_JS, {'stepDelayMs': 100, 'maxSteps': 500})
+            await self.settle(page, 'scroll_pass')
+            result['requests'] = (readiness.request_count if readiness else 0) - requests_before
+            passes.append(result)
+            print(f"  [SCROLL] Pass {len(passes)}: {result['steps']} steps, {result['requests']} requests, "
+                  f"{result['nodesAdded']} nodes added")
+            if not result['requests'] and result['nodesAdded'] <= 0 and result['heightGrowth'] <= 0:
+                break
+
+        self.scroll_stats = {
+            'passes': len(passes),
+            'requests_triggered': sum(p['requests'] for p in passes),
+            'nodes_added': sum(max(0, p['nodesAdded']) for p in passes),
+            'seconds': round(time.perf_counter() - started, 2),
+            'pass_details': passes,
+        }
+        return self.scroll_stats
 
     async def capture_blob_videos(self, page: Page):
         """Capture blob URL video information"""
         print("[*] Capturing video element data...")
-        blob_info = await page.evaluate("""
+        blob_info = await self.evaluate('capture_blob_videos', page, """
             () => {
                 const videos = [];
                 document.querySelectorAll('video').forEach((video, i) => {
@@ -296,21 +2867,72 @@ class WebsiteCloner:
 
         return blob_info
 
+    async def evaluate(self, caller: str, page: Page, expression: str, arg=None):
+        """``page.evaluate``, timed by the profiler under ``caller``
+
+        Every in-page script the cloner runs goes through here, on any page.
+        """
+        with self.profiler.evaluate(caller):
+            return await page.evaluate(expression, arg)
+
+    async def collect_styles(self, page: Page) -> dict:
+        """Run the single-pass style collector, reusing a page's last scan until it changes
+
+        Theme toggles call ``invalidate_style_scan(page)``; everything else that
+        reads per-element computed styles goes through here.
+        """
+        scan = self._style_scans.get(page)
+        if scan is None:
+            if self.extraction_backend == 'domsnapshot':
+                started = time.perf_counter()
+                view = await self.dom_snapshot(page)
+                scan = scan_from_snapshot(view, await self.evaluate('collect_styles', page, ROOT_VARIABLES_JS))
+                scan['scanMs'] = (time.perf_counter() - started) * 1000
+            else:
+                scan = await self.evaluate('collect_styles', page, STYLE_SCAN_JS)
+            self._style_scans[page] = scan
+            print(f"  [SCAN] {scan['elementCount']} elements in {scan['scanMs']:.0f}ms")
+        return scan
+
+    async def dom_snapshot(self, page: Page) -> DOMSnapshotView:
+        """Capture the whitelisted computed styles of every rendered node in one CDP call
+
+        Shared by the style collector and the component tree, and dropped
+        with the style scan when the page state changes.
+        """
+        view = self._dom_snapshots.get(page)
+        if view is None:
+            client = await page.context.new_cdp_session(page)
+            try:
+                snapshot = await client.send('DOMSnapshot.captureSnapshot', {
+                    'computedStyles': SNAPSHOT_STYLES,
+                    'includeDOMRects': True,
+                })
+            finally:
+                await client.detach()
+            view = self._dom_snapshots[page] = DOMSnapshotView(snapshot)
+        return view
+
+    def invalidate_style_scan(self, page: Page):
+        """Drop ``page``'s cached scan; other pages' scans stay valid"""
+        self._style_scans.pop(page, None)
+        self._dom_snapshots.pop(page, None)
+
     async def extract_page_data(self, page: Page):
-        """Extract comprehensive page data using JavaScript"""
+        """Extract comprehensive page data using JavaScript
 
-        data = await page.evaluate("""
+        Per-element style data comes from the shared single-pass collector
+        (see ``collect_styles``); this sweep only covers stylesheet rules,
+        key layout selectors and document-level metadata.
+        """
+
+        data = await self.evaluate('extract_page_data', page, """
             () => {
                 const result = {
                     html: document.documentElement.outerHTML,
                     title: document.title,
                     meta: {},
-                    colors: [],
-                    fonts: [],
-                    typography: [],
-                    animations: [],
                     elements: [],
-                    cssVariables: {},
                     mediaQueries: [],
                     keyframes: [],
                     inlineStyles: [],
@@ -325,55 +2947,6 @@ class WebsiteCloner:
                     }
                 });
 
-                // Extract CSS variables from :root
-                const rootStyles = getComputedStyle(document.documentElement);
-                const cssVars = {};
-                for (let i = 0; i < rootStyles.length; i++) {
-                    const prop = rootStyles[i];
-                    if (prop.startsWith('--')) {
-                        cssVars[prop] = rootStyles.getPropertyValue(prop).trim();
-                    }
-                }
-                result.cssVariables = cssVars;
-
-                // Collect all unique colors and fonts
-                const colors = new Set();
-                const fonts = new Set();
-                const typography = [];
-
-                document.querySelectorAll('*').forEach(el => {
-                    const style = getComputedStyle(el);
-
-                    // Colors
-                    colors.add(style.color);
-                    colors.add(style.backgroundColor);
-                    colors.add(style.borderColor);
-                    colors.add(style.outlineColor);
-
-                    // Fonts
-                    fonts.add(style.fontFamily);
-
-                    // Typography details for text elements
-                    if (['H1','H2','H3','H4','H5','H6','P','SPAN','A','LI','BUTTON'].includes(el.tagName)) {
-                        typography.push({
-                            tag: el.tagName,
-                            className: el.className,
-                            fontFamily: style.fontFamily,
-                            fontSize: style.fontSize,
-                            fontWeight: style.fontWeight,
-                            lineHeight: style.lineHeight,
-                            letterSpacing: style.letterSpacing,
-                            textTransform: style.textTransform,
-                            color: style.color,
-                            text: el.innerText?.substring(0, 50)
-                        });
-                    }
-                });
-
-                result.colors = [...colors].filter(c => c && c !== 'rgba(0, 0, 0, 0)' && c !== 'transparent');
-                result.fonts = [...fonts].filter(f => f);
-                result.typography = typography.slice(0, 100);
-
                 // Extract keyframes and animations from stylesheets
                 const keyframes = [];
                 const mediaQueries = [];
@@ -408,39 +2981,6 @@ class WebsiteCloner:
                 result.keyframes = keyframes;
                 result.mediaQueries = mediaQueries.slice(0, 50);
 
-                // Extract elements with animations
-                const animatedElements = [];
-                document.querySelectorAll('*').forEach(el => {
-                    const style = getComputedStyle(el);
-                    if (style.animation && style.animation !== 'none') {
-                        animatedElements.push({
-                            tag: el.tagName,
-                            className: el.className,
-                            id: el.id,
-                            animation: style.animation,
-                            animationName: style.animationName,
-                            animationDuration: style.animationDuration,
-                            animationTimingFunction: style.animationTimingFunction,
-                            animationDelay: style.animationDelay,
-                            animationIterationCount: style.animationIterationCount,
-                            animationDirection: style.animationDirection,
-                            animationFillMode: style.animationFillMode
-                        });
-                    }
-                    if (style.transition && style.transition !== 'none' && style.transition !== 'all 0s ease 0s') {
-                        animatedElements.push({
-                            tag: el.tagName,
-                            className: el.className,
-                            id: el.id,
-                            transition: style.transition,
-                            transitionProperty: style.transitionProperty,
-                            transitionDuration: style.transitionDuration,
-                            transitionTimingFunction: style.transitionTimingFunction
-                        });
-                    }
-                });
-                result.animations = animatedElements;
-
                 // Extract inline styles
                 document.querySelectorAll('[style]').forEach(el => {
                     result.inlineStyles.push({
@@ -508,23 +3048,6 @@ class WebsiteCloner:
                 });
                 result.videos = videoSources;
 
-                // Extract background images
-                const backgroundImages = [];
-                document.querySelectorAll('*').forEach(el => {
-                    const style = getComputedStyle(el);
-                    if (style.backgroundImage && style.backgroundImage !== 'none') {
-                        backgroundImages.push({
-                            tag: el.tagName,
-                            className: el.className,
-                            backgroundImage: style.backgroundImage,
-                            backgroundSize: style.backgroundSize,
-                            backgroundPosition: style.backgroundPosition,
-                            backgroundRepeat: style.backgroundRepeat
-                        });
-                    }
-                });
-                result.backgroundImages = backgroundImages;
-
                 // Extract all linked resources
                 const links = [];
                 document.querySelectorAll('link').forEach(link => {
@@ -564,16 +3087,43 @@ class WebsiteCloner:
             }
         """)
 
+        scan = await self.collect_styles(page)
+        for key in ('cssVariables', 'colors', 'fonts', 'typography', 'animations', 'backgroundImages'):
+            data[key] = scan[key]
+
         return data
 
+    def read_stylesheet(self, entry: dict) -> str:
+        """Load a captured stylesheet's text from disk, or None if it was not saved"""
+        try:
+            return Path(entry['local_path']).read_text(encoding='utf-8', errors='ignore')
+        except (KeyError, OSError):
+            return None
+
     async def extract_all_stylesheets(self, page: Page):
-        """Extract all CSS including cross-origin sheets"""
+        """Extract all CSS including cross-origin sheets
+
+        Sheets already captured from the network are not serialized or
+        re-fetched in the page; they come back as ``{href, captured, local_path}``
+        and their text is read from disk when needed. Call after
+        ``flush_assets()`` so the captured files are complete.
+        """
+        captured = {
+            s['url']: s['local_path'] for s in self.stylesheets
+            if not s.get('write_error') and Path(s['local_path']).exists()
+        }
 
-        css_content = await page.evaluate("""
-            async () => {
+        css_content = await self.evaluate('extract_all_stylesheets', page, """
+            async (capturedHrefs) => {
+                const captured = new Set(capturedHrefs);
                 const sheets = [];
 
                 for (const sheet of document.styleSheets) {
+                    if (sheet.href && captured.has(sheet.href)) {
+                        sheets.push({ href: sheet.href, captured: true, rules: [] });
+                        continue;
+                    }
+
                     const sheetInfo = {
                         href: sheet.href,
                         rules: []
@@ -604,6 +3154,7 @@ class WebsiteCloner:
                     sheets.push({
                         href: null,
                         isInline: true,
+                        inCssom: !!style.sheet,
                         index: i,
                         rules: [style.textContent]
                     });
@@ -611,13 +3162,19 @@ class WebsiteCloner:
 
                 return sheets;
             }
-        """)
+        """, list(captured))
+
+        for sheet in css_content:
+            if sheet.get('captured'):
+                sheet['local_path'] = captured[sheet['href']]
 
         return css_content
 
     async def extract_component_structure(self, page: Page):
         """Extract semantic component structure"""
-        return await page.evaluate("""
+        if self.extraction_backend == 'domsnapshot':
+            return component_tree_from_snapshot(await self.dom_snapshot(page))
+        return await self.evaluate('extract_component_structure', page, """
             () => {
                 const extractComponent = (el, depth = 0) => {
                     if (depth > 5) return null;
@@ -669,25 +3226,116 @@ class WebsiteCloner:
 
     async def take_screenshots(self, page: Page):
         """Take screenshots at multiple breakpoints"""
-        breakpoints = [
-            {'name': 'full', 'width': 1920, 'height': 1080},
-            {'name': 'desktop', 'width': 1440, 'height': 900},
-            {'name': 'tablet', 'width': 768, 'height': 1024},
-            {'name': 'mobile', 'width': 390, 'height': 844},
-        ]
-
         print("[*] Taking screenshots...")
-        for bp in breakpoints:
+        await self.render_breakpoints(page, self.output_dir, 'base')
+
+    async def render_breakpoints(self, page: Page, target_dir: Path, label: str) -> list:
+        """Write ``screenshot_<breakpoint>.png`` files for every configured breakpoint
+
+        Serial mode resizes ``page`` once per breakpoint. Parallel mode renders
+        all breakpoints at once, each in a sibling context of the same browser
+        restored to this page's storage state and theme. Compare mode does
+        both and records the timing of each.
+        """
+        mode = self.screenshot_mode
+        started = time.perf_counter()
+        if mode == 'parallel':
+            paths = await self._render_breakpoints_parallel(page, target_dir, label)
+        else:
+            paths = await self._render_breakpoints_serial(page, target_dir, label)
+        timing = {
+            'label': label,
+            'mode': 'parallel' if mode == 'parallel' else 'serial',
+            'breakpoints': len(self.breakpoints),
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+
+        if mode == 'compare':
+            scratch = target_dir / "_parallel_compare"
+            scratch.mkdir(parents=True, exist_ok=True)
+            started = time.perf_counter()
+            await self._render_breakpoints_parallel(page, scratch, f"{label} (compare)")
+            timing['parallel_seconds'] = round(time.perf_counter() - started, 3)
+            timing['speedup'] = round(timing['seconds'] / timing['parallel_seconds'], 2) if timing['parallel_seconds'] else None
+            shutil.rmtree(scratch, ignore_errors=True)
+            print(f"  [TIMING] {label}: serial {timing['seconds']}s vs parallel {timing['parallel_seconds']}s")
+
+        self.screenshot_timings.append(timing)
+        return paths
+
+    async def _render_breakpoints_serial(self, page: Page, target_dir: Path, label: str) -> list:
+        paths = []
+        for bp in self.breakpoints:
             await page.set_viewport_size({'width': bp['width'], 'height': bp['height']})
-            await page.wait_for_timeout(500)
-            await page.screenshot(
-                path=str(self.output_dir / f"screenshot_{bp['name']}.png"),
-                full_page=True
+            # Responsive images may start loading after the resize
+            await self.settle(page, 'viewport')
+            screenshot_path = target_dir / f"screenshot_{bp['name']}.png"
+            await page.screenshot(path=str(screenshot_path), full_page=True)
+            paths.append(str(screenshot_path))
+            print(f"  [SCREENSHOT] {label}/{bp['name']}: {bp['width']}x{bp['height']}")
+
+        # Reset to the profile viewport; media queries may have changed the DOM
+        await page.set_viewport_size(self.launch_profile['viewport'])
+        self.invalidate_style_scan(page)
+        return paths
+
+    async def _render_breakpoints_parallel(self, page: Page, target_dir: Path, label: str) -> list:
+        browser = page.context.browser
+        storage_state = await page.context.storage_state()
+        theme_state = await self.snapshot_theme_state(page)
+
+        async def render(bp: dict) -> str:
+            context = await browser.new_context(
+                viewport={'width': bp['width'], 'height': bp['height']},
+                user_agent=self.launch_profile['user_agent'],
+                color_scheme=self._color_schemes.get(page),
+                storage_state=storage_state
             )
-            print(f"  [SCREENSHOT] {bp['name']}: {bp['width']}x{bp['height']}")
+            shot_page = None
+            try:
+                shot_page = await context.new_page()
+                self._readiness[shot_page] = PageReadiness(shot_page)
+                if self.routing_policy.intercepts:
+                    await shot_page.route("**/*", self.sibling_route(f"breakpoint:{bp['name']}"))
+                await shot_page.goto(page.url, wait_until="networkidle", timeout=60000)
+                await self.apply_theme_state(shot_page, theme_state)
+                # One quick pass so lazy content below the fold is in the full-page shot
+                await self.evaluate('_render_breakpoints_parallel', shot_page, QUICK_SCROLL_JS)
+                await self.settle(shot_page, 'viewport', fonts=True)
+                screenshot_path = target_dir / f"screenshot_{bp['name']}.png"
+                await shot_page.screenshot(path=str(screenshot_path), full_page=True)
+                print(f"  [SCREENSHOT] {label}/{bp['name']}: {bp['width']}x{bp['height']}")
+                return str(screenshot_path)
+            finally:
+                await context.close()
+                self._readiness.pop(shot_page, None)
+
+        return list(await asyncio.gather(*(render(bp) for bp in self.breakpoints)))
+
+    async def snapshot_theme_state(self, page: Page) -> dict:
+        """Record the theme-bearing attributes of <html> and <body>"""
+        return await self.evaluate('snapshot_theme_state', page, """
+            () => {
+                const attrs = ['class', 'data-theme', 'data-mode', 'style'];
+                const read = el => Object.fromEntries(attrs.map(a => [a, el.getAttribute(a)]));
+                return { html: read(document.documentElement), body: read(document.body) };
+            }
+        """)
 
-        # Reset to desktop
-        await page.set_viewport_size({'width': 1920, 'height': 1080})
+    async def apply_theme_state(self, page: Page, state: dict):
+        """Restore attributes recorded by ``snapshot_theme_state`` on another page"""
+        await self.evaluate('apply_theme_state', page, """
+            (state) => {
+                const write = (el, attrs) => {
+                    for (const [name, value] of Object.entries(attrs)) {
+                        if (value === null) el.removeAttribute(name);
+                        else el.setAttribute(name, value);
+                    }
+                };
+                write(document.documentElement, state.html);
+                write(document.body, state.body);
+            }
+        """, state)
 
     def extract_color_palette(self, colors: list) -> dict:
         """Organize colors into a structured palette"""
@@ -734,25 +3382,39 @@ class WebsiteCloner:
 
         return unique
 
-    def combine_css(self, css_data: list) -> str:
-        """Combine all CSS into a single file"""
-
-        combined = "/* Combined CSS extracted from website */\n\n"
+    def combine_css(self, css_data: list, path: Path) -> dict:
+        """Stream all CSS into a single file, dropping repeated sheets and rules
 
+        Inline ``<style>`` text whose sheet is already in ``document.styleSheets``
+        is skipped: the CSSOM copy is a superset (it includes ``insertRule``
+        additions), so writing both would duplicate every rule.
+        """
+        sheets = []
+        skipped = 0
         for i, sheet in enumerate(css_data):
+            if sheet.get('isInline') and sheet.get('inCssom'):
+                skipped += 1
+                continue
             if sheet.get('href'):
-                combined += f"\n/* === External: {sheet['href']} === */\n"
+                sheets.append((f"External: {sheet['href']}", sheet))
             else:
-                combined += f"\n/* === Inline Style #{sheet.get('index', i)} === */\n"
+                sheets.append((f"Inline Style #{sheet.get('index', i)}", sheet))
 
-            for rule in sheet.get('rules', []):
-                combined += rule + "\n"
+        def load(sheet):
+            if sheet.get('captured'):
+                return self.read_stylesheet(sheet)
+            return "\n".join(sheet.get('rules', []))
 
-        return combined
+        stats = CSSCombiner(minify=self.minify_css).combine(sheets, path, load)
+        stats['duplicate_sheets'] += skipped
+        stats['sheets'] += skipped
+        print(f"  [CSS] {stats['sheets']} sheets, {stats['duplicate_sheets']} duplicate sheet(s), "
+              f"{stats['duplicate_rules']} duplicate rule(s) dropped, {stats['bytes_saved']} bytes saved")
+        return stats
 
     async def detect_current_theme(self, page: Page) -> str:
         """Detect if the page is currently in light or dark mode"""
-        theme_info = await page.evaluate("""
+        theme_info = await self.evaluate('detect_current_theme', page, """
             () => {
                 // Check various theme indicators
                 const html = document.documentElement;
@@ -792,7 +3454,7 @@ class WebsiteCloner:
 
     async def find_theme_toggle(self, page: Page) -> dict:
         """Find theme toggle button on the page"""
-        toggle_info = await page.evaluate("""
+        toggle_info = await self.evaluate('find_theme_toggle', page, """
             () => {
                 const selectors = [
                     // Common theme toggle selectors
@@ -875,6 +3537,9 @@ class WebsiteCloner:
         if not toggle_info.get('found'):
             return False
 
+        # Any previous style scan describes the old theme
+        self.invalidate_style_scan(page)
+
         try:
             selector = toggle_info.get('selector', '')
 
@@ -909,11 +3574,11 @@ class WebsiteCloner:
             if element:
                 # Scroll element into view
                 await element.scroll_into_view_if_needed()
-                await page.wait_for_timeout(300)
+                await self.settle(page, 'scroll_to', network=False)
 
                 # Click the element
                 await element.click()
-                await page.wait_for_timeout(1000)  # Wait for theme transition
+                await self.settle(page, 'theme', transitions=True)
                 print(f"  [TOGGLE] Clicked theme toggle successfully")
                 return True
             else:
@@ -922,8 +3587,8 @@ class WebsiteCloner:
                 y_pos = rect.get('y', 0)
 
                 # Scroll to the element's position
-                await page.evaluate(f"window.scrollTo(0, {y_pos - 100})")
-                await page.wait_for_timeout(300)
+                await self.evaluate('click_theme_toggle', page, f"window.scrollTo(0, {y_pos - 100})")
+                await self.settle(page, 'scroll_to', network=False)
 
                 # Recalculate position after scroll
                 x = rect.get('x', 0) + rect.get('width', 0) / 2
@@ -931,7 +3596,7 @@ class WebsiteCloner:
                 y = 100 + rect.get('height', 0) / 2
 
                 await page.mouse.click(x, y)
-                await page.wait_for_timeout(1000)
+                await self.settle(page, 'theme', transitions=True)
                 return True
 
         except Exception as e:
@@ -940,7 +3605,7 @@ class WebsiteCloner:
 
     async def toggle_theme_via_js(self, page: Page) -> bool:
         """Try to toggle theme via JavaScript manipulation"""
-        toggled = await page.evaluate("""
+        toggled = await self.evaluate('toggle_theme_via_js', page, """
             () => {
                 const html = document.documentElement;
                 const body = document.body;
@@ -975,7 +3640,8 @@ class WebsiteCloner:
             }
         """)
         if toggled:
-            await page.wait_for_timeout(500)
+            self.invalidate_style_scan(page)
+            await self.settle(page, 'theme', transitions=True)
         return toggled
 
     async def capture_theme(self, page: Page, theme_name: str):
@@ -987,23 +3653,8 @@ class WebsiteCloner:
         theme_dir.mkdir(parents=True, exist_ok=True)
 
         # Take screenshots at multiple breakpoints
-        breakpoints = [
-            {'name': 'full', 'width': 1920, 'height': 1080},
-            {'name': 'desktop', 'width': 1440, 'height': 900},
-            {'name': 'tablet', 'width': 768, 'height': 1024},
-            {'name': 'mobile', 'width': 390, 'height': 844},
-        ]
-
-        for bp in breakpoints:
-            await page.set_viewport_size({'width': bp['width'], 'height': bp['height']})
-            await page.wait_for_timeout(300)
-            screenshot_path = theme_dir / f"screenshot_{bp['name']}.png"
-            await page.screenshot(path=str(screenshot_path), full_page=True)
-            self.themes[theme_name]['screenshots'].append(str(screenshot_path))
-            print(f"  [SCREENSHOT] {theme_name}/{bp['name']}: {bp['width']}x{bp['height']}")
-
-        # Reset viewport
-        await page.set_viewport_size({'width': 1920, 'height': 1080})
+        paths = await self.render_breakpoints(page, theme_dir, theme_name)
+        self.themes[theme_name]['screenshots'].extend(paths)
 
         # Extract design system for this theme
         design_data = await self.extract_theme_design_system(page)
@@ -1016,68 +3667,45 @@ class WebsiteCloner:
         return design_data
 
     async def capture_animations(self, page: Page, duration_seconds: int = 25):
-        """Capture long-running animations with video and interval screenshots"""
+        """Capture long-running animations with video and interval screenshots
+
+        ``self.animation_mode`` picks the strategy: ``interval`` takes a
+        viewport screenshot every 2 seconds, ``diff`` samples quickly and
+        keeps only frames that changed (see ``_capture_changed_frames``),
+        ``virtual`` pauses the animation timeline and seeks it instead of
+        waiting (see ``_capture_virtual_frames``).
+        """
         print(f"[*] Capturing animations over {duration_seconds} seconds...")
 
         animations_dir = self.output_dir / "animations"
         animations_dir.mkdir(parents=True, exist_ok=True)
 
         # Detect animation durations on the page
-        animation_info = await page.evaluate("""
-            () => {
-                const animations = [];
-                let maxDuration = 0;
-
-                document.querySelectorAll('*').forEach(el => {
-                    const style = getComputedStyle(el);
-
-                    // Check CSS animations
-                    if (style.animationName && style.animationName !== 'none') {
-                        const duration = parseFloat(style.animationDuration) || 0;
-                        const delay = parseFloat(style.animationDelay) || 0;
-                        const iterations = style.animationIterationCount === 'infinite' ? 1 : parseFloat(style.animationIterationCount) || 1;
-                        const totalDuration = (duration + delay) * iterations;
-
-                        if (duration > 0) {
-                            animations.push({
-                                element: el.tagName + (el.className ? '.' + el.className.split(' ')[0] : ''),
-                                name: style.animationName,
-                                duration: duration,
-                                delay: delay,
-                                iterations: style.animationIterationCount,
-                                totalDuration: totalDuration
-                            });
-                            maxDuration = Math.max(maxDuration, totalDuration);
-                        }
-                    }
-
-                    // Check CSS transitions
-                    if (style.transitionDuration && style.transitionDuration !== '0s') {
-                        const duration = parseFloat(style.transitionDuration) || 0;
-                        if (duration > 0.5) { // Only track significant transitions
-                            animations.push({
-                                element: el.tagName + (el.className ? '.' + el.className.split(' ')[0] : ''),
-                                type: 'transition',
-                                duration: duration,
-                                property: style.transitionProperty
-                            });
-                        }
-                    }
-                });
-
-                return {
-                    animations: animations,
-                    maxDuration: maxDuration,
-                    suggestedCaptureDuration: Math.min(Math.max(maxDuration, 5), 30) // Between 5-30 seconds
-                };
-            }
-        """)
+        scan = await self.collect_styles(page)
+        animation_info = dict(scan['animationTimings'])
 
         # Use detected duration or provided duration
         capture_duration = max(animation_info.get('suggestedCaptureDuration', 10), duration_seconds)
         print(f"  [ANIM] Detected max animation duration: {animation_info.get('maxDuration', 0):.1f}s")
         print(f"  [ANIM] Capturing for: {capture_duration}s")
 
+        if self.animation_mode == 'virtual':
+            animation_info.update(await self._capture_virtual_frames(page, animations_dir, capture_duration))
+        elif self.animation_mode == 'diff':
+            animation_info.update(await self._capture_changed_frames(
+                page, animations_dir, capture_duration, animation_info.get('maxDuration', 0)
+            ))
+        else:
+            animation_info.update(await self._capture_interval_frames(page, animations_dir, capture_duration))
+        animation_info['mode'] = self.animation_mode
+
+        with open(animations_dir / "animation_capture.json", 'w') as f:
+            json.dump(animation_info, f, indent=2)
+
+        print(f"  [ANIM] Captured {len(animation_info['screenshots'])} frames over {animation_info['capture_duration']}s")
+        return animation_info
+
+    async def _capture_interval_frames(self, page: Page, animations_dir: Path, capture_duration: float) -> dict:
         # Take screenshots at regular intervals (every 2 seconds)
         interval = 2
         screenshot_count = int(capture_duration / interval) + 1
@@ -1091,27 +3719,220 @@ class WebsiteCloner:
             if i < screenshot_count - 1:
                 await page.wait_for_timeout(interval * 1000)
 
-        # Save animation metadata
-        animation_info['screenshots'] = [f"frame_{i*interval:03d}s.png" for i in range(screenshot_count)]
-        animation_info['capture_duration'] = capture_duration
-        animation_info['interval'] = interval
+        return {
+            'screenshots': [f"frame_{i*interval:03d}s.png" for i in range(screenshot_count)],
+            'capture_duration': capture_duration,
+            'interval': interval
+        }
 
-        with open(animations_dir / "animation_capture.json", 'w') as f:
-            json.dump(animation_info, f, indent=2)
+    async def _capture_changed_frames(self, page: Page, animations_dir: Path, capture_duration: float,
+                                      max_animation_duration: float = 0) -> dict:
+        """Sample the viewport quickly and keep only frames that visibly changed
+
+        Every ``sample_interval`` a small thumbnail is compared with the last
+        kept frame; only when more than ``animation_diff_threshold`` of its
+        pixels changed is a full viewport screenshot saved. Capture stops once
+        the view returns to the first frame after having changed (the loop
+        period), or when nothing has changed for the idle timeout.
+        """
+        sample_interval = self.animation_sample_interval
+        threshold = self.animation_diff_threshold
+        idle_timeout = max(5.0, max_animation_duration)
+        viewport = page.viewport_size or self.launch_profile['viewport']
+        thumb_scale = FRAME_DIFF_WIDTH / viewport['width']
+
+        client = await page.context.new_cdp_session(page)
+        loop = asyncio.get_running_loop()
+
+        async def thumbnail() -> bytes:
+            shot = await client.send('Page.captureScreenshot', {
+                'format': 'png',
+                'clip': {'x': 0, 'y': 0, 'width': viewport['width'], 'height': viewport['height'],
+                         'scale': thumb_scale}
+            })
+            png = base64.b64decode(shot['data'])
+            return await loop.run_in_executor(None, png_to_luma, png)
+
+        frames = []
+        samples = 0
+        loop_period = None
+        stop_reason = 'duration'
+        baseline = last_kept = None
+        last_change = diverged_at = 0.0
+
+        print(f"  [ANIM] Sampling every {sample_interval}s, keeping frames with >{threshold:.1%} change...")
+        started = loop.time()
+        try:
+            while True:
+                elapsed = loop.time() - started
+                if elapsed > capture_duration:
+                    break
+                luma = await thumbnail()
+                samples += 1
+
+                if baseline is None or luma_diff(luma, last_kept) > threshold:
+                    timestamp_ms = int(elapsed * 1000)
+                    filename = f"frame_{timestamp_ms:06d}ms.png"
+                    body = await page.screenshot(full_page=False)
+                    await self.asset_writer.write(animations_dir / filename, body)
+                    frames.append({'file': filename, 't': round(elapsed, 3)})
+                    print(f"    [FRAME] {elapsed:.2f}s")
+                    if baseline is None:
+                        baseline = luma
+                    last_kept = luma
+                    last_change = elapsed
+
+                # The loop closes when the view comes back to the first frame
+                if baseline is not None and len(frames) > 1:
+                    if not diverged_at and luma_diff(luma, baseline) > threshold:
+                        diverged_at = elapsed
+                    elif diverged_at and luma_diff(luma, baseline) <= threshold:
+                        loop_period = round(elapsed, 3)
+                        stop_reason = 'loop_detected'
+                        break
+
+                if elapsed - last_change > idle_timeout:
+                    stop_reason = 'idle'
+                    break
+
+                next_sample = started + samples * sample_interval
+                await asyncio.sleep(max(0, next_sample - loop.time()))
+        finally:
+            await client.detach()
+
+        print(f"  [ANIM] {len(frames)} of {samples} samples kept ({stop_reason})")
+        return {
+            'screenshots': [f['file'] for f in frames],
+            'frames': frames,
+            'capture_duration': round(loop.time() - started, 2),
+            'interval': sample_interval,
+            'samples': samples,
+            'diff_threshold': threshold,
+            'loop_period': loop_period,
+            'stop_reason': stop_reason
+        }
 
-        print(f"  [ANIM] Captured {screenshot_count} frames over {capture_duration}s")
-        return animation_info
+    async def _capture_virtual_frames(self, page: Page, animations_dir: Path, capture_duration: float) -> dict:
+        """Step CSS and Web Animations deterministically instead of waiting for them
+
+        The DevTools Animation domain freezes the document timeline, every
+        animation from ``document.getAnimations()`` is paused, and the
+        viewport is rendered at each keyframe boundary (plus a regular grid)
+        by seeking ``currentTime``. Keyframes and timings of every animation
+        are recorded. Animations driven by script (canvas, rAF loops) are not
+        stepped. Playback is restored afterwards.
+        """
+        step = 0.5
+        client = await page.context.new_cdp_session(page)
+        started = time.perf_counter()
+        frames = []
+        try:
+            await client.send('Animation.enable')
+            await client.send('Animation.setPlaybackRate', {'playbackRate': 0})
+
+            timeline = await self.evaluate('_capture_virtual_frames', page, """
+                () => {
+                    const describe = el => !el ? null :
+                        el.tagName.toLowerCase() + (el.id ? '#' + el.id : '') +
+                        ((el.getAttribute('class') || '').trim() ? '.' + el.getAttribute('class').trim().split(/\\s+/)[0] : '');
+                    const animations = document.getAnimations();
+                    window.__clonerTimeline = animations.map(a => ({
+                        animation: a,
+                        wasRunning: a.playState === 'running',
+                        currentTime: a.currentTime
+                    }));
+                    return animations.map((a, i) => {
+                        a.pause();
+                        const timing = a.effect ? a.effect.getComputedTiming() : {};
+                        let keyframes = [];
+                        try { keyframes = a.effect.getKeyframes(); } catch (e) {}
+                        return {
+                            index: i,
+                            type: a.constructor.name,
+                            name: a.animationName || a.transitionProperty || a.id || null,
+                            target: describe(a.effect && a.effect.target),
+                            delay: timing.delay || 0,
+                            duration: typeof timing.duration === 'number' ? timing.duration : 0,
+                            iterations: timing.iterations === Infinity ? 'infinite' : timing.iterations,
+                            endTime: timing.endTime === Infinity ? null : timing.endTime,
+                            keyframes: keyframes.map(k => Object.fromEntries(
+                                Object.entries(k).filter(([, v]) => typeof v !== 'function')
+                            ))
+                        };
+                    });
+                }
+            """)
+
+            # Render at every keyframe boundary of the first iteration, plus a regular grid
+            horizon = capture_duration * 1000
+            finite_ends = [a['endTime'] for a in timeline if a['endTime']]
+            first_cycles = [a['delay'] + a['duration'] for a in timeline if a['duration']]
+            if finite_ends or first_cycles:
+                horizon = min(horizon, max(finite_ends + first_cycles))
+            times = {round(i * step * 1000) for i in range(int(horizon / (step * 1000)) + 1)}
+            for anim in timeline:
+                for keyframe in anim['keyframes']:
+                    offset = keyframe.get('computedOffset', keyframe.get('offset'))
+                    if isinstance(offset, (int, float)):
+                        times.add(round(anim['delay'] + offset * anim['duration']))
+            times = sorted(t for t in times if 0 <= t <= horizon)
+            if len(times) > VIRTUAL_MAX_FRAMES:
+                stride = len(times) / VIRTUAL_MAX_FRAMES
+                times = [times[int(i * stride)] for i in range(VIRTUAL_MAX_FRAMES)]
+
+            print(f"  [ANIM] Seeking {len(timeline)} animation(s) through {len(times)} timeline states...")
+            for t in times:
+                await self.evaluate('_capture_virtual_frames', page, """
+                    async (t) => {
+                        for (const entry of window.__clonerTimeline) entry.animation.currentTime = t;
+                        await Promise.race([
+                            new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r))),
+                            new Promise(r => setTimeout(r, 100))
+                        ]);
+                    }
+                """, t)
+                filename = f"frame_{t:06d}ms.png"
+                body = await page.screenshot(full_page=False)
+                await self.asset_writer.write(animations_dir / filename, body)
+                frames.append({'file': filename, 't': round(t / 1000, 3)})
+        finally:
+            try:
+                await self.evaluate('_capture_virtual_frames', page, """
+                    () => {
+                        for (const entry of window.__clonerTimeline || []) {
+                            entry.animation.currentTime = entry.currentTime;
+                            if (entry.wasRunning) entry.animation.play();
+                        }
+                        delete window.__clonerTimeline;
+                    }
+                """)
+                await client.send('Animation.setPlaybackRate', {'playbackRate': 1})
+                await client.send('Animation.disable')
+            finally:
+                await client.detach()
+
+        return {
+            'screenshots': [f['file'] for f in frames],
+            'frames': frames,
+            'capture_duration': round(frames[-1]['t'], 3) if frames else 0,
+            'wall_seconds': round(time.perf_counter() - started, 2),
+            'timeline': timeline
+        }
 
     async def record_hero_video(self, page: Page, duration_seconds: int = 25):
         """Record a video of the hero section animation"""
+        if self.animation_mode == 'virtual':
+            # Seeking the paused timeline replaces the real-time recording
+            return await self.capture_animations(page, duration_seconds)
+
         print(f"[*] Recording hero section for {duration_seconds}s...")
 
         videos_dir = self.output_dir / "animations"
         videos_dir.mkdir(parents=True, exist_ok=True)
 
         # Scroll to top to ensure hero is visible
-        await page.evaluate("window.scrollTo(0, 0)")
-        await page.wait_for_timeout(500)
+        await self.evaluate('record_hero_video', page, "window.scrollTo(0, 0)")
+        await self.settle(page, 'scroll_to')
 
         # Try to find hero section
         hero_element = await page.query_selector('section:first-of-type, .hero, [class*="hero"], header + section, main > section:first-child, main > div:first-child')
@@ -1123,8 +3944,29 @@ class WebsiteCloner:
                 print(f"  [HERO] Found hero section: {box['width']}x{box['height']}")
 
         # Record using CDP (Chrome DevTools Protocol) for better control
+        client = None
+        encoder = None
+        acks = set()  # Referenced until done so pending acks are not collected
+        stats = None
         try:
             client = await page.context.new_cdp_session(page)
+            encoder = ScreencastEncoder(videos_dir)
+            await encoder.start()
+
+            async def ack(session_id):
+                try:
+                    await client.send('Page.screencastFrameAck', {'sessionId': session_id})
+                except Exception:
+                    pass  # Screencast already stopped
+
+            def handle_frame(params):
+                # Ack immediately so Chromium keeps frames coming
+                task = asyncio.ensure_future(ack(params['sessionId']))
+                acks.add(task)
+                task.add_done_callback(acks.discard)
+                encoder.submit(params['data'])
+
+            client.on('Page.screencastFrame', handle_frame)
             await client.send('Page.startScreencast', {
                 'format': 'png',
                 'quality': 80,
@@ -1133,110 +3975,52 @@ class WebsiteCloner:
                 'everyNthFrame': 2  # Capture every 2nd frame
             })
 
-            frames = []
-            start_time = asyncio.get_event_loop().time()
-
-            def handle_frame(params):
-                frames.append(params)
-
-            client.on('Page.screencastFrame', handle_frame)
-
             # Wait for the animation duration
             await page.wait_for_timeout(duration_seconds * 1000)
 
             await client.send('Page.stopScreencast')
-
-            # Save frames
-            print(f"  [VIDEO] Captured {len(frames)} frames")
-            for i, frame in enumerate(frames[:50]):  # Limit to 50 frames
-                frame_data = base64.b64decode(frame['data'])
-                frame_path = videos_dir / f"hero_frame_{i:04d}.png"
-                with open(frame_path, 'wb') as f:
-                    f.write(frame_data)
-
-            return len(frames)
-
+            stats = await encoder.close()
+            encoder = None
         except Exception as e:
             print(f"  [!] CDP recording failed: {e}")
+        finally:
+            # Always end ffmpeg and the drain task, even if the screencast never started
+            if encoder is not None:
+                try:
+                    await encoder.close()
+                except Exception:
+                    pass
+            if acks:
+                await asyncio.gather(*list(acks), return_exceptions=True)
+            if client is not None:
+                try:
+                    await client.detach()
+                except Exception:
+                    pass
+
+        if stats is None:
             # Fallback to interval screenshots
             return await self.capture_animations(page, duration_seconds)
 
+        print(f"  [VIDEO] Captured {stats['frames_received']} frames "
+              f"({stats['frames_written']} PNGs, {stats['frames_dropped']} dropped)")
+        if stats.get('video'):
+            print(f"  [VIDEO] Encoded {stats['video']}")
+        stats = dict(stats, mode='screencast', duration_seconds=duration_seconds)
+        with open(videos_dir / "hero_capture.json", 'w') as f:
+            json.dump(stats, f, indent=2)
+        return stats
+
     async def extract_theme_design_system(self, page: Page) -> dict:
         """Extract design system colors and styles for current theme"""
-        return await page.evaluate("""
-            () => {
-                const rgbToHex = (rgb) => {
-                    if (!rgb || rgb === 'transparent' || rgb === 'rgba(0, 0, 0, 0)') return null;
-                    const match = rgb.match(/rgba?\\((\\d+),\\s*(\\d+),\\s*(\\d+)/);
-                    if (!match) return rgb;
-                    return '#' + [match[1], match[2], match[3]]
-                        .map(x => parseInt(x).toString(16).padStart(2, '0'))
-                        .join('');
-                };
-
-                const result = {
-                    colors: { backgrounds: [], texts: [], borders: [], all: [] },
-                    cssVariables: {},
-                    gradients: [],
-                    shadows: []
-                };
-
-                // Get CSS variables from :root
-                const rootStyles = getComputedStyle(document.documentElement);
-                for (let i = 0; i < rootStyles.length; i++) {
-                    const prop = rootStyles[i];
-                    if (prop.startsWith('--')) {
-                        result.cssVariables[prop] = rootStyles.getPropertyValue(prop).trim();
-                    }
-                }
-
-                const seenColors = new Set();
-
-                document.querySelectorAll('*').forEach(el => {
-                    const style = getComputedStyle(el);
-
-                    // Background colors
-                    const bg = rgbToHex(style.backgroundColor);
-                    if (bg && !seenColors.has(bg)) {
-                        seenColors.add(bg);
-                        result.colors.backgrounds.push(bg);
-                        result.colors.all.push(bg);
-                    }
-
-                    // Text colors
-                    const text = rgbToHex(style.color);
-                    if (text && !seenColors.has(text)) {
-                        seenColors.add(text);
-                        result.colors.texts.push(text);
-                        result.colors.all.push(text);
-                    }
-
-                    // Border colors
-                    const border = rgbToHex(style.borderColor);
-                    if (border && !seenColors.has(border)) {
-                        seenColors.add(border);
-                        result.colors.borders.push(border);
-                        result.colors.all.push(border);
-                    }
-
-                    // Gradients
-                    if (style.backgroundImage.includes('gradient')) {
-                        result.gradients.push(style.backgroundImage);
-                    }
-
-                    // Shadows
-                    if (style.boxShadow !== 'none') {
-                        result.shadows.push(style.boxShadow);
-                    }
-                });
-
-                // Dedupe
-                result.gradients = [...new Set(result.gradients)].slice(0, 10);
-                result.shadows = [...new Set(result.shadows)].slice(0, 10);
-
-                return result;
-            }
-        """)
+        scan = await self.collect_styles(page)
+        design = scan['designSystem']
+        return {
+            'colors': design['colors'],
+            'cssVariables': scan['cssVariables'],
+            'gradients': design['gradients'],
+            'shadows': design['shadows']
+        }
 
     def generate_tailwind_config(self, design_system: dict):
         """Generate Tailwind config from design tokens"""
@@ -1320,6 +4104,8 @@ module.exports = {{
 | `data/animations.json` | CSS keyframes and transitions |
 | `data/component_tree.json` | Semantic component hierarchy |
 | `data/video_sources.json` | Video file information |
+| `data/network_log.ndjson` | Every network response, one JSON object per line |
+| `data/stylesheets.ndjson` | Extracted stylesheet contents, one sheet per line |
 | `assets/fonts/` | Downloaded font files |
 | `assets/images/` | Downloaded images |
 | `assets/videos/` | Downloaded videos |
@@ -1423,8 +4209,12 @@ If videos use blob URLs:
 """
         return report_md
 
-    async def clone(self):
-        """Main cloning method"""
+    async def clone(self, browser: Browser = None):
+        """Main cloning method
+
+        When a ``browser`` is passed in (batch mode) the clone runs in its own
+        context of that browser and leaves the browser open for the next job.
+        """
 
         self.setup_directories()
 
@@ -1434,277 +4224,1067 @@ If videos use blob URLs:
         print(f"\nTarget URL: {self.url}")
         print(f"Output Dir: {self.output_dir}\n")
 
-        async with async_playwright() as p:
-            # Launch browser in headed mode for better video capture
-            browser = await p.chromium.launch(
-                headless=False,
-                args=[
-                    '--autoplay-policy=no-user-gesture-required',
-                    '--disable-features=PreloadMediaEngagementData,MediaEngagementBypassAutoplayPolicies',
-                    '--disable-web-security',
-                    '--disable-features=IsolateOrigins,site-per-process'
-                ]
-            )
-
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                record_video_dir=str(self.videos_dir),
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-
-            page = await context.new_page()
-
-            # Set up network interception
-            page.on("response", self.capture_network)
-
-            print(f"[*] Navigating to {self.url}")
-            await page.goto(self.url, wait_until="networkidle", timeout=60000)
-
-            # Wait for dynamic content
-            await page.wait_for_timeout(3000)
-
-            # Deep scroll to trigger lazy loading
-            await self.deep_scroll(page)
-            await page.wait_for_timeout(2000)
+        if self.incremental:
+            self.load_incremental_cache()
 
-            # Capture blob video information
-            await self.capture_blob_videos(page)
+        if browser is None:
+            async with async_playwright() as p:
+                browser = await launch_browser(p, self.launch_profile)
+                try:
+                    report = await self.clone_in_browser(browser)
+                finally:
+                    await browser.close()
+        else:
+            report = await self.clone_in_browser(browser)
 
-            # Capture hero animations (before scrolling away)
-            await page.evaluate("window.scrollTo(0, 0)")
-            await page.wait_for_timeout(500)
-            animation_capture = await self.capture_animations(page, duration_seconds=25)
+        print(f"\n{'=' * 50}")
+        print("  Clone Complete!")
+        print(f"{'=' * 50}")
+        print(f"\nOutput directory: {self.output_dir}")
 
-            # === THEME CAPTURE ===
-            print("[*] Detecting theme...")
-            initial_theme = await self.detect_current_theme(page)
-            print(f"  [THEME] Initial theme detected: {initial_theme}")
+        return report
 
-            # Find theme toggle
-            print("[*] Looking for theme toggle...")
-            toggle_info = await self.find_theme_toggle(page)
-            if toggle_info.get('found'):
-                self.detected_theme_toggle = toggle_info
-                print(f"  [TOGGLE] Found: {toggle_info.get('selector')} - {toggle_info.get('ariaLabel') or toggle_info.get('className', '')[:50]}")
+    def plan_stages(self) -> dict:
+        """Decide for every pipeline stage whether to run, restore or skip it
+
+        Returns ``{stage: (action, state)}`` where ``state`` is the restored
+        checkpoint. A stage excluded by ``--only``/``--skip`` is restored when
+        it has a checkpoint; with ``resume`` every checkpointed stage is.
+        Once a stage runs, the checkpoints of every later stage are stale and
+        are neither restored nor kept.
+        """
+        plan = {}
+        stale = False
+        for stage in PIPELINE_STAGES:
+            excluded = (stage in self.skip_stages or bool(self.only_stages and stage not in self.only_stages)
+                        or (stage == 'coverage' and not self.css_coverage))
+            state = None if stale else self.checkpoints.load(stage)
+            if state is not None and (excluded or self.resume):
+                plan[stage] = ('restore', state)
+            elif excluded:
+                plan[stage] = ('skip', None)
             else:
-                print("  [TOGGLE] No theme toggle found - will try JS fallback")
+                plan[stage] = ('run', None)
+                stale = True
+
+        # A page cannot be checkpointed: navigate again whenever a stage needs
+        # it, and scroll again so lazy content is present unless told not to
+        if any(plan[stage][0] == 'run' for stage in PAGE_STAGES):
+            plan['navigate'] = ('run', None)
+            if 'scroll' not in self.skip_stages and any(
+                    plan[stage][0] == 'run' for stage in PAGE_STAGES if stage != 'scroll'):
+                plan['scroll'] = ('run', None)
+        return plan
+
+    def restore_stage(self, stage: str, state: dict):
+        """Put a checkpointed stage's attributes back on the cloner"""
+        for name, value in state.items():
+            setattr(self, name, value)
+        if stage in ('assets', 'extraction'):
+            # Responses for these URLs are not captured a second time
+            self._restored_urls.update(self.fonts)
+            for entries in (self.stylesheets, self.scripts, self.images, self.videos, self.rive_animations):
+                self._restored_urls.update(entry['url'] for entry in entries)
+
+    async def clone_in_browser(self, browser: Browser) -> dict:
+        """Run the planned pipeline stages, using a fresh context of an already running browser"""
+        # --resume, --only and --skip build on the last run's checkpoints;
+        # any other run starts over
+        self.checkpoints.begin(continue_run=bool(self.resume or self.only_stages or self.skip_stages))
+        plan = self.plan_stages()
+        for stage, (action, state) in plan.items():
+            if action == 'restore':
+                self.restore_stage(stage, state)
+                self.stage_log.append({'stage': stage, 'action': 'restored'})
+                continue
+            # Re-run or stale: a crash later on must not leave the old checkpoint behind
+            self.checkpoints.discard(stage)
+            if action == 'skip':
+                self.stage_log.append({'stage': stage, 'action': 'skipped'})
+        print(f"[*] Stages: " + ", ".join(f"{stage}={action}" for stage, (action, _) in plan.items()))
+
+        # Responses are logged to disk as they arrive; a resumed run adds to the old log
+        resumed = any(action == 'restore' for action, _ in plan.values())
+        self.network_log = NDJSONWriter(self.data_dir / "network_log.ndjson", append=resumed)
+        context = None
+        try:
+            page = None
+            if plan['navigate'][0] == 'run':
+                context_options = {
+                    'viewport': self.launch_profile['viewport'],
+                    'user_agent': self.launch_profile['user_agent'],
+                }
+                if self.launch_profile['session_video']:
+                    context_options['record_video_dir'] = str(self.videos_dir)
+                context = await browser.new_context(**context_options)
+                page = await context.new_page()
+
+            report = None
+            for stage in PIPELINE_STAGES:
+                if plan[stage][0] != 'run':
+                    continue
+                started = time.perf_counter()
+                try:
+                    with self.profiler.stage(stage):
+                        if stage == 'report':
+                            report = await self.stage_report()
+                            state = {}
+                        else:
+                            state = await getattr(self, f"stage_{stage}")(page)
+                except Exception:
+                    print(f"  [!] Stage '{stage}' failed; completed stages are checkpointed, rerun with --resume")
+                    raise
+                seconds = time.perf_counter() - started
+                self.checkpoints.save(stage, state, seconds)
+                self.stage_log.append({'stage': stage, 'action': 'ran', 'seconds': round(seconds, 2)})
+            return report
+        finally:
+            # Media downloads may still use the context, so flush before closing it
+            await self.flush_assets()
+            await self.media_downloader.close()
+            # Closing the context also finalizes the session video
+            if context is not None:
+                await context.close()
+            self.asset_writer.close()
+            self.network_log.close()
+
+            # Complete profile, including the report stage itself
+            with open(self.data_dir / "profile.json", 'w') as f:
+                json.dump(self.profiler.summary(), f, indent=2)
+            if self.trace:
+                self.profiler.write_trace(self.data_dir / "clone_trace.json")
+                print(f"  [PROFILE] Trace written to {self.data_dir / 'clone_trace.json'}")
+
+    async def stage_navigate(self, page: Page) -> dict:
+        """Open the page and wait for it to settle"""
+        # Set up network interception
+        page.on("response", self._on_response)
+        self._readiness[page] = PageReadiness(page)
+        if self.incremental_cache:
+            await page.route(lambda url: url in self.incremental_cache, self.serve_from_cache)
+        self.media_downloader.attach(page.context, self.launch_profile['user_agent'])
+        # Registered last so it runs first and falls back to the cache handler
+        if self.routing_policy.intercepts:
+            await page.route("**/*", self.route_request)
+        if self.js_coverage:
+            await self.start_js_coverage(page)
+
+        print(f"[*] Navigating to {self.url}")
+        await page.goto(self.url, wait_until="networkidle", timeout=60000)
+
+        # Wait for dynamic content
+        await self.settle(page, 'load', fonts=True)
+        return {}
+
+    async def stage_scroll(self, page: Page) -> dict:
+        """Trigger lazy loading and record blob videos"""
+        # Deep scroll to trigger lazy loading
+        await self.deep_scroll(page)
+        await self.settle(page, 'after_scroll')
+
+        # Capture blob video information
+        await self.capture_blob_videos(page)
+        return {'scroll_stats': self.scroll_stats}
+
+    async def stage_assets(self, page: Page) -> dict:
+        """Wait for the assets captured so far to reach disk and checkpoint the asset lists
+
+        Stylesheets are read from the CSSOM in the extraction stage, after
+        themes, animations and breakpoint renders have loaded theirs.
+        """
+        await self.flush_assets()
+        return self.asset_lists()
+
+    def asset_lists(self) -> dict:
+        """The captured asset lists, as checkpointed by the assets and extraction stages"""
+        return {
+            'fonts': self.fonts,
+            'stylesheets': self.stylesheets,
+            'scripts': self.scripts,
+            'images': self.images,
+            'videos': self.videos,
+            'video_sources': self.video_sources,
+            'rive_animations': self.rive_animations
+        }
 
-            # Capture initial theme
-            await self.capture_theme(page, initial_theme)
+    async def stage_animations(self, page: Page) -> dict:
+        """Capture hero animations from the top of the page"""
+        await self.evaluate('stage_animations', page, "window.scrollTo(0, 0)")
+        await self.settle(page, 'scroll_to')
+        if self.hero_video:
+            self.animation_capture = await self.record_hero_video(page, duration_seconds=self.animation_duration)
+        else:
+            self.animation_capture = await self.capture_animations(page, duration_seconds=self.animation_duration)
+        return {'animation_capture': self.animation_capture}
+
+    async def stage_themes(self, page: Page) -> dict:
+        """Capture the initial theme and, if a switch works, the alternate one
+
+        In ``auto`` theme mode both themes are captured at once, the alternate
+        one in a sibling context (see ``_capture_themes_in_parallel``); the
+        toggle flow on the main page is the fallback and the ``toggle`` mode.
+        """
+        print("[*] Detecting theme...")
+        initial_theme = await self.detect_current_theme(page)
+        print(f"  [THEME] Initial theme detected: {initial_theme}")
+
+        # Find theme toggle
+        print("[*] Looking for theme toggle...")
+        toggle_info = await self.find_theme_toggle(page)
+        if toggle_info.get('found'):
+            self.detected_theme_toggle = toggle_info
+            print(f"  [TOGGLE] Found: {toggle_info.get('selector')} - {toggle_info.get('ariaLabel') or toggle_info.get('className', '')[:50]}")
+        else:
+            print("  [TOGGLE] No theme toggle found - will try JS fallback")
+
+        started = time.perf_counter()
+        mechanism = None
+        if self.theme_mode == 'auto':
+            mechanism = await self._capture_themes_in_parallel(page, initial_theme)
+        if mechanism is None:
+            mechanism = 'toggle'
+            await self._capture_themes_by_toggle(page, initial_theme, toggle_info)
+
+        # Save theme summary
+        self.theme_summary = {
+            'initial_theme': initial_theme,
+            'mechanism': mechanism,
+            'capture_seconds': round(time.perf_counter() - started, 2),
+            'themes_captured': list(k for k, v in self.themes.items() if v['design_system']),
+            'toggle_found': toggle_info.get('found', False),
+            'toggle_info': toggle_info if toggle_info.get('found') else None
+        }
+        with open(self.data_dir / "theme_info.json", 'w') as f:
+            json.dump(self.theme_summary, f, indent=2)
 
-            # Try to switch to alternate theme
-            alternate_theme = 'dark' if initial_theme == 'light' else 'light'
-            theme_switched = False
+        return {
+            'themes': self.themes,
+            'detected_theme_toggle': self.detected_theme_toggle,
+            'theme_summary': self.theme_summary
+        }
 
-            if toggle_info.get('found'):
-                print(f"[*] Clicking theme toggle to switch to {alternate_theme}...")
-                theme_switched = await self.click_theme_toggle(page, toggle_info)
-                if theme_switched:
-                    # Scroll back to top for consistent screenshots
-                    await page.evaluate("window.scrollTo(0, 0)")
-                    await page.wait_for_timeout(500)
-
-                    # Verify the theme actually changed
-                    new_theme = await self.detect_current_theme(page)
-                    if new_theme == initial_theme:
-                        print(f"  [!] Theme didn't change after click, trying JS fallback...")
-                        theme_switched = False
-                    else:
-                        print(f"  [THEME] Theme changed to: {new_theme}")
+    async def _capture_themes_by_toggle(self, page: Page, initial_theme: str, toggle_info: dict):
+        """Capture both themes on the main page: toggle, capture, toggle back"""
+        # Capture initial theme
+        await self.capture_theme(page, initial_theme)
 
-            if not theme_switched:
-                print(f"[*] Trying JS-based theme toggle...")
-                theme_switched = await self.toggle_theme_via_js(page)
-                if theme_switched:
-                    await page.evaluate("window.scrollTo(0, 0)")
-                    await page.wait_for_timeout(500)
+        # Try to switch to alternate theme
+        alternate_theme = 'dark' if initial_theme == 'light' else 'light'
+        theme_switched = False
 
+        if toggle_info.get('found'):
+            print(f"[*] Clicking theme toggle to switch to {alternate_theme}...")
+            theme_switched = await self.click_theme_toggle(page, toggle_info)
             if theme_switched:
-                # Verify and capture alternate theme
-                new_theme = await self.detect_current_theme(page)
-                print(f"  [THEME] Capturing {new_theme} theme...")
-                await self.capture_theme(page, new_theme)
+                # Scroll back to top for consistent screenshots
+                await self.evaluate('_capture_themes_by_toggle', page, "window.scrollTo(0, 0)")
+                await self.settle(page, 'scroll_to')
 
-                # Switch back to original for remaining extraction
-                print(f"[*] Switching back to {initial_theme} theme...")
-                if toggle_info.get('found'):
-                    await self.click_theme_toggle(page, toggle_info)
+                # Verify the theme actually changed
+                new_theme = await self.detect_current_theme(page)
+                if new_theme == initial_theme:
+                    print(f"  [!] Theme didn't change after click, trying JS fallback...")
+                    theme_switched = False
                 else:
-                    await self.toggle_theme_via_js(page)
+                    print(f"  [THEME] Theme changed to: {new_theme}")
 
-                # Scroll back to top
-                await page.evaluate("window.scrollTo(0, 0)")
-                await page.wait_for_timeout(500)
-            else:
-                print(f"  [!] Could not switch themes - only {initial_theme} theme captured")
-
-            # Save theme summary
-            theme_summary = {
-                'initial_theme': initial_theme,
-                'themes_captured': list(k for k, v in self.themes.items() if v['design_system']),
-                'toggle_found': toggle_info.get('found', False),
-                'toggle_info': toggle_info if toggle_info.get('found') else None
-            }
-            with open(self.data_dir / "theme_info.json", 'w') as f:
-                json.dump(theme_summary, f, indent=2)
-
-            # === END THEME CAPTURE ===
-
-            # Take regular screenshots (in initial theme)
-            await self.take_screenshots(page)
-
-            # Extract page data
-            print("[*] Extracting page data...")
-            page_data = await self.extract_page_data(page)
-
-            # Extract stylesheets
-            print("[*] Extracting stylesheets...")
-            css_data = await self.extract_all_stylesheets(page)
-
-            # Extract component tree
-            print("[*] Extracting component structure...")
-            component_tree = await self.extract_component_structure(page)
-
-            # Store HTML
-            self.html = page_data['html']
-            (self.output_dir / "index.html").write_text(self.html, encoding='utf-8')
-
-            # Save combined CSS
-            combined_css = self.combine_css(css_data)
-            (self.output_dir / "combined_styles.css").write_text(combined_css, encoding='utf-8')
-
-            # Prepare design system data
-            design_system = {
-                'colors': self.extract_color_palette(page_data['colors']),
-                'css_variables': page_data['cssVariables'],
-                'fonts': page_data['fonts'],
-                'font_faces': page_data['fontFaces'],
-                'typography': self.dedupe_typography(page_data['typography']),
-                'backgrounds': [],
-                'texts': [],
-                'shadows': [],
-                'borderRadius': [],
-                'gradients': []
-            }
+        if not theme_switched:
+            print(f"[*] Trying JS-based theme toggle...")
+            theme_switched = await self.toggle_theme_via_js(page)
+            if theme_switched:
+                await self.evaluate('_capture_themes_by_toggle', page, "window.scrollTo(0, 0)")
+                await self.settle(page, 'scroll_to')
 
-            # Extract additional design tokens from computed styles
-            for key, style in page_data.get('computedStyles', {}).items():
-                if style.get('backgroundColor') and style['backgroundColor'] not in design_system['backgrounds']:
-                    design_system['backgrounds'].append(style['backgroundColor'])
-                if style.get('boxShadow') and style['boxShadow'] != 'none':
-                    design_system['shadows'].append(style['boxShadow'])
-                if style.get('borderRadius') and style['borderRadius'] != '0px':
-                    design_system['borderRadius'].append(style['borderRadius'])
-
-            # Dedupe lists
-            design_system['shadows'] = list(set(design_system['shadows']))[:10]
-            design_system['borderRadius'] = list(set(design_system['borderRadius']))[:10]
-
-            # Generate Tailwind config
-            self.generate_tailwind_config(design_system)
-
-            # Compile comprehensive report
-            report = {
-                "url": self.url,
-                "extracted_at": datetime.now().isoformat(),
-                "title": page_data['title'],
-                "meta": page_data['meta'],
-
-                "design_system": design_system,
-
-                "layout": {
-                    "computed_styles": page_data['computedStyles']
-                },
-
-                "animations": {
-                    "keyframes": page_data['keyframes'],
-                    "animated_elements": page_data['animations']
-                },
-
-                "media": {
-                    "videos": page_data['videos'],
-                    "background_images": page_data['backgroundImages'],
-                    "images": self.images
-                },
-
-                "assets": {
-                    "fonts": self.fonts,
-                    "stylesheets": [{"url": s['url'], "local_path": s['local_path']} for s in self.stylesheets],
-                    "scripts": self.scripts,
-                    "images": self.images,
-                    "videos": self.videos
-                },
-
-                "stylesheets_content": css_data,
-                "network_log": self.network_requests,
-                "links": page_data['links']
-            }
+        if theme_switched:
+            # Verify and capture alternate theme
+            new_theme = await self.detect_current_theme(page)
+            print(f"  [THEME] Capturing {new_theme} theme...")
+            await self.capture_theme(page, new_theme)
 
-            # Save data files
-            print("[*] Saving data files...")
+            # Switch back to original for remaining extraction
+            print(f"[*] Switching back to {initial_theme} theme...")
+            if toggle_info.get('found'):
+                await self.click_theme_toggle(page, toggle_info)
+            else:
+                await self.toggle_theme_via_js(page)
+
+            # Scroll back to top
+            await self.evaluate('_capture_themes_by_toggle', page, "window.scrollTo(0, 0)")
+            await self.settle(page, 'scroll_to')
+        else:
+            print(f"  [!] Could not switch themes - only {initial_theme} theme captured")
+
+    async def _capture_themes_in_parallel(self, page: Page, initial_theme: str):
+        """Capture both themes at once, the alternate one in a sibling context
+
+        The sibling context emulates the alternate ``prefers-color-scheme``;
+        if the site ignores it, the class/attribute switch of
+        ``toggle_theme_via_js`` is applied there instead. Returns the
+        mechanism used, or None when neither changed the rendered colors.
+        """
+        alternate = 'dark' if initial_theme == 'light' else 'light'
+        baseline = await self.evaluate('_capture_themes_in_parallel', page, THEME_FINGERPRINT_JS)
+        context = None
+        theme_page = None
+        try:
+            context = await page.context.browser.new_context(
+                viewport=page.viewport_size or self.launch_profile['viewport'],
+                user_agent=self.launch_profile['user_agent'],
+                color_scheme=alternate,
+                storage_state=await page.context.storage_state()
+            )
+            theme_page = await context.new_page()
+            self._readiness[theme_page] = PageReadiness(theme_page)
+            self._color_schemes[theme_page] = alternate
+            if self.routing_policy.intercepts:
+                await theme_page.route("**/*", self.sibling_route(f"theme:{alternate}"))
+
+            # Only assets the main page has not captured yet (e.g. dark logos)
+            known_urls = self.known_asset_urls()
+
+            def on_response(response):
+                if response.url not in known_urls:
+                    self._on_response(response)
+
+            theme_page.on("response", on_response)
+            await theme_page.goto(page.url, wait_until="networkidle", timeout=60000)
+            await self.evaluate('_capture_themes_in_parallel', theme_page, QUICK_SCROLL_JS)
+            await self.settle(theme_page, 'load', fonts=True)
+
+            async def switched() -> bool:
+                return (await self.detect_current_theme(theme_page) == alternate and
+                        await self.evaluate('_capture_themes_in_parallel', theme_page, THEME_FINGERPRINT_JS) != baseline)
+
+            mechanism = 'color_scheme'
+            if not await switched():
+                mechanism = 'class'
+                if not (await self.toggle_theme_via_js(theme_page) and await switched()):
+                    print("  [THEME] Site ignores color-scheme emulation and class switches - using the toggle flow")
+                    return None
+
+            print(f"  [THEME] {alternate} theme via {mechanism}; capturing both themes in parallel")
+            await asyncio.gather(
+                self.capture_theme(page, initial_theme),
+                self.capture_theme(theme_page, alternate)
+            )
+            return mechanism
+        finally:
+            if context is not None:
+                await context.close()
+            if theme_page is not None:
+                self._readiness.pop(theme_page, None)
+                self._color_schemes.pop(theme_page, None)
+                self.invalidate_style_scan(theme_page)
+
+    def known_asset_urls(self) -> set:
+        """URLs already in the asset lists"""
+        urls = set(self.fonts) | self._media_urls
+        for entries in (self.stylesheets, self.scripts, self.images, self.videos, self.rive_animations):
+            urls.update(entry['url'] for entry in entries)
+        return urls
+
+    async def stage_screenshots(self, page: Page) -> dict:
+        """Take regular screenshots (in initial theme)"""
+        await self.take_screenshots(page)
+        return {'screenshot_timings': self.screenshot_timings}
+
+    async def stage_coverage(self, page: Page) -> dict:
+        """Record which CSS rules apply across every breakpoint and theme, and prune the rest"""
+        print("[*] Measuring CSS rule usage...")
+        self.css_coverage_summary = await self.measure_css_coverage(page)
+        return {'css_coverage_summary': self.css_coverage_summary}
+
+    async def measure_css_coverage(self, page: Page) -> dict:
+        """Load the page in a sibling context with CSS rule-usage tracking on
+
+        Every breakpoint is visited in the initial theme and, when the themes
+        stage found a working switch, in the alternate one too. Usage is merged
+        per sheet, then ``used_styles.css`` gets only the rules seen applied
+        (see ``prune_css``) and ``data/css_coverage.json`` the per-sheet numbers.
+        """
+        summary = self.theme_summary or {}
+        initial = summary.get('initial_theme') or await self.detect_current_theme(page)
+        alternate = 'dark' if initial == 'light' else 'light'
+        themes = [initial]
+        if len(summary.get('themes_captured') or []) > 1:
+            themes.append(alternate)
+
+        context = await page.context.browser.new_context(
+            viewport=self.launch_profile['viewport'],
+            user_agent=self.launch_profile['user_agent'],
+            color_scheme=self._color_schemes.get(page),
+            storage_state=await page.context.storage_state()
+        )
+        headers = {}
+        used = {}  # styleSheetId -> used rule start offsets
+        coverage_page = None
+        try:
+            coverage_page = await context.new_page()
+            self._readiness[coverage_page] = PageReadiness(coverage_page)
+            if self.routing_policy.intercepts:
+                await coverage_page.route("**/*", self.sibling_route('coverage'))
+
+            client = await context.new_cdp_session(coverage_page)
+
+            def on_sheet(event):
+                header = event['header']
+                if header.get('origin') == 'regular':
+                    headers[header['styleSheetId']] = header
+
+            def merge(rule_usage: list):
+                for rule in rule_usage:
+                    if rule.get('used'):
+                        used.setdefault(rule['styleSheetId'], set()).add(int(rule['startOffset']))
+
+            client.on('CSS.styleSheetAdded', on_sheet)
+            await client.send('DOM.enable')
+            await client.send('CSS.enable')
+            await client.send('CSS.startRuleUsageTracking')
+
+            await coverage_page.goto(page.url, wait_until="networkidle", timeout=60000)
+            await self.settle(coverage_page, 'load', fonts=True)
+
+            for theme in themes:
+                if theme != initial:
+                    await self._switch_coverage_theme(coverage_page, alternate)
+                for bp in self.breakpoints:
+                    await coverage_page.set_viewport_size({'width': bp['width'], 'height': bp['height']})
+                    await self.evaluate('measure_css_coverage', coverage_page, QUICK_SCROLL_JS)
+                    await self.settle(coverage_page, 'viewport')
+                    merge((await client.send('CSS.takeCoverageDelta'))['coverage'])
+                    print(f"  [COVERAGE] {theme}/{bp['name']}: {sum(len(v) for v in used.values())} rules used so far")
+            merge((await client.send('CSS.stopRuleUsageTracking'))['ruleUsage'])
+
+            sheets = []
+            totals = {'sheets': 0, 'bytes': 0, 'kept_bytes': 0, 'rules': 0, 'used_rules': 0}
+            for sheet_id, header in headers.items():
+                try:
+                    text = (await client.send('CSS.getStyleSheetText', {'styleSheetId': sheet_id}))['text']
+                except Exception:
+                    continue  # Removed from the document before it could be read
+                counts = {'rules': 0, 'used_rules': 0}
+                pruned = "\n".join(prune_css(text, sorted(used.get(sheet_id, ())), counts=counts))
+                source = header.get('sourceURL') or None
+                inline = bool(header.get('isInline') or header.get('isConstructed'))
+                entry = {
+                    'url': source,
+                    'inline': inline,
+                    'bytes': len(text.encode('utf-8', errors='ignore')),
+                    'kept_bytes': len(pruned.encode('utf-8', errors='ignore')),
+                    **counts,
+                    'used_percent': round(100 * counts['used_rules'] / counts['rules'], 1) if counts['rules'] else None,
+                    'pruned': pruned
+                }
+                sheets.append(entry)
+                totals['sheets'] += 1
+                for key in ('bytes', 'kept_bytes', 'rules', 'used_rules'):
+                    totals[key] += entry[key]
+        finally:
+            await context.close()
+            self._readiness.pop(coverage_page, None)
+
+        labelled = [
+            (f"Inline Style: {entry['url']}" if entry['inline'] else f"External: {entry['url']}", entry.pop('pruned'))
+            for entry in sheets
+        ]
+        used_styles_path = self.output_dir / "used_styles.css"
+        written = CSSCombiner(minify=self.minify_css).combine(labelled, used_styles_path, lambda text: text)
+
+        report = {
+            'breakpoints': [bp['name'] for bp in self.breakpoints],
+            'themes': themes,
+            'totals': totals,
+            'used_styles': dict(written, path=os.path.relpath(used_styles_path, self.output_dir)),
+            'sheets': sheets
+        }
+        with open(self.data_dir / "css_coverage.json", 'w') as f:
+            json.dump(report, f, indent=2)
+
+        percent = round(100 * totals['used_rules'] / totals['rules'], 1) if totals['rules'] else 0
+        print(f"  [COVERAGE] {totals['used_rules']}/{totals['rules']} rules used ({percent}%), "
+              f"used_styles.css {written['bytes_out']} bytes from {totals['bytes']}")
+        return {key: report[key] for key in ('breakpoints', 'themes', 'totals', 'used_styles')}
+
+    async def _switch_coverage_theme(self, page: Page, theme: str):
+        """Put the coverage page in ``theme`` the way the themes stage managed to"""
+        mechanism = (self.theme_summary or {}).get('mechanism')
+        await page.emulate_media(color_scheme=theme)
+        if mechanism == 'class':
+            await self.toggle_theme_via_js(page)
+        elif mechanism == 'toggle':
+            if not (self.detected_theme_toggle and await self.click_theme_toggle(page, self.detected_theme_toggle)):
+                await self.toggle_theme_via_js(page)
+        await self.settle(page, 'viewport', transitions=True)
+
+    async def start_js_coverage(self, page: Page):
+        """Start V8 precise block coverage; call before navigating so every script is seen"""
+        client = await page.context.new_cdp_session(page)
+        await client.send('Profiler.enable')
+        await client.send('Profiler.startPreciseCoverage', {'callCount': False, 'detailed': True})
+        self._js_coverage_session = client
+
+    async def finish_js_coverage(self) -> dict:
+        """Collect JS coverage, annotate ``self.scripts`` and write ``data/js_coverage.json``
+
+        Coverage spans everything the main page ran through the last page
+        stage (scrolling, theme toggles, animation capture). Offsets are in
+        source characters, which equal bytes for the ASCII bundles sites ship.
+        Captured scripts V8 never compiled or ran are flagged as dead.
+        """
+        client, self._js_coverage_session = self._js_coverage_session, None
+        try:
+            result = (await client.send('Profiler.takePreciseCoverage'))['result']
+            await client.send('Profiler.stopPreciseCoverage')
+        finally:
+            await client.detach()
+
+        # A URL can be compiled more than once (e.g. re-injected); union its runs
+        by_url = {}
+        inline = {'scripts': 0, 'total_bytes': 0, 'used_bytes': 0}
+        for script in result:
+            if not script['functions']:
+                continue
+            total = max(block['endOffset'] for f in script['functions'] for block in f['ranges'])
+            used = coverage_used_ranges(script['functions'])
+            if not script['url'] or script['url'] == self.url:
+                inline['scripts'] += 1
+                inline['total_bytes'] += total
+                inline['used_bytes'] += sum(end - start for start, end in used)
+                continue
+            entry = by_url.setdefault(script['url'], {'total_bytes': 0, 'ranges': []})
+            entry['total_bytes'] = max(entry['total_bytes'], total)
+            entry['ranges'].extend(used)
+
+        scripts = []
+        totals = {'scripts': len(self.scripts), 'executed': 0, 'total_bytes': 0, 'used_bytes': 0}
+        for asset in self.scripts:
+            covered = by_url.get(asset['url'])
+            ranges = merge_ranges(covered['ranges']) if covered else []
+            total = covered['total_bytes'] if covered else asset.get('size', 0)
+            used_bytes = sum(end - start for start, end in ranges)
+            coverage = {
+                'executed': bool(ranges),
+                'total_bytes': total,
+                'used_bytes': used_bytes,
+                'used_percent': round(100 * used_bytes / total, 1) if total else None
+            }
+            asset['coverage'] = coverage
+            scripts.append(dict(coverage, url=asset['url'], local_path=asset['local_path'], used_ranges=ranges))
+            totals['executed'] += coverage['executed']
+            totals['total_bytes'] += total
+            totals['used_bytes'] += used_bytes
+
+        dead = [entry['url'] for entry in scripts if not entry['executed']]
+        with open(self.data_dir / "js_coverage.json", 'w') as f:
+            json.dump({'totals': totals, 'inline': inline, 'dead_scripts': dead, 'scripts': scripts}, f, indent=2)
+
+        percent = round(100 * totals['used_bytes'] / totals['total_bytes'], 1) if totals['total_bytes'] else None
+        print(f"  [JS COVERAGE] {totals['executed']}/{totals['scripts']} scripts ran, "
+              f"{totals['used_bytes']}/{totals['total_bytes']} bytes used ({percent}%), {len(dead)} dead")
+        return dict(totals, used_percent=percent, dead_scripts=dead,
+                    path=os.path.relpath(self.data_dir / "js_coverage.json", self.output_dir))
+
+    async def write_stylesheets(self, page: Page):
+        """Write combined_styles.css and the stylesheets report section from the current CSSOM"""
+        # Extract stylesheets (network-captured sheets are read from disk)
+        print("[*] Extracting stylesheets...")
+        await self.flush_assets()
+        css_data = await self.extract_all_stylesheets(page)
+
+        # Save combined CSS
+        self.css_combine_stats = self.combine_css(css_data, self.output_dir / "combined_styles.css")
+
+        # Stylesheet contents go to their own report section, one sheet per line
+        stylesheets_section = NDJSONWriter(self.data_dir / "stylesheets.ndjson")
+        for sheet in css_data:
+            stylesheets_section.write(sheet)
+        stylesheets_section.close()
+        self.stylesheets_content = stylesheets_section.reference(self.output_dir)
+
+    async def stage_extraction(self, page: Page) -> dict:
+        """Extract stylesheets, page data, component tree and design tokens"""
+        # Every page stage has run, so sheets loaded by theme switches,
+        # animations and breakpoint renders are in the CSSOM by now
+        await self.write_stylesheets(page)
+
+        # Scans cached by earlier stages predate lazy content, resizes and
+        # theme round-trips; extraction always reads the page as it is now
+        self.invalidate_style_scan(page)
+
+        print("[*] Extracting page data...")
+        page_data = await self.extract_page_data(page)
+
+        # Extract component tree
+        print("[*] Extracting component structure...")
+        self.component_tree = await self.extract_component_structure(page)
+
+        # Store HTML
+        self.html = page_data['html']
+        (self.output_dir / "index.html").write_text(self.html, encoding='utf-8')
+
+        # Prepare design system data
+        design_system = {
+            'colors': self.extract_color_palette(page_data['colors']),
+            'css_variables': page_data['cssVariables'],
+            'fonts': page_data['fonts'],
+            'font_faces': page_data['fontFaces'],
+            'typography': self.dedupe_typography(page_data['typography']),
+            'backgrounds': [],
+            'texts': [],
+            'shadows': [],
+            'borderRadius': [],
+            'gradients': []
+        }
 
-            # Design tokens (for shell script compatibility)
-            with open(self.data_dir / "design_tokens.json", 'w') as f:
-                json.dump(design_system, f, indent=2)
+        # Extract additional design tokens from computed styles
+        for key, style in page_data.get('computedStyles', {}).items():
+            if style.get('backgroundColor') and style['backgroundColor'] not in design_system['backgrounds']:
+                design_system['backgrounds'].append(style['backgroundColor'])
+            if style.get('boxShadow') and style['boxShadow'] != 'none':
+                design_system['shadows'].append(style['boxShadow'])
+            if style.get('borderRadius') and style['borderRadius'] != '0px':
+                design_system['borderRadius'].append(style['borderRadius'])
+
+        # Dedupe lists
+        design_system['shadows'] = list(set(design_system['shadows']))[:10]
+        design_system['borderRadius'] = list(set(design_system['borderRadius']))[:10]
+
+        # Generate Tailwind config
+        self.generate_tailwind_config(design_system)
+
+        # The HTML is already in index.html; keep it out of the checkpoint
+        self.page_data = {k: v for k, v in page_data.items() if k != 'html'}
+        self.design_system = design_system
+        return {
+            'page_data': self.page_data,
+            'component_tree': self.component_tree,
+            'design_system': self.design_system,
+            # Later stages capture more assets (theme sheets, breakpoint images)
+            **self.asset_lists(),
+            'stylesheets_content': self.stylesheets_content,
+            'css_combine_stats': self.css_combine_stats
+        }
 
-            # Asset manifest (for shell script compatibility)
-            asset_manifest = {
-                "fonts": list(self.fonts.values()),
+    async def stage_report(self) -> dict:
+        """Write the extraction report, data files and analysis from the collected stages"""
+        if self.page_data is None:
+            print("  [!] No extraction data - run the extraction stage before the report")
+            return None
+        page_data = self.page_data
+        design_system = self.design_system
+
+        # Every asset must be on disk before the manifests describe it
+        print("[*] Flushing asset writes...")
+        await self.flush_assets()
+        print(f"  [ASSETS] {self.asset_writer.files_written} files, {self.asset_writer.bytes_written} bytes written")
+        if self.asset_store:
+            deduplicated = self.asset_writer.bytes_deduplicated + self.media_downloader.bytes_deduplicated
+            print(f"  [ASSETS] {deduplicated} bytes already in store {self.asset_store.root}")
+        if self.incremental:
+            stats = self.incremental_stats
+            print(f"  [INCREMENTAL] {stats['not_modified']} not modified, {stats['modified']} modified, "
+                  f"{self.asset_writer.files_unchanged} file(s) left untouched")
+        if self._js_coverage_session is not None:
+            print("[*] Collecting JavaScript coverage...")
+            self.js_coverage_summary = await self.finish_js_coverage()
+
+        # Compile comprehensive report
+        report = {
+            "url": self.url,
+            "extracted_at": datetime.now().isoformat(),
+            "title": page_data['title'],
+            "meta": page_data['meta'],
+
+            "design_system": design_system,
+
+            "layout": {
+                "computed_styles": page_data['computedStyles']
+            },
+
+            "animations": {
+                "keyframes": page_data['keyframes'],
+                "animated_elements": page_data['animations']
+            },
+
+            "media": {
+                "videos": page_data['videos'],
+                "background_images": page_data['backgroundImages'],
+                "images": self.images
+            },
+
+            "assets": {
+                "fonts": self.fonts,
+                "stylesheets": self.stylesheets,
+                "scripts": self.scripts,
                 "images": self.images,
-                "videos": self.videos,
-                "stylesheets": [{"url": s['url'], "local_path": s['local_path']} for s in self.stylesheets],
-                "scripts": self.scripts
-            }
-            with open(self.data_dir / "asset_manifest.json", 'w') as f:
-                json.dump(asset_manifest, f, indent=2)
-
-            # Animations
-            with open(self.data_dir / "animations.json", 'w') as f:
-                json.dump(report['animations'], f, indent=2)
+                "videos": self.videos
+            },
+
+            "screenshot_timings": self.screenshot_timings,
+            "stages": self.stage_log,
+            "profile": self.profiler.summary(),
+            "waits": self.wait_log,
+            "lazy_load": self.scroll_stats,
+            "routing": self.routing_stats,
+            "combined_css": self.css_combine_stats,
+            "css_coverage": self.css_coverage_summary,
+            "js_coverage": self.js_coverage_summary,
+
+            "incremental": dict(self.incremental_stats, files_unchanged=self.asset_writer.files_unchanged)
+            if self.incremental else None,
+
+            # Heavy sections live in NDJSON files next to the report
+            "stylesheets_content": self.stylesheets_content,
+            "network_log": self.network_log.reference(self.output_dir),
+            "links": page_data['links']
+        }
 
-            # Component tree
-            with open(self.data_dir / "component_tree.json", 'w') as f:
-                json.dump(component_tree, f, indent=2)
+        # Save data files
+        print("[*] Saving data files...")
+
+        # Design tokens (for shell script compatibility)
+        with open(self.data_dir / "design_tokens.json", 'w') as f:
+            json.dump(design_system, f, indent=2)
+
+        # Asset manifest (for shell script compatibility)
+        asset_manifest = {
+            "fonts": list(self.fonts.values()),
+            "images": self.images,
+            "videos": self.videos,
+            "stylesheets": self.stylesheets,
+            "scripts": self.scripts,
+            "js_coverage": self.js_coverage_summary
+        }
+        with open(self.data_dir / "asset_manifest.json", 'w') as f:
+            json.dump(asset_manifest, f, indent=2)
 
-            # Video sources
-            with open(self.data_dir / "video_sources.json", 'w') as f:
-                json.dump(self.video_sources, f, indent=2)
+        # Animations
+        with open(self.data_dir / "animations.json", 'w') as f:
+            json.dump(report['animations'], f, indent=2)
 
-            # Rive animations
-            if self.rive_animations:
-                with open(self.data_dir / "rive_animations.json", 'w') as f:
-                    json.dump(self.rive_animations, f, indent=2)
-                print(f"  [RIVE] Saved {len(self.rive_animations)} Rive animation(s)")
+        # Component tree
+        with open(self.data_dir / "component_tree.json", 'w') as f:
+            json.dump(self.component_tree, f, indent=2)
 
-            # Typography
-            with open(self.data_dir / "typography.json", 'w') as f:
-                json.dump(design_system['typography'], f, indent=2)
+        # Video sources
+        with open(self.data_dir / "video_sources.json", 'w') as f:
+            json.dump(self.video_sources, f, indent=2)
 
-            # Full extraction report
-            with open(self.output_dir / "extraction_report.json", 'w') as f:
-                json.dump(report, f, indent=2, default=str)
+        # Rive animations
+        if self.rive_animations:
+            with open(self.data_dir / "rive_animations.json", 'w') as f:
+                json.dump(self.rive_animations, f, indent=2)
+            print(f"  [RIVE] Saved {len(self.rive_animations)} Rive animation(s)")
 
-            # Generate and save analysis report
-            analysis_report = self.generate_analysis_report(report)
-            (self.output_dir / "ANALYSIS_REPORT.md").write_text(analysis_report, encoding='utf-8')
+        # Typography
+        with open(self.data_dir / "typography.json", 'w') as f:
+            json.dump(design_system['typography'], f, indent=2)
 
-            await browser.close()
+        # Full extraction report
+        with open(self.output_dir / "extraction_report.json", 'w') as f:
+            json.dump(report, f, indent=2, default=str)
 
-        print(f"\n{'=' * 50}")
-        print("  Clone Complete!")
-        print(f"{'=' * 50}")
-        print(f"\nOutput directory: {self.output_dir}")
+        # Generate and save analysis report
+        analysis_report = self.generate_analysis_report(report)
+        (self.output_dir / "ANALYSIS_REPORT.md").write_text(analysis_report, encoding='utf-8')
 
         return report
 
 
-async def main():
-    import sys
+class BrowserPool:
+    """Keeps a fixed set of browsers alive and hands out slots for clone jobs
+
+    Each browser serves up to ``contexts_per_browser`` concurrent jobs, each in
+    its own context, so total concurrency is ``size * contexts_per_browser``.
+    A browser that crashed is relaunched the next time its slot is handed out.
+    """
+
+    def __init__(self, playwright, size: int = 2, contexts_per_browser: int = 1, profile: dict = None):
+        self.playwright = playwright
+        self.profile = profile
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.browsers = []
+        self._slots = asyncio.Queue()
+        self._relaunch_lock = asyncio.Lock()
+
+    async def start(self):
+        """Launch every browser and register its slots"""
+        self.browsers = list(await asyncio.gather(
+            *(launch_browser(self.playwright, self.profile) for _ in range(self.size))
+        ))
+        for _ in range(self.contexts_per_browser):
+            for index in range(self.size):
+                self._slots.put_nowait(index)
+        print(f"[*] Browser pool ready: {self.size} browser(s) x {self.contexts_per_browser} context(s)")
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait for a free slot and yield the browser that owns it"""
+        index = await self._slots.get()
+        try:
+            async with self._relaunch_lock:
+                if not self.browsers[index].is_connected():
+                    print(f"  [POOL] Browser {index} disconnected - relaunching")
+                    self.browsers[index] = await launch_browser(self.playwright, self.profile)
+            yield self.browsers[index]
+        finally:
+            self._slots.put_nowait(index)
+
+    async def close(self):
+        for browser in self.browsers:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+
+def read_url_list(source: str) -> list:
+    """Read URLs from a file, or from stdin when source is '-'
+
+    Blank lines and lines starting with '#' are ignored.
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(source).read_text(encoding='utf-8').splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+
+def batch_output_dir(output_root: Path, url: str) -> Path:
+    """Per-job output directory, derived from the URL alone
+
+    The same URL maps to the same directory however the list is ordered, so
+    ``--incremental`` and ``--resume`` find the previous run's output. A short
+    hash of the full URL keeps URLs that differ only in query or case apart.
+    """
+    parsed = urlparse(url)
+    slug = re.sub(r'[^\w\-]+', '_', f"{parsed.netloc}{parsed.path}").strip('_') or 'index'
+    digest = hashlib.sha256(url.encode('utf-8')).hexdigest()[:10]
+    return output_root / f"{slug[:80]}_{digest}"
+
+
+async def clone_batch(urls: list, output_root: str = "cloned_batch", browsers: int = 2,
+                      contexts_per_browser: int = 1, **cloner_options) -> dict:
+    """Clone many URLs over a shared browser pool with bounded concurrency
+
+    Every job gets its own output directory under ``output_root``; a summary of
+    all jobs is written to ``output_root/batch_summary.json``.
+    """
+    output_root = Path(output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.now().isoformat()
+    batch_start = time.perf_counter()
+
+    async with async_playwright() as p:
+        pool = BrowserPool(p, size=browsers, contexts_per_browser=contexts_per_browser,
+                           profile=cloner_options.get('launch_profile'))
+        await pool.start()
+
+        async def run_job(url: str) -> dict:
+            job_dir = batch_output_dir(output_root, url)
+            job = {'url': url, 'output_dir': str(job_dir), 'status': 'ok'}
+            async with pool.slot() as browser:
+                job_start = time.perf_counter()
+                try:
+                    cloner = WebsiteCloner(url, str(job_dir), **cloner_options)
+                    report = await cloner.clone(browser=browser) or {}
+                    assets = report.get('assets', {})
+                    job['title'] = report.get('title')
+                    job['assets'] = {
+                        'fonts': len(assets.get('fonts', {})),
+                        'stylesheets': len(assets.get('stylesheets', [])),
+                        'scripts': len(assets.get('scripts', [])),
+                        'images': len(assets.get('images', [])),
+                        'videos': len(assets.get('videos', [])),
+                    }
+                except Exception as e:
+                    job['status'] = 'failed'
+                    job['error'] = f"{type(e).__name__}: {e}"
+                    print(f"  [!] Batch job failed for {url}: {e}")
+                job['duration_seconds'] = round(time.perf_counter() - job_start, 2)
+            return job
 
-    url = sys.argv[1] if len(sys.argv) > 1 else "https://www.aura.build/share/lumina-video"
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else "cloned_site"
+        try:
+            # A repeated URL would share (and race on) one output directory
+            jobs = await asyncio.gather(*(run_job(url) for url in dict.fromkeys(urls)))
+        finally:
+            await pool.close()
+
+    summary = {
+        'started_at': started_at,
+        'finished_at': datetime.now().isoformat(),
+        'duration_seconds': round(time.perf_counter() - batch_start, 2),
+        'browsers': browsers,
+        'contexts_per_browser': contexts_per_browser,
+        'total': len(jobs),
+        'succeeded': sum(1 for j in jobs if j['status'] == 'ok'),
+        'failed': sum(1 for j in jobs if j['status'] != 'ok'),
+        'jobs': list(jobs),
+    }
+    with open(output_root / "batch_summary.json", 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"\n{'=' * 50}")
+    print("  Batch Complete!")
+    print(f"{'=' * 50}")
+    print(f"\n{summary['succeeded']}/{summary['total']} succeeded in {summary['duration_seconds']}s")
+    print(f"Summary: {output_root / 'batch_summary.json'}")
+
+    return summary
+
+
+def parse_wait_timeouts(items: list) -> dict:
+    """Parse repeated ``STEP=MS`` options into a timeout override dict"""
+    timeouts = {}
+    for item in items:
+        step, _, ms = item.partition('=')
+        if step not in WAIT_TIMEOUTS or not ms.isdigit():
+            raise SystemExit(f"Invalid --wait-timeout '{item}', expected STEP=MS with STEP in {', '.join(WAIT_TIMEOUTS)}")
+        timeouts[step] = int(ms)
+    return timeouts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Comprehensive Website Cloner")
+    parser.add_argument('url', nargs='?', default=None,
+                        help=f"URL to clone (default: {DEFAULT_URL}); in batch mode, the output root")
+    parser.add_argument('output_dir', nargs='?', default=None,
+                        help="Output directory (default: cloned_site)")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="Clone every URL listed in FILE, one per line ('-' reads stdin)")
+    parser.add_argument('--browsers', type=int, default=2,
+                        help="Batch mode: number of browsers kept alive in the pool (default: 2)")
+    parser.add_argument('--contexts-per-browser', type=int, default=1,
+                        help="Batch mode: concurrent jobs per browser (default: 1)")
+    parser.add_argument('--breakpoints', type=parse_breakpoints, default=None, metavar='SPEC',
+                        help="Screenshot breakpoints as name:WIDTHxHEIGHT,... (default: full, desktop, tablet, mobile)")
+    parser.add_argument('--screenshot-mode', choices=SCREENSHOT_MODES, default='serial',
+                        help="Render breakpoints one by one, concurrently in sibling contexts, "
+                             "or both with a timing comparison (default: serial)")
+    parser.add_argument('--theme-mode', choices=THEME_MODES, default='auto',
+                        help="auto: capture the alternate theme concurrently in a sibling context via "
+                             "color-scheme emulation or a class switch, falling back to the toggle; "
+                             "toggle: always toggle on the main page (default: auto)")
+    parser.add_argument('--extraction-backend', choices=EXTRACTION_BACKENDS, default='js',
+                        help="js: per-element getComputedStyle sweep in the page; domsnapshot: one CDP "
+                             "DOMSnapshot call for whitelisted properties, decoded in Python "
+                             "(rendered elements only) (default: js)")
+    parser.add_argument('--minify-css', action='store_true',
+                        help="Minify combined_styles.css (repeated sheets and rules are always dropped)")
+    parser.add_argument('--css-coverage', action='store_true',
+                        help="Track CSS rule usage across all breakpoints and both themes and write "
+                             "used_styles.css with only the rules that applied, plus data/css_coverage.json")
+    parser.add_argument('--js-coverage', action='store_true',
+                        help="Record which parts of each captured script execute (V8 precise coverage) and "
+                             "flag scripts that never ran, in data/js_coverage.json and the asset manifest")
+    parser.add_argument('--animation-mode', choices=ANIMATION_MODES, default='interval',
+                        help="interval: screenshot every 2s; diff: sample fast and keep only changed frames; "
+                             "virtual: pause the animation timeline and seek keyframe states (default: interval)")
+    parser.add_argument('--animation-duration', type=int, default=25, metavar='SECONDS',
+                        help="Minimum animation capture time (default: 25)")
+    parser.add_argument('--hero-video', action='store_true',
+                        help="Record the hero section as a streamed CDP screencast (PNG frames, plus WebM when "
+                             "ffmpeg is on PATH) instead of capturing frames; falls back to --animation-mode "
+                             "if the screencast fails, and virtual mode always seeks the timeline")
+    parser.add_argument('--diff-threshold', type=float, default=0.005, metavar='FRACTION',
+                        help="diff mode: fraction of changed pixels that keeps a frame (default: 0.005)")
+    parser.add_argument('--wait-timeout', action='append', default=[], metavar='STEP=MS',
+                        help=f"Override a readiness wait ceiling; steps: {', '.join(WAIT_TIMEOUTS)}")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Revalidate assets from the previous run in output_dir instead of re-downloading")
+    parser.add_argument('--asset-store', metavar='DIR',
+                        help="Content-addressed store shared across runs; assets are linked from it")
+    parser.add_argument('--routing', choices=ROUTING_PRESETS, default='full',
+                        help="Routing preset: full (download everything), no-media, or tokens "
+                             "(no media or trackers, placeholder images, 2MB cap) (default: full)")
+    parser.add_argument('--block', type=parse_categories, default=None, metavar='TYPES',
+                        help="Abort these resource types before download, e.g. media,font")
+    parser.add_argument('--stub', type=parse_categories, default=None, metavar='TYPES',
+                        help="Answer these resource types with a placeholder, e.g. image,script")
+    parser.add_argument('--allow-domain', action='append', default=[], metavar='DOMAIN',
+                        help="Only load from these domains and the target site (repeatable)")
+    parser.add_argument('--deny-domain', action='append', default=[], metavar='DOMAIN',
+                        help="Never load from this domain or its subdomains (repeatable)")
+    parser.add_argument('--max-body-size', type=parse_size, default=None, metavar='SIZE',
+                        help="Do not save response bodies larger than SIZE (e.g. 5M)")
+    parser.add_argument('--deny-content-type', action='append', default=[], metavar='PREFIX',
+                        help="Do not save responses whose content type starts with PREFIX (repeatable)")
+    parser.add_argument('--media-max-size', type=parse_size, default=MEDIA_MAX_BYTES, metavar='SIZE',
+                        help="Cap on each streamed video/audio file or reassembled stream (default: 512M)")
+    parser.add_argument('--profile', choices=LAUNCH_PROFILES, default='desktop',
+                        help="Launch profile: desktop (headed, session video) or server "
+                             "(headless, no session video, lean flags) (default: desktop)")
+    parser.add_argument('--headless', action=argparse.BooleanOptionalAction, default=None,
+                        help="Override the profile's headless setting")
+    parser.add_argument('--session-video', action=argparse.BooleanOptionalAction, default=None,
+                        help="Override whether every context records a full-session video")
+    parser.add_argument('--browser-arg', action='append', default=[], metavar='ARG',
+                        help="Extra Chromium flag, e.g. --browser-arg=--disable-gpu (repeatable)")
+    parser.add_argument('--user-agent', default=None, help="Override the profile's user agent")
+    parser.add_argument('--viewport', type=parse_viewport, default=None, metavar='WIDTHxHEIGHT',
+                        help="Override the profile's viewport (default: 1920x1080)")
+    parser.add_argument('--trace', action='store_true',
+                        help="Also write the per-stage profile as a Chrome trace (data/clone_trace.json)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Restore stages checkpointed by a previous run in output_dir instead of redoing them")
+    parser.add_argument('--only', type=parse_stages, default=None, metavar='STAGES',
+                        help=f"Run only these stages (comma-separated; from {', '.join(PIPELINE_STAGES)}); "
+                             "the page is re-opened as needed and checkpoints of later stages are dropped")
+    parser.add_argument('--skip', type=parse_stages, default=None, metavar='STAGES',
+                        help="Do not run these stages; their checkpoints are used when present")
+    return parser.parse_args(argv)
 
-    cloner = WebsiteCloner(url, output_dir)
+
+async def main():
+    args = parse_args()
+
+    cloner_options = {
+        'asset_store': args.asset_store,
+        'incremental': args.incremental,
+        'breakpoints': args.breakpoints,
+        'screenshot_mode': args.screenshot_mode,
+        'theme_mode': args.theme_mode,
+        'extraction_backend': args.extraction_backend,
+        'minify_css': args.minify_css,
+        'css_coverage': args.css_coverage,
+        'js_coverage': args.js_coverage,
+        'wait_timeouts': parse_wait_timeouts(args.wait_timeout),
+        'animation_mode': args.animation_mode,
+        'animation_duration': args.animation_duration,
+        'hero_video': args.hero_video,
+        'animation_diff_threshold': args.diff_threshold,
+        'resume': args.resume,
+        'only_stages': args.only,
+        'skip_stages': args.skip,
+        'trace': args.trace,
+        'launch_profile': launch_profile(
+            args.profile,
+            extra_args=args.browser_arg,
+            headless=args.headless,
+            session_video=args.session_video,
+            user_agent=args.user_agent,
+            viewport=args.viewport,
+        ),
+        'media_max_bytes': args.media_max_size,
+        'routing_policy': RoutingPolicy.from_preset(
+            args.routing,
+            categories=dict({t: 'abort' for t in args.block or []}, **{t: 'stub' for t in args.stub or []}),
+            allow_domains=args.allow_domain,
+            deny_domains=args.deny_domain,
+            max_body_bytes=args.max_body_size,
+            deny_content_types=args.deny_content_type,
+        ),
+    }
+
+    if args.batch:
+        urls = read_url_list(args.batch)
+        output_root = args.url or args.output_dir or "cloned_batch"
+        await clone_batch(urls, output_root, browsers=args.browsers,
+                          contexts_per_browser=args.contexts_per_browser, **cloner_options)
+        return
+
+    cloner = WebsiteCloner(args.url or DEFAULT_URL, args.output_dir or "cloned_site", **cloner_options)
     await cloner.clone()
 
 